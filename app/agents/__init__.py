@@ -4,10 +4,14 @@ from .resume_agent import ResumeAgent
 from .cover_letter_agent import CoverLetterAgent
 from .email_agent import EmailAgent
 from .base_agent import BaseAgent
+from .pipeline import StagePipeline, Stage, build_application_pipeline
 
 __all__ = [
     "ResumeAgent",
     "CoverLetterAgent",
     "EmailAgent",
-    "BaseAgent"
+    "BaseAgent",
+    "StagePipeline",
+    "Stage",
+    "build_application_pipeline"
 ]
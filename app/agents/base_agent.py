@@ -1,8 +1,10 @@
 # agents/base_agent.py
 import os
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Optional
 from app.connectors.factory import get_connector
+from app.connectors.stream_parser import JSONFieldStreamParser
+from core.env import env_flag
 from core.error_handler import handle_error
 from core.logger import get_logger
 
@@ -15,13 +17,38 @@ class BaseAgent:
       - Shared connector handling
       - Diagnostic error handling
       - Retry utilities
+      - Optional streaming of LLM responses with progress callbacks
     """
 
     TASK_NAME: str = "base"
 
-    def __init__(self, diagnostic_run: Optional[bool] = True, diagnostic_config: Optional[dict] = None):
+    def __init__(
+        self,
+        diagnostic_run: Optional[bool] = True,
+        diagnostic_config: Optional[dict] = None,
+        stream: Optional[bool] = None,
+        progress_callback: Optional[Callable[[str, str], None]] = None,
+    ):
         self.diagnostic_run = diagnostic_run
         self.diagnostic_config = diagnostic_config or {}
+        # Streaming defaults to the LLM_STREAMING env flag when not set explicitly.
+        if stream is None:
+            stream = env_flag("LLM_STREAMING", False)
+        self.stream = stream
+        self.progress_callback = progress_callback
+        # Diagnostic retries must not be served the cached response that just failed.
+        self.bypass_cache = self.diagnostic_config.get("type") == "connector_reconfig"
+        # Draft .tex written while a streamed response arrives
+        self.draft_path: Optional[str] = None
+
+    def discard_draft(self) -> None:
+        """Delete the streaming draft .tex of the last draft, if there is one."""
+        path, self.draft_path = self.draft_path, None
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove draft file {path}: {e}")
 
     def get_connector(self) -> Any:
         """Get connector for this agent (normal or diagnostic mode)."""
@@ -32,6 +59,46 @@ class BaseAgent:
             return get_connector(diag_connector)
         return get_connector(self.TASK_NAME)
 
+    def query_llm(
+        self,
+        connector: Any,
+        prompt: str,
+        stream_fields: Iterable[str] = (),
+        draft_path: Optional[str] = None,
+        draft_field: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Send the prompt and return the connector response structure.
+
+        In streaming mode the JSON fields in `stream_fields` are decoded as the
+        response arrives: `progress_callback(field, text_so_far)` is called on
+        every update and `draft_field` is written incrementally to `draft_path`.
+        """
+        query_kwargs = {"bypass_cache": True} if self.bypass_cache else {}
+
+        if not self.stream:
+            return connector.send_query(prompt, **query_kwargs)
+
+        parser = JSONFieldStreamParser(stream_fields)
+        chunks = []
+        draft_file = open(draft_path, "w", encoding="utf-8") if draft_path and draft_field else None
+
+        try:
+            for chunk in connector.send_query(prompt, stream=True, **query_kwargs):
+                chunks.append(chunk)
+                for field, text in parser.feed(chunk).items():
+                    if draft_file and field == draft_field:
+                        draft_file.write(text)
+                        draft_file.flush()
+                    if self.progress_callback:
+                        self.progress_callback(field, parser.values[field])
+        finally:
+            if draft_file:
+                draft_file.close()
+
+        logger.info(f"Streamed {sum(len(c) for c in chunks)} characters from connector.")
+        return {"status": "success", "response": "".join(chunks), "error": None}
+
     def handle_failure(self, error: Exception, retry_callback, agent_args: dict) -> Dict[str, Any]:
         """Handles retry logic using diagnostic mode and handle_error."""
         if not self.diagnostic_run:
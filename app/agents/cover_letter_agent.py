@@ -1,12 +1,14 @@
 # agents/cover_letter_agent.py
 import os
-import json
 import re
-from typing import Optional, Dict, Any
-from app.file_utils import file_parser, pdf_generator
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable
+from app.file_utils import file_parser, latex_validator, pdf_generator
 from core.logger import get_logger
 from core.exceptions import DiagnosticToolError
 from .base_agent import BaseAgent
+from .prompt_budget import compact_job_description, compact_text, compaction_enabled, render_prompt
+from .response_decoder import decode_llm_json
 from core.prompt_loader import PROMPTS
 from core import error_handler
 from app.connectors import get_connector
@@ -21,79 +23,133 @@ class CoverLetterAgent(BaseAgent):
 
     def __init__(
         self,
-        refined_resume_path: str,
+        refined_resume_path: Optional[str],
         job_role: str,
         job_description: str,
         company: str,
         diagnostic_run: Optional[bool] = True,
         diagnostic_config: Optional[dict] = None,
+        stream: Optional[bool] = None,
+        progress_callback: Optional[Callable[[str, str], None]] = None,
+        output_dir: Optional[str] = None,
+        resume_text: Optional[str] = None,
     ):
-        super().__init__(diagnostic_run, diagnostic_config)
+        super().__init__(diagnostic_run, diagnostic_config, stream, progress_callback)
         self.refined_resume_path = refined_resume_path
         self.job_role = job_role
         self.job_description = job_description
         self.company = company
+        self.output_dir = output_dir or os.getenv("COVER_LETTER_DIR", ".")
+        # Plain-text resume; when given, the refined PDF is not re-parsed.
+        self.resume_text = resume_text
         self.connector = get_connector(self.TASK_NAME)
 
-    def run(self) -> Dict[str, Any]:
-        try:
-            # 1️⃣ Parse resume
-            if not os.path.exists(self.refined_resume_path):
-                raise FileNotFoundError(f"Resume file not found: {self.refined_resume_path}")
-
-            parsed_resume = file_parser.extract_text_from_pdf(self.refined_resume_path)
-            if not parsed_resume.strip():
-                raise ValueError("Parsed resume content is empty.")
-
-            # 2️⃣ Load prompt
-            if self.PROMPT_KEY not in PROMPTS:
-                raise ValueError(f"Prompt '{self.PROMPT_KEY}' not found.")
-            prompt_template = PROMPTS[self.PROMPT_KEY]
-            cover_letter_prompt = prompt_template.format(resume_text=parsed_resume, job_description = self.job_description, company=self.company, position=self.job_role)
-
-            # 4️⃣ Get connector
-            connector = self.connector
-            logger.info("Sending cover letter generation prompt to connector...")
+    def resume_content(self) -> str:
+        """Resume text for the prompt: the text handed in by the caller, else extracted from the refined PDF."""
+        if self.resume_text:
+            return self.resume_text
+        logger.info("No resume text provided; extracting it from the PDF.")
+        if not self.refined_resume_path or not os.path.exists(self.refined_resume_path):
+            raise FileNotFoundError(f"Resume file not found: {self.refined_resume_path}")
+        return file_parser.extract_text_from_pdf(self.refined_resume_path)
+
+    def draft(self) -> str:
+        """Query the LLM for the cover letter and return its LaTeX source."""
+        # 1️⃣ Parse resume
+        parsed_resume = self.resume_content()
+        if not parsed_resume.strip():
+            raise ValueError("Parsed resume content is empty.")
+
+        # 2️⃣ Load prompt
+        if self.PROMPT_KEY not in PROMPTS:
+            raise ValueError(f"Prompt '{self.PROMPT_KEY}' not found.")
+        prompt_template = PROMPTS[self.PROMPT_KEY]
+        inputs = {
+            "resume_text": parsed_resume,
+            "job_description": self.job_description,
+            "company": self.company,
+            "position": self.job_role,
+        }
+        compacted = {}
+        if compaction_enabled():
+            compacted = {
+                "resume_text": compact_text(parsed_resume),
+                "job_description": compact_job_description(self.job_description),
+            }
+        cover_letter_prompt = render_prompt(self.TASK_NAME, prompt_template, inputs, compacted)
+
+        # 4️⃣ Get connector
+        connector = self.get_connector()
+        logger.info("Sending cover letter generation prompt to connector...")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        # A retry drafts again; the previous draft file is no longer needed
+        self.discard_draft()
+        # Streaming mode writes the LaTeX to a draft .tex while it arrives
+        self.draft_path = os.path.join(self.output_dir, f"cover_letter_draft_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.tex")
 
+        try:
             # 5️⃣ Query LLM
-            connector_response = connector.send_query(cover_letter_prompt)
+            connector_response = self.query_llm(
+                connector,
+                cover_letter_prompt,
+                stream_fields=("latex_code",),
+                draft_path=self.draft_path,
+                draft_field="latex_code",
+            )
             if not isinstance(connector_response, dict):
                 raise TypeError(f"Unexpected connector response type: {type(connector_response)}")
 
             if connector_response.get("status") == "success":
                 llm_response_raw = connector_response.get("response").strip()
+                # Fences, prose and unescaped LaTeX backslashes are repaired instead of regenerating
+                llm_response = decode_llm_json(llm_response_raw, fields=("latex_code",))
 
-                try:
-                    llm_response = json.loads(llm_response_raw)
-         
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse JSON from LLM: {e}")
-                    logger.debug(f"Raw LLM response: {llm_response_raw}")
-                    raise
-                
                 latex_code = llm_response.get("latex_code")
                 if not latex_code:
                     raise ValueError("LLM response missing 'latex_code'.")
-
-                # 6️⃣ Generate PDF
-                output_dir = os.getenv("COVER_LETTER_DIR", ".")
-                os.makedirs(output_dir, exist_ok=True)
-                pdf_path = pdf_generator.generate_pdf(latex_code, "cover_letter", output_dir)
-
-                logger.info(f"Cover letter generated successfully: {pdf_path}")
-                return {"status": "success", "path": pdf_path, "error_message": None}
+                return latex_code
 
             # LLM responded with failure
             error_msg = connector_response.get("error", "Unknown LLM error.")
             logger.error(f"Connector failed: {error_msg}")
             raise RuntimeError(error_msg)
+        except Exception:
+            self.discard_draft()
+            raise
+
+    def compile(self, latex_code: str) -> str:
+        """Compile the cover letter LaTeX to PDF and return its path."""
+        try:
+            # Structural errors fail here, before a pdflatex run is spent on them
+            latex_validator.check_latex(latex_code)
+
+            # 6️⃣ Generate PDF
+            pdf_path = pdf_generator.generate_pdf(latex_code, "cover_letter", self.output_dir)
+        finally:
+            # Compiled or not, the streamed draft has served its purpose
+            self.discard_draft()
+
+        logger.info(f"Cover letter generated successfully: {pdf_path}")
+        return pdf_path
+
+    def run(self) -> Dict[str, Any]:
+        try:
+            latex_code = self.draft()
+            pdf_path = self.compile(latex_code)
+            return {"status": "success", "path": pdf_path, "error_message": None}
 
         except Exception as e:
             logger.error(f"Error occurred in {self.TASK_NAME}: {e}", exc_info=True)
             agent_args={
                     "refined_resume_path": self.refined_resume_path,
                     "job_role": self.job_role,
+                    "job_description": self.job_description,
                     "company": self.company,
+                    "output_dir": self.output_dir,
+                    "resume_text": self.resume_text,
+                    "stream": self.stream,
+                    "progress_callback": self.progress_callback,
                     "diagnostic_run": True,
                     "diagnostic_config": {
                         "type": "connector_reconfig",
@@ -1,13 +1,14 @@
 # agents/email_agent.py
 import os
-import json
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
 from app.file_utils import file_parser
 from app.email_utils.gmail_sender import send_email_with_attachment
 from core.logger import get_logger
 from core.exceptions import DiagnosticToolError
 from .base_agent import BaseAgent
+from .prompt_budget import compact_job_description, compact_text, compaction_enabled, render_prompt
+from .response_decoder import decode_llm_json
 from core.prompt_loader import PROMPTS
 from core import error_handler 
 from app.connectors import get_connector
@@ -21,7 +22,7 @@ class EmailAgent(BaseAgent):
 
     def __init__(
         self,
-        resume_path: str,
+        resume_path: Optional[str],
         position: str,
         job_description: str,
         company: str,
@@ -29,9 +30,12 @@ class EmailAgent(BaseAgent):
         attach_cover_letter: Optional[bool] = False,
         cover_letter_path: Optional[str] = None,
         diagnostic_run: Optional[bool] = True,
-        diagnostic_config: Optional[dict] = None
+        diagnostic_config: Optional[dict] = None,
+        stream: Optional[bool] = None,
+        progress_callback: Optional[Callable[[str, str], None]] = None,
+        resume_text: Optional[str] = None
     ):
-        super().__init__(diagnostic_run, diagnostic_config)
+        super().__init__(diagnostic_run, diagnostic_config, stream, progress_callback)
         self.resume_path = resume_path
         self.position = position
         self.job_description = job_description
@@ -39,68 +43,95 @@ class EmailAgent(BaseAgent):
         self.receiver_email = receiver_email
         self.attach_cover_letter = attach_cover_letter
         self.cover_letter_path = cover_letter_path
+        # Plain-text resume; when given, the resume PDF is not re-parsed.
+        self.resume_text = resume_text
         self.connector = get_connector(self.TASK_NAME)
 
+    def resume_content(self) -> str:
+        """Resume text for the prompt: the text handed in by the caller, else extracted from the resume PDF."""
+        if self.resume_text:
+            return self.resume_text
+        logger.info("No resume text provided; extracting it from the PDF.")
+        if not self.resume_path or not os.path.exists(self.resume_path):
+            raise FileNotFoundError(f"Resume file not found: {self.resume_path}")
+        return file_parser.extract_text_from_pdf(self.resume_path)
+
+    def draft(self) -> Tuple[str, str]:
+        """Query the LLM for the application email and return (subject, html body)."""
+        # 1️⃣ Parse resume
+        parsed_resume = self.resume_content()
+        if not parsed_resume.strip():
+            raise ValueError("Parsed resume content is empty.")
+
+        # 2️⃣ Load prompt
+        
+        if self.PROMPT_KEY not in PROMPTS:
+            raise ValueError(f"Prompt '{self.PROMPT_KEY}' not found.")
+        prompt_template = PROMPTS[self.PROMPT_KEY]           
+        inputs = {
+            "position": self.position,
+            "resume_text": parsed_resume,
+            "job_description": self.job_description,
+            "company": self.company,
+        }
+        compacted = {}
+        if compaction_enabled():
+            compacted = {
+                "resume_text": compact_text(parsed_resume),
+                "job_description": compact_job_description(self.job_description),
+            }
+        email_prompt = render_prompt(self.TASK_NAME, prompt_template, inputs, compacted)
+       
+        # 4️⃣ Connector
+        email_connector = self.get_connector()
+        logger.info("Sending email generation prompt to connector...")
+
+        # 5️⃣ Query LLM
+        connector_response = self.query_llm(
+            email_connector,
+            email_prompt,
+            stream_fields=("email_subject", "html_code"),
+        )
+        if not isinstance(connector_response, dict):
+            raise TypeError(f"Unexpected connector response type: {type(connector_response)}")
+
+        if connector_response.get("status") == "success":
+            llm_response_raw = connector_response.get("response").strip()
+            # Fences, prose and unescaped backslashes are repaired instead of regenerating
+            llm_response = decode_llm_json(llm_response_raw, fields=("email_subject", "html_code"))
+
+            email_body_text = llm_response.get("html_code")
+            email_subject = llm_response.get("email_subject")
+            if not email_body_text or not email_subject:
+                raise ValueError("LLM response missing 'html_code' / 'email_subject'.")
+            return email_subject, email_body_text
+
+        # LLM responded with failure
+        error_msg = connector_response.get("error", "Unknown LLM error.")
+        logger.error(f"Connector failed: {error_msg}")
+        raise RuntimeError(error_msg)
+
+    def send(self, email_subject: str, email_body_text: str) -> str:
+        """Send the drafted email with the resume (and cover letter, if requested) attached."""
+        if not self.resume_path or not os.path.exists(self.resume_path):
+            raise FileNotFoundError(f"Resume file not found: {self.resume_path}")
+
+        # 6️⃣ Send email
+        if self.attach_cover_letter and self.cover_letter_path:
+            email_status = send_email_with_attachment(
+                self.receiver_email, email_subject, email_body_text, self.resume_path, self.cover_letter_path
+            )
+        else:
+            email_status = send_email_with_attachment(self.receiver_email, email_subject, email_body_text, self.resume_path)
+
+        logger.info(f"Email sent successfully: {email_status}")
+        return email_status
+
     def run(self) -> Dict[str, Any]:
         try:
-            # 1️⃣ Parse resume
-            if not os.path.exists(self.resume_path):
-                raise FileNotFoundError(f"Resume file not found: {self.resume_path}")
-            parsed_resume = file_parser.extract_text_from_pdf(self.resume_path)
-            if not parsed_resume.strip():
-                raise ValueError("Parsed resume content is empty.")
-
-            # 2️⃣ Load prompt
-            
-            if self.PROMPT_KEY not in PROMPTS:
-                raise ValueError(f"Prompt '{self.PROMPT_KEY}' not found.")
-            prompt_template = PROMPTS[self.PROMPT_KEY]           
-            email_prompt = prompt_template.format(
-                position=self.position,
-                resume_text=parsed_resume,
-                job_description=self.job_description,
-                company=self.company)
-           
-            # 4️⃣ Connector
-            email_connector = self.connector
-            logger.info("Sending email generation prompt to connector...")
-
-            # 5️⃣ Query LLM
-            connector_response = email_connector.send_query(email_prompt)
-            if not isinstance(connector_response, dict):
-                raise TypeError(f"Unexpected connector response type: {type(connector_response)}")
-
-            if connector_response.get("status") == "success":
-                llm_response_raw = connector_response.get("response").strip()
-     
-                try:
-                    llm_response = json.loads(llm_response_raw)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON from LLM: {e}")
-                    logger.debug(f"Raw LLM response: {llm_response_raw}")
-                    raise
-
-
-                email_body_text = llm_response.get("html_code")
-                email_subject = llm_response.get("email_subject")
-                if not email_body_text or not email_subject:
-                    raise ValueError("LLM response missing 'html_code' / 'email_subject'.")
-
-                # 6️⃣ Send email
-                if self.attach_cover_letter and self.cover_letter_path:
-                    email_status = send_email_with_attachment(
-                        self.receiver_email, email_subject, email_body_text, self.resume_path, self.cover_letter_path
-                    )
-                else:
-                    email_status = send_email_with_attachment(self.receiver_email, email_subject, email_body_text, self.resume_path)
-
-                logger.info(f"Email sent successfully: {email_status}")
-                return {"status": "success", "path": self.resume_path, "error_message": None}
-
-            # LLM responded with failure
-            error_msg = connector_response.get("error", "Unknown LLM error.")
-            logger.error(f"Connector failed: {error_msg}")
-            raise RuntimeError(error_msg)
+            email_subject, email_body_text = self.draft()
+            self.send(email_subject, email_body_text)
+            return {"status": "success", "path": self.resume_path, "error_message": None}
 
         except Exception as e:
             logger.error(f"Error occurred: {e}", exc_info=True)
@@ -112,6 +143,9 @@ class EmailAgent(BaseAgent):
                     "receiver_email": self.receiver_email,
                     "attach_cover_letter": self.attach_cover_letter,
                     "cover_letter_path": self.cover_letter_path,
+                    "resume_text": self.resume_text,
+                    "stream": self.stream,
+                    "progress_callback": self.progress_callback,
                     "diagnostic_run": True,
                     "diagnostic_config": {"type": "connector_reconfig", "diagnostic_connector": self.TASK_NAME}}
             retry_agent_factory = partial(EmailAgent, **agent_args)
@@ -0,0 +1,321 @@
+# agents/pipeline.py
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.file_utils import file_parser
+from core import error_handler
+from core.env import env_flag, env_int
+from core.logger import get_logger
+from .cover_letter_agent import CoverLetterAgent
+from .email_agent import EmailAgent
+from .resume_agent import ResumeAgent
+
+logger = get_logger(__name__)
+
+SUCCESS = "success"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# Stage names of the application pipeline
+PARSE = "parse"
+RESUME_LLM = "resume_llm"
+RESUME_COMPILE = "resume_compile"
+RESUME_TEXT = "resume_text"
+COVER_LETTER_LLM = "cover_letter_llm"
+COVER_LETTER_COMPILE = "cover_letter_compile"
+EMAIL_LLM = "email_llm"
+SEND = "send"
+
+
+@dataclass
+class Stage:
+    """
+    One node of a pipeline graph.
+    `func` receives the values of every stage completed so far, keyed by stage name.
+    On failure, `task` names the connector task whose diagnostic recovery runs
+    before the stage is retried (up to `retries` times). Retries call
+    `retry_func` when given, for stages whose failure is only fixed by redoing
+    upstream work (a compile fails the same way on the same LaTeX).
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    task: Optional[str] = None
+    retries: int = 1
+    retry_func: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    value: Any = None
+    error: Optional[str] = None
+    started_at: float = 0.0  # seconds since the pipeline started
+    duration: float = 0.0
+
+
+class StagePipeline:
+    """
+    Runs a DAG of stages on a thread pool: every stage starts as soon as all of
+    its dependencies succeeded, so independent stages (e.g. cover letter and
+    email drafting) overlap. A failed stage skips everything downstream of it.
+    """
+
+    def __init__(self, stages: Iterable[Stage], max_workers: Optional[int] = None):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate pipeline stage '{stage.name}'.")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            unknown = [d for d in stage.deps if d not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {unknown}")
+        self._check_acyclic()
+        self.max_workers = max_workers or env_int("PIPELINE_MAX_WORKERS", 4)
+
+    def _check_acyclic(self) -> None:
+        visiting, visited = set(), set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle through '{name}'.")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _run_stage(self, stage: Stage, inputs: Dict[str, Any], origin: float) -> StageResult:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            func = stage.retry_func if attempt and stage.retry_func else stage.func
+            try:
+                value = func(inputs)
+                status, error = SUCCESS, None
+                break
+            except Exception as e:
+                logger.error(f"Pipeline stage '{stage.name}' failed: {e}", exc_info=True)
+                if stage.task and attempt < stage.retries:
+                    attempt += 1
+                    recovery = error_handler.handle_error(error=e, task=stage.task)
+                    if recovery.get("status") == "success":
+                        logger.info(f"Retrying stage '{stage.name}' after recovery (attempt {attempt}).")
+                        continue
+                value, status, error = None, FAILED, str(e)
+                break
+
+        finished = time.monotonic()
+        return StageResult(stage.name, status, value, error, round(started - origin, 3), round(finished - started, 3))
+
+    def run(self, executor: Optional[ThreadPoolExecutor] = None) -> Dict[str, StageResult]:
+        """Run every stage once; returns results keyed by stage name, in completion order."""
+        pool = executor or ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        origin = time.monotonic()
+        results: Dict[str, StageResult] = {}
+        running: Dict[Future, Stage] = {}
+        submitted = set()
+
+        try:
+            while len(results) < len(self.stages):
+                for stage in self.stages.values():
+                    if stage.name in submitted:
+                        continue
+                    dep_results = [results.get(dep) for dep in stage.deps]
+                    failed = [r.name for r in dep_results if r is not None and r.status != SUCCESS]
+                    if failed:
+                        submitted.add(stage.name)
+                        results[stage.name] = StageResult(stage.name, SKIPPED, error=f"upstream failed: {', '.join(failed)}")
+                    elif all(r is not None for r in dep_results):
+                        submitted.add(stage.name)
+                        inputs = {name: r.value for name, r in results.items() if r.status == SUCCESS}
+                        running[pool.submit(self._run_stage, stage, inputs, origin)] = stage
+
+                if not running:
+                    # Everything left was skipped in this pass; loop again to propagate.
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    results[stage.name] = future.result()
+        finally:
+            if executor is None:
+                pool.shutdown(wait=True)
+
+        logger.info(f"Pipeline finished in {time.monotonic() - origin:.2f}s: "
+                    + ", ".join(f"{r.name}={r.status}" for r in results.values()))
+        return results
+
+
+def _limited(func: Callable[[Dict[str, Any]], Any], limit: Optional[threading.Semaphore]):
+    """Wrap a stage function so it holds `limit` (shared across pipelines) while running."""
+    if limit is None:
+        return func
+
+    def run(inputs: Dict[str, Any]) -> Any:
+        with limit:
+            return func(inputs)
+    return run
+
+
+def _regenerate(agent: Any) -> Any:
+    """Draft again without the response cache, which would serve the response that just failed."""
+    agent.bypass_cache = True
+    return agent.draft()
+
+
+def build_application_pipeline(
+    resume_file: str,
+    job_role: str,
+    company: str,
+    job_description: str,
+    receiver_email: Optional[str] = None,
+    cover_letter: bool = True,
+    draft_email: bool = False,
+    send_email: bool = False,
+    parallel_drafting: Optional[bool] = None,
+    resume_dir: Optional[str] = None,
+    cover_letter_dir: Optional[str] = None,
+    stream: Optional[bool] = None,
+    stage_limits: Optional[Dict[str, threading.Semaphore]] = None,
+    max_workers: Optional[int] = None,
+) -> StagePipeline:
+    """
+    Stage graph for one application:
+
+        parse -> resume_llm -> resume_compile ------------------------------+
+          |          |                                                      v
+          |          +--> resume_text --> cover_letter_llm -> compile ---> send
+          |                          +--> email_llm ---------------------> send
+          +--(parallel)--> cover_letter_llm / email_llm
+
+    By default the cover letter and email are drafted from the plain text of the
+    tailored resume LaTeX, overlapping its PDF compile (no PDF text extraction).
+    With parallel drafting (PARALLEL_DRAFTING=true) they are drafted from the
+    original resume while the tailored resume is generated, so the wall-clock
+    time approaches the longest single LLM call.
+    Retried drafts bypass the response cache, and a retried compile regenerates
+    its LaTeX first (downstream drafts keep the text of the first draft).
+    `stage_limits` maps stage names to semaphores shared across pipelines.
+    """
+    if parallel_drafting is None:
+        parallel_drafting = env_flag("PARALLEL_DRAFTING", False)
+    draft_email = draft_email or send_email
+    limits = stage_limits or {}
+
+    resume_agent = ResumeAgent(
+        resume_file=resume_file,
+        job_description=job_description,
+        job_role=job_role,
+        stream=stream,
+        output_dir=resume_dir,
+    )
+
+    def parse(_: Dict[str, Any]) -> Dict[str, str]:
+        if not os.path.exists(resume_file):
+            raise FileNotFoundError(f"Resume file not found: {resume_file}")
+        latex = file_parser.read_tex_file(resume_file)
+        if not latex.strip():
+            raise ValueError("Parsed resume content is empty.")
+        text = file_parser.latex_to_text(latex) if parallel_drafting else None
+        return {"latex": latex, "text": text}
+
+    def tailored_text(inputs: Dict[str, Any]) -> str:
+        text = ResumeAgent.to_text(inputs[RESUME_LLM])
+        if not text:
+            raise ValueError("Tailored resume LaTeX produced no text.")
+        return text
+
+    # Where downstream drafts get the resume from.
+    draft_source = PARSE if parallel_drafting else RESUME_TEXT
+
+    def resume_text(inputs: Dict[str, Any]) -> str:
+        return inputs[PARSE]["text"] if parallel_drafting else inputs[RESUME_TEXT]
+
+    stages: List[Stage] = [
+        Stage(PARSE, parse),
+        Stage(RESUME_LLM, lambda inputs: resume_agent.draft(), (PARSE,), task=ResumeAgent.TASK_NAME,
+              retry_func=lambda inputs: _regenerate(resume_agent)),
+        Stage(RESUME_COMPILE, lambda inputs: resume_agent.compile(inputs[RESUME_LLM]), (RESUME_LLM,),
+              task=ResumeAgent.TASK_NAME, retry_func=lambda inputs: resume_agent.compile(_regenerate(resume_agent))),
+    ]
+    if not parallel_drafting:
+        stages.append(Stage(RESUME_TEXT, tailored_text, (RESUME_LLM,)))
+    send_deps = [RESUME_COMPILE]
+
+    if cover_letter:
+        cover_letter_agent = CoverLetterAgent(
+            refined_resume_path=None,
+            job_role=job_role,
+            job_description=job_description,
+            company=company,
+            stream=stream,
+            output_dir=cover_letter_dir,
+        )
+
+        def draft_cover_letter(inputs: Dict[str, Any]) -> str:
+            cover_letter_agent.resume_text = resume_text(inputs)
+            return cover_letter_agent.draft()
+
+        def redraft_cover_letter(inputs: Dict[str, Any]) -> str:
+            cover_letter_agent.resume_text = resume_text(inputs)
+            return _regenerate(cover_letter_agent)
+
+        stages += [
+            Stage(COVER_LETTER_LLM, draft_cover_letter, (draft_source,), task=CoverLetterAgent.TASK_NAME,
+                  retry_func=redraft_cover_letter),
+            Stage(COVER_LETTER_COMPILE, lambda inputs: cover_letter_agent.compile(inputs[COVER_LETTER_LLM]),
+                  (COVER_LETTER_LLM,), task=CoverLetterAgent.TASK_NAME,
+                  retry_func=lambda inputs: cover_letter_agent.compile(_regenerate(cover_letter_agent))),
+        ]
+        send_deps.append(COVER_LETTER_COMPILE)
+
+    if draft_email:
+        email_agent = EmailAgent(
+            resume_path=None,
+            position=job_role,
+            job_description=job_description,
+            company=company,
+            receiver_email=receiver_email,
+            stream=stream,
+        )
+
+        def draft_email_stage(inputs: Dict[str, Any]) -> Tuple[str, str]:
+            email_agent.resume_text = resume_text(inputs)
+            return email_agent.draft()
+
+        def redraft_email(inputs: Dict[str, Any]) -> Tuple[str, str]:
+            email_agent.resume_text = resume_text(inputs)
+            return _regenerate(email_agent)
+
+        def send(inputs: Dict[str, Any]) -> str:
+            email_agent.resume_path = inputs[RESUME_COMPILE]
+            email_agent.cover_letter_path = inputs.get(COVER_LETTER_COMPILE)
+            email_agent.attach_cover_letter = bool(email_agent.cover_letter_path)
+            return email_agent.send(*inputs[EMAIL_LLM])
+
+        stages.append(Stage(EMAIL_LLM, draft_email_stage, (draft_source,), task=EmailAgent.TASK_NAME,
+                            retry_func=redraft_email))
+        if send_email:
+            if not receiver_email:
+                raise ValueError("receiver_email is required to send the application.")
+            stages.append(Stage(SEND, send, tuple(send_deps + [EMAIL_LLM])))
+
+    for stage in stages:
+        stage.func = _limited(stage.func, limits.get(stage.name))
+        if stage.retry_func:
+            stage.retry_func = _limited(stage.retry_func, limits.get(stage.name))
+
+    return StagePipeline(stages, max_workers=max_workers)
@@ -0,0 +1,214 @@
+# agents/prompt_budget.py
+"""
+Prompt compaction and token accounting.
+
+Inputs are compacted before the prompt is rendered:
+  - LaTeX sources lose comments and whitespace TeX ignores anyway (indentation,
+    trailing blanks, repeated spaces and blank lines), so the PDF is unchanged
+  - plain text (extracted resumes) has its whitespace collapsed
+  - job descriptions additionally lose EEO and benefits sentences, and
+    paragraphs under a benefits heading
+
+Every rendered prompt is measured with a local tokenizer, before and after
+compaction, against the task's budget ({TASK}_PROMPT_TOKEN_BUDGET, else
+PROMPT_TOKEN_BUDGET). Over-budget prompts are logged and counted, not cut.
+"""
+import os
+import re
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from core.env import env_flag, env_int
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TOKENIZER = "gpt2"
+DEFAULT_TOKEN_BUDGET = 8000
+# Characters per token used when no tokenizer can be loaded
+FALLBACK_CHARS_PER_TOKEN = 4
+
+
+# -----------------------------
+# Tokenizer
+# -----------------------------
+_tokenizer: Any = None
+_tokenizer_name: Optional[str] = None
+_tokenizer_lock = threading.Lock()
+
+
+def _get_tokenizer() -> Any:
+    """
+    Process-wide tokenizer (PROMPT_TOKENIZER, a Hugging Face name or local path),
+    loaded on first use. None if it cannot be loaded; counts are then estimated.
+    The default tokenizer is only used when it is already in the local Hugging
+    Face cache; only an explicitly configured one may be downloaded.
+    """
+    global _tokenizer, _tokenizer_name
+    if _tokenizer_name is None:
+        with _tokenizer_lock:
+            if _tokenizer_name is None:
+                configured = os.getenv("PROMPT_TOKENIZER", "").strip()
+                name = configured or DEFAULT_TOKENIZER
+                try:
+                    from transformers import AutoTokenizer
+
+                    # Prompts are only counted, never fed to a model, so no length limit applies
+                    _tokenizer = AutoTokenizer.from_pretrained(
+                        name, model_max_length=10**9, local_files_only=not configured
+                    )
+                    _tokenizer_name = name
+                    logger.info(f"Loaded tokenizer '{name}' for prompt accounting")
+                except Exception as e:
+                    logger.warning(f"Tokenizer '{name}' unavailable, estimating prompt tokens: {e}")
+                    _tokenizer_name = "estimate"
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return -(-len(text) // FALLBACK_CHARS_PER_TOKEN)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+# -----------------------------
+# Compaction
+# -----------------------------
+_VERBATIM = re.compile(r"\\begin\{(?:verbatim|Verbatim|lstlisting|minted)|\\verb\W")
+_COMMENT_LINE = re.compile(r"^[ \t]*%[^\n]*\n", re.M)
+# URL arguments are matched first and kept whole: '%' is literal there (%20).
+# Otherwise keeps the '%' itself: it still swallows the line end.
+_TRAILING_COMMENT = re.compile(
+    r"(?P<url>\\(?:href|url|nolinkurl)\s*\{[^{}\n]*\})|(?<!\\)(?P<escapes>(?:\\\\)*)%[^\n]*"
+)
+_LINE_EDGES = re.compile(r"^[ \t]+|[ \t]+$", re.M)
+_BLANK_RUNS = re.compile(r"[ \t]{2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+# Sentences that rarely say anything about the role itself
+_BOILERPLATE = re.compile(
+    r"equal (?:employment )?opportunity|affirmative action|without regard to (?:race|age|sex)"
+    r"|regardless of (?:race|age|gender)|reasonable accommodation|e-verify|protected veteran"
+    r"|401\(?k\)?|paid time off|dental(?:,| and) vision|parental leave",
+    re.I,
+)
+_BENEFITS_HEADING = re.compile(r"^\W*(?:benefits|perks|what we offer)\b", re.I)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# Sentence ends and line breaks (list items), kept by re.split as separators
+_SENTENCE_BREAK = re.compile(r"((?<=[.!?])[ \t]+|\n)")
+
+
+def _strip_comment(match: "re.Match") -> str:
+    if match.group("url"):
+        return match.group(0)
+    return match.group("escapes") + "%"
+
+
+def compaction_enabled() -> bool:
+    return env_flag("PROMPT_COMPACTION_ENABLED", True)
+
+
+def compact_text(text: str) -> str:
+    """Plain text with line-edge blanks trimmed and blank runs and blank lines collapsed."""
+    text = _LINE_EDGES.sub("", text.replace("\r\n", "\n"))
+    text = _BLANK_RUNS.sub(" ", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def compact_latex(source: str) -> str:
+    """
+    LaTeX source without comments or whitespace that TeX ignores. Sources with
+    verbatim material are only stripped of line-edge blanks, since spaces and
+    '%' are literal there.
+    """
+    source = source.replace("\r\n", "\n")
+    if _VERBATIM.search(source):
+        return _BLANK_LINES.sub("\n\n", re.sub(r"[ \t]+$", "", source, flags=re.M)).strip()
+    if "%" in source:
+        source = _COMMENT_LINE.sub("", source)
+        source = _TRAILING_COMMENT.sub(_strip_comment, source)
+    return compact_text(source)
+
+
+def _strip_boilerplate(paragraph: str) -> str:
+    """The paragraph without its boilerplate sentences; empty under a benefits heading."""
+    if _BENEFITS_HEADING.match(paragraph):
+        return ""
+    parts = _SENTENCE_BREAK.split(paragraph)
+    kept = []
+    for i in range(0, len(parts), 2):
+        if _BOILERPLATE.search(parts[i]):
+            continue
+        if kept:
+            kept.append(parts[i - 1])
+        kept.append(parts[i])
+    return "".join(kept).strip()
+
+
+def compact_job_description(text: str) -> str:
+    """Job description without boilerplate (EEO statements, benefits) sentences and sections."""
+    paragraphs = _PARAGRAPH_BREAK.split(compact_text(text))
+    kept = [stripped for stripped in map(_strip_boilerplate, paragraphs) if stripped]
+    # Never send an empty description because every paragraph looked generic
+    return "\n\n".join(kept) if kept else "\n\n".join(paragraphs)
+
+
+# -----------------------------
+# Accounting
+# -----------------------------
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def token_budget(task: str) -> int:
+    """{TASK}_PROMPT_TOKEN_BUDGET, falling back to PROMPT_TOKEN_BUDGET; 0 disables the check."""
+    return env_int(f"{task.upper()}_PROMPT_TOKEN_BUDGET", env_int("PROMPT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+
+def render_prompt(
+    task: str,
+    template: Any,
+    inputs: Mapping[str, Any],
+    compacted: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """
+    Render `template` (anything with .format(**inputs)) for `task`.
+
+    `compacted` holds compacted versions of some inputs; when compaction is on
+    they replace the originals. Token counts before and after are logged and
+    added to the task's statistics.
+    """
+    original = template.format(**inputs)
+    prompt = original
+    if compacted and compaction_enabled():
+        prompt = template.format(**{**inputs, **compacted})
+
+    before = count_tokens(original)
+    after = before if prompt is original else count_tokens(prompt)
+    budget = token_budget(task)
+    over = bool(budget) and after > budget
+
+    with _stats_lock:
+        stats = _stats.setdefault(task, {"calls": 0, "tokens_before": 0, "tokens_after": 0, "over_budget": 0})
+        stats["calls"] += 1
+        stats["tokens_before"] += before
+        stats["tokens_after"] += after
+        stats["over_budget"] += over
+
+    message = f"Prompt for '{task}': {before} -> {after} tokens (budget {budget or 'none'})"
+    if over:
+        logger.warning(f"{message}; over budget by {after - budget}")
+    else:
+        logger.info(message)
+    return prompt
+
+
+def get_prompt_stats() -> Dict[str, Any]:
+    """Per-task prompt token totals before and after compaction, and over-budget counts."""
+    with _stats_lock:
+        tasks = {task: dict(stats) for task, stats in _stats.items()}
+    for stats in tasks.values():
+        before = stats["tokens_before"]
+        stats["saved_ratio"] = round(1 - stats["tokens_after"] / before, 4) if before else 0.0
+    return {"tokenizer": _tokenizer_name, "tasks": tasks}
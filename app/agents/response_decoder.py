@@ -0,0 +1,176 @@
+# agents/response_decoder.py
+"""
+Tolerant decoding of the JSON objects the agents ask the LLM for.
+
+Cheapest first, each step only runs when the previous one failed:
+  1. json.loads on the response as received
+  2. markdown fences and prose around the outermost {...} removed
+  3. raw control characters (unescaped newlines, tabs) inside strings accepted
+  4. invalid backslash escapes repaired, i.e. unescaped LaTeX such as
+     \\section or \\usepackage, including commands that start like a valid
+     escape: \\textbf, \\begin, \\noindent, \\newline (otherwise decoded as
+     a control character followed by "extbf", "egin", "oindent", "ewline")
+  5. the requested top-level string fields pulled out with the streaming
+     parser, which tolerates anything after them
+
+A response that still cannot be decoded raises the original JSONDecodeError,
+so the error classifier sends it for regeneration as before.
+"""
+import json
+import re
+import threading
+from typing import Any, Dict, Iterable
+
+from app.connectors.stream_parser import JSONFieldStreamParser
+from app.file_utils.latex_sanitizer import KNOWN_COMMANDS
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_FENCE = re.compile(r"^\s*```[A-Za-z]*[ \t]*\n?(.*?)\n?```", re.S)
+# Every backslash with what it escapes. Valid escapes are consumed whole so an
+# escaped backslash is never re-read as the start of another escape. A \b, \f,
+# \r or \t directly followed by lowercase letters is a LaTeX command (\textbf,
+# \begin, \frac, \right) rather than a control character. \n is only taken
+# for a command when a known command name follows, since prose has plenty of
+# newlines followed by words. A \\ before whitespace, '[', a quote, another
+# escape or the end is a LaTeX line break (\\, \\[2pt]) and kept as two
+# backslashes; four in a row are an already escaped line break. A \\ before a
+# letter stays an escaped command backslash.
+_N_COMMANDS = sorted(
+    {cmd[1:] for cmd in KNOWN_COMMANDS if cmd.startswith("n")} | {"ewcommand", "olinebreak", "obreak"},
+    key=len,
+    reverse=True,
+)
+_ESCAPE = re.compile(
+    r'\\(?:(?P<latex>[btfr](?=[a-z]{2})|n(?=(?:' + "|".join(_N_COMMANDS) + r')(?![A-Za-z])))'
+    r'|(?P<escaped_break>\\\\\\)'
+    r'|(?P<linebreak>\\(?=[\s\["]|\\(?!\\)|\Z))'
+    r'|(?P<valid>["\\/bfnrt]|u[0-9a-fA-F]{4}))?'
+)
+
+_stats = {
+    "decoded": 0,
+    "clean": 0,
+    "fences": 0,
+    "surrounding_text": 0,
+    "control_characters": 0,
+    "invalid_escapes": 0,
+    "field_extraction": 0,
+    "failures": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _record(*keys: str) -> None:
+    with _stats_lock:
+        for key in keys:
+            _stats[key] += 1
+
+
+def _outermost_object(text: str) -> str:
+    """Text from the first '{' to the last '}', i.e. the JSON object without fences or prose."""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        return text
+    return text[start:end + 1]
+
+
+def _escape_backslash(match: "re.Match") -> str:
+    if match.group("valid") or match.group("escaped_break"):
+        return match.group(0)
+    if match.group("linebreak"):
+        return "\\" * 4
+    return "\\\\" + (match.group("latex") or "")
+
+
+def _repair_escapes(text: str) -> str:
+    """Escape every backslash that does not start a valid JSON escape."""
+    return _ESCAPE.sub(_escape_backslash, text) if "\\" in text else text
+
+
+def _extract_fields(text: str, fields: Iterable[str]) -> Dict[str, str]:
+    """Completed top-level string fields, read with the streaming parser."""
+    parser = JSONFieldStreamParser(fields)
+    parser.feed(text)
+    return {field: parser.values[field] for field in parser.completed}
+
+
+def decode_llm_json(raw: str, fields: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Decode the JSON object in an LLM response, repairing common formatting
+    mistakes instead of failing.
+
+    Args:
+        raw: The response text.
+        fields: Top-level string fields the caller needs; used by the last-resort
+            field extraction, which only succeeds if all of them are found.
+
+    Raises:
+        json.JSONDecodeError: If no step could decode the response.
+    """
+    fields = tuple(fields)
+    try:
+        result = json.loads(raw)
+        if isinstance(result, dict):
+            _record("decoded", "clean")
+            return result
+    except json.JSONDecodeError as e:
+        original_error = e
+    else:
+        original_error = json.JSONDecodeError("Expected a JSON object", raw, 0)
+
+    repairs = []
+    text = raw
+    fenced = _FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+        repairs.append("fences")
+    candidate = _outermost_object(text)
+    if candidate.strip() != text.strip():
+        repairs.append("surrounding_text")
+    text = candidate
+
+    attempts = [(text, [])]
+    repaired = _repair_escapes(text)
+    escape_repairs = ["invalid_escapes"] if repaired != text else []
+    if escape_repairs:
+        attempts.append((repaired, escape_repairs))
+
+    for candidate, extra in attempts:
+        # Raw control characters inside strings are only rejected in strict mode
+        for strict in (True, False):
+            try:
+                result = json.loads(candidate, strict=strict)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(result, dict):
+                applied = repairs + extra + ([] if strict else ["control_characters"])
+                _record("decoded", *applied)
+                logger.info(f"Decoded LLM JSON after repairs: {', '.join(applied)}")
+                return result
+
+    if fields:
+        values = _extract_fields(repaired, fields)
+        if all(field in values for field in fields):
+            applied = repairs + escape_repairs + ["field_extraction"]
+            _record("decoded", *applied)
+            logger.warning(f"Extracted fields {list(fields)} from malformed LLM JSON ({', '.join(applied)})")
+            return values
+
+    _record("failures")
+    logger.error(f"Failed to parse JSON from LLM: {original_error}")
+    logger.debug(f"Raw LLM response: {raw}")
+    raise original_error
+
+
+def get_decoder_stats() -> Dict[str, Any]:
+    """How often each repair was needed, and the share of responses decoded without a retry."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["decoded"] + stats["failures"]
+    stats["repaired"] = stats["decoded"] - stats["clean"]
+    stats["repaired_ratio"] = round(stats["repaired"] / total, 4) if total else 0.0
+    stats["success_ratio"] = round(stats["decoded"] / total, 4) if total else 0.0
+    return stats
@@ -2,11 +2,23 @@
 import os
 import json
 import re
-from typing import Optional, Dict, Any
-from app.file_utils import file_parser, pdf_generator
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable
+from app.file_utils import file_parser, latex_validator, pdf_generator
 from core.logger import get_logger
-from core.exceptions import DiagnosticToolError
+from core.exceptions import DiagnosticToolError, EditScriptError
 from .base_agent import BaseAgent
+from .prompt_budget import compact_job_description, compact_latex, compaction_enabled, render_prompt
+from .response_decoder import decode_llm_json
+from .resume_edits import (
+    EDITS,
+    apply_edit_script,
+    number_lines,
+    parse_edit_script,
+    record_edit_script,
+    record_fallback,
+    tailoring_mode,
+)
 from core.prompt_loader import PROMPTS
 from core import error_handler
 from app.connectors import get_connector 
@@ -18,6 +30,7 @@ logger = get_logger(__name__)
 class ResumeAgent(BaseAgent):
     TASK_NAME = "resume"
     PROMPT_KEY = "resume_generator"
+    EDIT_PROMPT_KEY = "resume_editor"
 
     def __init__(
         self,
@@ -25,12 +38,16 @@ class ResumeAgent(BaseAgent):
         job_description: str,
         job_role: str,
         diagnostic_run: Optional[bool] = True,
-        diagnostic_config: Optional[dict] = None
+        diagnostic_config: Optional[dict] = None,
+        stream: Optional[bool] = None,
+        progress_callback: Optional[Callable[[str, str], None]] = None,
+        output_dir: Optional[str] = None
     ):
-        super().__init__(diagnostic_run, diagnostic_config)
+        super().__init__(diagnostic_run, diagnostic_config, stream, progress_callback)
         self.resume_file = resume_file
         self.job_description = job_description
         self.job_role = job_role
+        self.output_dir = output_dir or os.getenv("RESUME_DIR", ".")
         self.connector = get_connector(self.TASK_NAME)
 
 
@@ -48,67 +65,157 @@ class ResumeAgent(BaseAgent):
 
 
 
-    def run(self) -> Dict[str, Any]:
-        try:
-            # 1️⃣ Parse resume
-            if not os.path.exists(self.resume_file):
-                raise FileNotFoundError(f"Resume file not found: {self.resume_file}")
-            parsed_resume = file_parser.read_tex_file(self.resume_file)
-            if not parsed_resume.strip():
-                raise ValueError("Parsed resume content is empty.")
+    def draft(self) -> str:
+        """Parse the resume, query the LLM and return the tailored LaTeX source."""
+        # 1️⃣ Parse resume
+        if not os.path.exists(self.resume_file):
+            raise FileNotFoundError(f"Resume file not found: {self.resume_file}")
+        parsed_resume = file_parser.read_tex_file(self.resume_file)
+        if not parsed_resume.strip():
+            raise ValueError("Parsed resume content is empty.")
+
+
 
+        if self.PROMPT_KEY not in PROMPTS:
+            raise ValueError(f"Prompt '{self.PROMPT_KEY}' not found.")
+        prompt_template = PROMPTS[self.PROMPT_KEY] 
 
 
-            if self.PROMPT_KEY not in PROMPTS:
-                raise ValueError(f"Prompt '{self.PROMPT_KEY}' not found.")
-            prompt_template = PROMPTS[self.PROMPT_KEY] 
+        #safe_resume = self.escape_latex_content(parsed_resume)
+        safe_jd = self.escape_latex_content(self.job_description)
 
+        # Comments, whitespace TeX ignores and JD boilerplate are not sent to the LLM
+        compacted = {}
+        if compaction_enabled():
+            compacted = {
+                "resume_latex_code": compact_latex(parsed_resume),
+                "job_description": self.escape_latex_content(compact_job_description(self.job_description)),
+            }
+
+        if tailoring_mode() == EDITS:
+            try:
+                return self.draft_edits(parsed_resume, safe_jd, compacted)
+            except (EditScriptError, json.JSONDecodeError) as e:
+                # The full regeneration below is the fallback
+                record_fallback()
+                logger.warning(f"Edit-script tailoring failed, regenerating the full resume: {e}")
+  
+        #safe_jd = self.escape_curly_braces(self.job_description)
+        #safe_resume = parsed_resume
+        #safe_jd = self.job_description
+        
+        resume_prompt = render_prompt(
+            self.TASK_NAME,
+            prompt_template,
+            {"resume_latex_code": parsed_resume, "job_description": safe_jd, "position": self.job_role},
+            compacted,
+        )
+        
+        # 4️⃣ Connector
 
-            #safe_resume = self.escape_latex_content(parsed_resume)
-            safe_jd = self.escape_latex_content(self.job_description)
-      
-            #safe_jd = self.escape_curly_braces(self.job_description)
-            #safe_resume = parsed_resume
-            #safe_jd = self.job_description
-            
-            resume_prompt = prompt_template.format(resume_latex_code=parsed_resume, job_description=safe_jd, position=self.job_role)
-            
-            # 4️⃣ Connector
+        resume_connector = self.get_connector()
+        logger.info("Sending resume generation prompt to connector...")
 
-            resume_connector = self.connector
-            logger.info("Sending resume generation prompt to connector...")
+        os.makedirs(self.output_dir, exist_ok=True)
+        # A retry drafts again; the previous draft file is no longer needed
+        self.discard_draft()
+        # Streaming mode writes the LaTeX to a draft .tex while it arrives
+        self.draft_path = os.path.join(self.output_dir, f"resume_draft_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.tex")
 
+        try:
             # 5️⃣ Query LLM
-            connector_response = resume_connector.send_query(resume_prompt)
+            connector_response = self.query_llm(
+                resume_connector,
+                resume_prompt,
+                stream_fields=("latex_code",),
+                draft_path=self.draft_path,
+                draft_field="latex_code",
+            )
             if not isinstance(connector_response, dict):
                 raise TypeError(f"Unexpected connector response type: {type(connector_response)}")
 
             if connector_response.get("status") == "success":
                 llm_response_raw = connector_response.get("response").strip()
-                try:
-                    safe_json_str = llm_response_raw.replace("\\", "\\\\")
-                    llm_response = json.loads(llm_response_raw)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON from LLM: {e}")
-                    logger.debug(f"Raw LLM response: {llm_response_raw}")
-                    raise
-                   
-
-                latex_code = llm_response["latex_code"]
+                # Fences, prose and unescaped LaTeX backslashes are repaired instead of regenerating
+                llm_response = decode_llm_json(llm_response_raw, fields=("latex_code",))
+
+                latex_code = llm_response.get("latex_code")
                 if not latex_code:
                     raise ValueError("LLM response missing 'latex_code'.")
-
-                # Generate PDF
-                resume_dir = os.getenv("RESUME_DIR", ".")
-                os.makedirs(resume_dir, exist_ok=True)
-                refined_resume_path = pdf_generator.generate_pdf(latex_code, "resume", resume_dir)
-                logger.info(f"Refined resume generated: {refined_resume_path}")
-                return {"status": "success", "path": refined_resume_path, "error_message": None}
+                return latex_code
 
             # Fail
             error_msg = connector_response.get("error", "Unknown LLM error.")
             logger.error(f"Connector failed: {error_msg}")
             raise RuntimeError(error_msg)
+        except Exception:
+            self.discard_draft()
+            raise
+
+    def draft_edits(self, parsed_resume: str, safe_jd: str, compacted: Dict[str, str]) -> str:
+        """Ask the LLM for an edit script only and apply it to the original LaTeX."""
+        if self.EDIT_PROMPT_KEY not in PROMPTS:
+            raise ValueError(f"Prompt '{self.EDIT_PROMPT_KEY}' not found.")
+        # Line numbers refer to the source the LLM sees, so edits apply to the compacted source
+        source = compacted.get("resume_latex_code", parsed_resume)
+        edit_prompt = render_prompt(
+            self.TASK_NAME,
+            PROMPTS[self.EDIT_PROMPT_KEY],
+            {"resume_latex_code": number_lines(parsed_resume), "job_description": safe_jd, "position": self.job_role},
+            {**compacted, "resume_latex_code": number_lines(source)},
+        )
+
+        logger.info("Sending resume edit-script prompt to connector...")
+        connector_response = self.query_llm(self.get_connector(), edit_prompt)
+        if not isinstance(connector_response, dict):
+            raise TypeError(f"Unexpected connector response type: {type(connector_response)}")
+        if connector_response.get("status") != "success":
+            error_msg = connector_response.get("error", "Unknown LLM error.")
+            logger.error(f"Connector failed: {error_msg}")
+            raise RuntimeError(error_msg)
+
+        llm_response_raw = connector_response.get("response").strip()
+        edits = parse_edit_script(decode_llm_json(llm_response_raw))
+        latex_code = apply_edit_script(source, edits)
+
+        # An edit script must not break a resume that was valid to begin with
+        if latex_validator.validation_enabled():
+            problems = latex_validator.validate_latex(latex_code)
+            if problems and not latex_validator.validate_latex(source):
+                raise EditScriptError(f"Edited resume failed validation: {problems[0]}")
+
+        record_edit_script(len(llm_response_raw), len(latex_code))
+        logger.info(f"Applied {len(edits)} edits to the resume ({len(llm_response_raw)} characters from the LLM)")
+        return latex_code
+
+    def compile(self, latex_code: str) -> str:
+        """Compile the tailored LaTeX to PDF and return its path."""
+        try:
+            # Structural errors fail here, before a pdflatex run is spent on them
+            latex_validator.check_latex(latex_code)
+            refined_resume_path = pdf_generator.generate_pdf(latex_code, "resume", self.output_dir)
+        finally:
+            # Compiled or not, the streamed draft has served its purpose
+            self.discard_draft()
+        logger.info(f"Refined resume generated: {refined_resume_path}")
+        return refined_resume_path
+
+    @staticmethod
+    def to_text(latex_code: str) -> Optional[str]:
+        """Plain text of the tailored resume; None if conversion fails (callers then parse the PDF)."""
+        try:
+            return file_parser.latex_to_text(latex_code) or None
+        except Exception as e:
+            logger.warning(f"LaTeX to text conversion failed, downstream agents will parse the PDF: {e}")
+            return None
+
+    def run(self) -> Dict[str, Any]:
+        try:
+            latex_code = self.draft()
+            refined_resume_path = self.compile(latex_code)
+            # Plain text of the tailored resume, so downstream agents need not re-parse the PDF
+            resume_text = self.to_text(latex_code)
+            return {"status": "success", "path": refined_resume_path, "text": resume_text, "error_message": None}
 
         except Exception as e:
             logger.error(f"Error occurred: {e}", exc_info=True)
@@ -116,6 +223,9 @@ class ResumeAgent(BaseAgent):
                     "resume_file": self.resume_file,
                     "job_description": self.job_description,
                     "job_role": self.job_role,
+                    "output_dir": self.output_dir,
+                    "stream": self.stream,
+                    "progress_callback": self.progress_callback,
                     "diagnostic_run": True,
                     "diagnostic_config": {
                     "type": "connector_reconfig",
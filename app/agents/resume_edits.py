@@ -0,0 +1,147 @@
+# agents/resume_edits.py
+"""
+Edit-script tailoring: the LLM returns a few line edits instead of the whole
+resume, and they are applied to the original LaTeX here.
+
+An edit names a line of the numbered source, text found on that line and its
+replacement. If the text is not on that line it must occur exactly once in
+the document; anything ambiguous, missing or structurally unsafe raises
+EditScriptError so the caller can fall back to full regeneration.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from core.exceptions import EditScriptError
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+FULL = "full"
+EDITS = "edits"
+TAILORING_MODES = (FULL, EDITS)
+
+BEGIN_DOCUMENT = "\\begin{document}"
+
+_stats = {
+    "edit_scripts": 0,
+    "edits_applied": 0,
+    "relocated": 0,
+    "fallbacks": 0,
+    # Characters the LLM returned for edit scripts vs. the documents they produced
+    "response_chars": 0,
+    "document_chars": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _record(**counts: int) -> None:
+    with _stats_lock:
+        for key, value in counts.items():
+            _stats[key] += value
+
+
+def tailoring_mode() -> str:
+    """RESUME_TAILORING_MODE: 'full' regenerates the whole resume, 'edits' asks for an edit script."""
+    mode = os.getenv("RESUME_TAILORING_MODE", FULL).strip().lower()
+    if mode not in TAILORING_MODES:
+        logger.warning(f"Unknown RESUME_TAILORING_MODE '{mode}'; using {FULL}.")
+        return FULL
+    return mode
+
+
+@dataclass(frozen=True)
+class ResumeEdit:
+    line: int
+    find: str
+    replace: str
+
+
+def number_lines(source: str) -> str:
+    """The source with every line prefixed by its 1-based number, as shown to the LLM."""
+    return "\n".join(f"{number}| {line}" for number, line in enumerate(source.splitlines(), 1))
+
+
+def parse_edit_script(response: Dict[str, Any]) -> List[ResumeEdit]:
+    """Edits from the decoded LLM response; raises EditScriptError on a malformed script."""
+    raw_edits = response.get("edits")
+    if not isinstance(raw_edits, list):
+        raise EditScriptError("LLM response missing an 'edits' list.")
+
+    edits = []
+    for index, raw in enumerate(raw_edits):
+        if not isinstance(raw, dict):
+            raise EditScriptError(f"Edit {index} is not an object.")
+        line, find, replace = raw.get("line"), raw.get("find"), raw.get("replace")
+        if isinstance(line, str) and line.strip().isdigit():
+            line = int(line)
+        if not isinstance(line, int) or not isinstance(find, str) or not isinstance(replace, str) or not find:
+            raise EditScriptError(f"Edit {index} needs an integer 'line' and string 'find'/'replace'.")
+        # Anchors copied together with the line-number prefix
+        prefix = f"{line}| "
+        if find.startswith(prefix) and replace.startswith(prefix):
+            find, replace = find[len(prefix):], replace[len(prefix):]
+        edits.append(ResumeEdit(line, find, replace))
+    return edits
+
+
+def _check_edit(edit: ResumeEdit) -> None:
+    """An edit may restyle text, not change the document structure."""
+    for token in ("\\begin", "\\end", "\\documentclass", "\\usepackage"):
+        if edit.find.count(token) != edit.replace.count(token):
+            raise EditScriptError(f"Edit on line {edit.line} adds or removes {token}.")
+    if edit.find.count("{") - edit.find.count("}") != edit.replace.count("{") - edit.replace.count("}"):
+        raise EditScriptError(f"Edit on line {edit.line} unbalances braces: {edit.replace!r}")
+
+
+def apply_edit_script(source: str, edits: List[ResumeEdit]) -> str:
+    """
+    Apply `edits` in order to `source` and return the tailored document.
+
+    Each edit replaces the first occurrence of `find` on its line. When the
+    line number is off, an occurrence that is unique in the document is used
+    instead. Edits in the preamble are rejected.
+    """
+    lines = source.splitlines(keepends=True)
+    body_start = next((i for i, line in enumerate(lines) if BEGIN_DOCUMENT in line), 0)
+    relocated = 0
+
+    for edit in edits:
+        _check_edit(edit)
+        index = edit.line - 1
+        if not (0 <= index < len(lines) and edit.find in lines[index]):
+            matches = [i for i, line in enumerate(lines) if edit.find in line]
+            if len(matches) != 1 or lines[matches[0]].count(edit.find) != 1:
+                found = "not found" if not matches else "ambiguous"
+                raise EditScriptError(f"Edit anchor for line {edit.line} {found}: {edit.find!r}")
+            index = matches[0]
+            relocated += 1
+        if index < body_start:
+            raise EditScriptError(f"Edit on line {edit.line} touches the preamble.")
+        lines[index] = lines[index].replace(edit.find, edit.replace, 1)
+
+    result = "".join(lines)
+    _record(edits_applied=len(edits), relocated=relocated)
+    return result
+
+
+def record_edit_script(response_chars: int, document_chars: int) -> None:
+    """Count an applied edit script with the size of the LLM output and of the resulting document."""
+    _record(edit_scripts=1, response_chars=response_chars, document_chars=document_chars)
+
+
+def record_fallback() -> None:
+    _record(fallbacks=1)
+
+
+def get_edit_stats() -> Dict[str, Any]:
+    """Edit-script usage, fallbacks to full regeneration, and LLM output size relative to full documents."""
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    attempts = stats["edit_scripts"] + stats["fallbacks"]
+    stats["fallback_ratio"] = round(stats["fallbacks"] / attempts, 4) if attempts else 0.0
+    stats["output_ratio"] = (
+        round(stats["response_chars"] / stats["document_chars"], 4) if stats["document_chars"] else 0.0
+    )
+    return stats
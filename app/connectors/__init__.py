@@ -5,11 +5,21 @@ from .openai_connector import OpenAIConnector
 from .hf_connector import HuggingFaceConnector   
 from .http_connector import HTTPConnector   
 from .factory import get_connector      
+from .stream_parser import JSONFieldStreamParser
+from .response_cache import get_cache_stats
+from .rate_limiter import get_rate_limiter_stats
+from .circuit_breaker import get_circuit_breaker_stats
+from .hedging import get_hedge_stats
 
 __all__ = [
     "BaseConnector",
     "OpenAIConnector",
     "HuggingFaceConnector",
     "HTTPConnector",
-    "get_connector"
+    "get_connector",
+    "JSONFieldStreamParser",
+    "get_cache_stats",
+    "get_rate_limiter_stats",
+    "get_circuit_breaker_stats",
+    "get_hedge_stats"
 ]
@@ -1,6 +1,7 @@
 # connectors/base_connector.py
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 class BaseConnector(ABC):
     """
@@ -16,6 +17,62 @@ class BaseConnector(ABC):
         """
         pass
 
+    def stream_query(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """
+        Yield the response text in chunks as the model produces it.
+        Reached through send_query(prompt, stream=True). Connectors without
+        native streaming fall back to yielding the complete response once.
+        """
+        result = self.send_query(prompt, **kwargs)
+        if not isinstance(result, dict) or result.get("status") != "success":
+            error = result.get("error") if isinstance(result, dict) else None
+            raise RuntimeError(error or "Unknown LLM error.")
+        yield result.get("response") or ""
+
+    async def asend_query(self, prompt: str, **kwargs: Any) -> str:
+        """
+        Non-blocking counterpart of send_query, returning the same structure.
+        Built-in connectors override this with native async clients; the default
+        runs send_query in a worker thread so third-party connectors keep working.
+        """
+        return await asyncio.to_thread(self.send_query, prompt, **kwargs)
+
+    async def aclose(self) -> None:
+        """Release async client resources, if any."""
+        return None
+
     def __repr__(self) -> str:
         """Readable identifier for debugging/logging."""
         return f"<{self.__class__.__name__}>"
+
+
+class ConnectorWrapper(BaseConnector):
+    """
+    Base class for connectors that decorate another connector (caching,
+    rate limiting, failover...). Calls are delegated to the wrapped connector
+    and unknown attributes (model_name, api_url, ...) resolve on it too.
+    """
+
+    def __init__(self, inner: BaseConnector):
+        self.inner = inner
+
+    def send_query(self, prompt: str, **kwargs: Any):
+        return self.inner.send_query(prompt, **kwargs)
+
+    def stream_query(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        return self.inner.stream_query(prompt, **kwargs)
+
+    async def asend_query(self, prompt: str, **kwargs: Any):
+        return await self.inner.asend_query(prompt, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails; guard against recursion before __init__.
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.inner!r}>"
@@ -0,0 +1,176 @@
+# connectors/circuit_breaker.py
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from core.env import env_number
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one connector configuration.
+
+    - CLOSED: calls flow; outcomes go into a rolling window. The circuit opens once
+      the window holds `min_calls` outcomes and the error rate or slow-call rate
+      reaches its threshold.
+    - OPEN: calls are rejected immediately until `open_duration` has elapsed.
+    - HALF_OPEN: up to `half_open_max_calls` probe calls are let through; a success
+      closes the circuit, a failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_threshold: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.5,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+
+        self._window: deque = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.open_duration:
+            self._state = HALF_OPEN
+            self._half_open_in_flight = 0
+            logger.info(f"Circuit '{self.name}' half-open: allowing probe call.")
+
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed; every allowed call must be followed by a record_* call."""
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        slow = self.slow_call_threshold is not None and latency >= self.slow_call_threshold
+        with self._lock:
+            self.stats["calls"] += 1
+            if slow:
+                self.stats["slow_calls"] += 1
+
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if slow:
+                    self._trip("slow probe call")
+                else:
+                    self._state = CLOSED
+                    self._window.clear()
+                    logger.info(f"Circuit '{self.name}' closed after successful probe.")
+                return
+
+            self._window.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["failures"] += 1
+
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._trip("failed probe call")
+                return
+
+            slow = self.slow_call_threshold is not None and latency is not None and latency >= self.slow_call_threshold
+            self._window.append((True, slow))
+            self._evaluate()
+
+    def release(self) -> None:
+        """Account for an allowed call that was cancelled before producing an outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def _evaluate(self) -> None:
+        if self._state != CLOSED or len(self._window) < self.min_calls:
+            return
+
+        total = len(self._window)
+        error_rate = sum(1 for failed, _ in self._window if failed) / total
+        slow_rate = sum(1 for _, slow in self._window if slow) / total
+
+        if error_rate >= self.error_rate_threshold:
+            self._trip(f"error rate {error_rate:.0%}")
+        elif self.slow_call_threshold is not None and slow_rate >= self.slow_call_rate_threshold:
+            self._trip(f"slow-call rate {slow_rate:.0%}")
+
+    def _trip(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        self.stats["opened"] += 1
+        logger.warning(f"Circuit '{self.name}' opened ({reason}); failing fast for {self.open_duration}s.")
+
+    def get_stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            stats = dict(self.stats)
+        stats["state"] = state
+        return stats
+
+
+# Breakers are shared per connector configuration and survive connector reloads.
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the shared breaker for a connector configuration, configured from CIRCUIT_BREAKER_* env."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=name,
+                window_size=env_number("CIRCUIT_BREAKER_WINDOW", 20, int),
+                min_calls=env_number("CIRCUIT_BREAKER_MIN_CALLS", 5, int),
+                error_rate_threshold=env_number("CIRCUIT_BREAKER_ERROR_RATE", 0.5),
+                slow_call_threshold=env_number("CIRCUIT_BREAKER_SLOW_CALL_IN_SECS", None),
+                slow_call_rate_threshold=env_number("CIRCUIT_BREAKER_SLOW_CALL_RATE", 0.5),
+                open_duration=env_number("CIRCUIT_BREAKER_OPEN_IN_SECS", 30.0),
+                half_open_max_calls=env_number("CIRCUIT_BREAKER_HALF_OPEN_CALLS", 1, int),
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def get_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_stats() for breaker in breakers}
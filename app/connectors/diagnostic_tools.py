@@ -4,6 +4,7 @@ import time
 import logging
 from typing import Optional
 from app.connectors.factory import get_connector
+from core.env import env_int
 
 logger = logging.getLogger(__name__)
 
@@ -104,7 +105,7 @@ def retry_after_delay(delay: Optional[int] = None):
     Retries a function after a delay.
     """
     if delay is None:
-        delay = int(os.getenv("DIAGNOSTIC_TOOL_DELAY_IN_SECS", 5))
+        delay = env_int("DIAGNOSTIC_TOOL_DELAY_IN_SECS", 5)
 
     logger.info(f"Retrying operation after {delay} seconds...")
     time.sleep(delay)
@@ -112,39 +113,55 @@ def retry_after_delay(delay: Optional[int] = None):
 
 
 # -----------------------------
-# Tool Registration for LangChain
+# Tool Registration
 # -----------------------------
-from langchain.agents import Tool
-
-LANGCHAIN_TOOLS = [
-    Tool(
-        name="FailoverSwitchConnector",
-        func=switch_connector,
-        description="Switch to a different connector/provider (e.g., HuggingFace ↔ OpenAI ↔ HTTP).",
+# name -> (function, description). LangChain Tool objects are only built when
+# the diagnostic agent is first needed, which keeps langchain off the import path.
+TOOL_REGISTRY = {
+    "FailoverSwitchConnector": (
+        switch_connector,
+        "Switch to a different connector/provider (e.g., HuggingFace ↔ OpenAI ↔ HTTP).",
     ),
-    Tool(
-        name="FailoverSwitchConfig",
-        func=switch_config,
-        description="Switch connector configuration (URL, model name, API key) within the same provider.",
+    "FailoverSwitchConfig": (
+        switch_config,
+        "Switch connector configuration (URL, model name, API key) within the same provider.",
     ),
-    Tool(
-        name="FailoverSwitchModel",
-        func=switch_model,
-        description="Switch to an alternate model name on the same provider.",
+    "FailoverSwitchModel": (
+        switch_model,
+        "Switch to an alternate model name on the same provider.",
     ),
-    Tool(
-        name="FailoverSwitchToken",
-        func=switch_token,
-        description="Rotate API token/credentials for the task.",
+    "FailoverSwitchToken": (
+        switch_token,
+        "Rotate API token/credentials for the task.",
     ),
-    Tool(
-        name="FailoverSwitchUrl",
-        func=switch_url,
-        description="Point the task to an alternate endpoint URL for the same provider.",
+    "FailoverSwitchUrl": (
+        switch_url,
+        "Point the task to an alternate endpoint URL for the same provider.",
     ),
-    Tool(
-        name="RetryAfterDelay",
-        func=retry_after_delay,
-        description="Retry operation with a delay (default 5 seconds).",
+    "RetryAfterDelay": (
+        retry_after_delay,
+        "Retry operation with a delay (default 5 seconds).",
     ),
-]
+}
+
+_langchain_tools = None
+
+
+def get_langchain_tools():
+    """Build (once) the LangChain Tool wrappers handed to the diagnostic agent."""
+    global _langchain_tools
+    if _langchain_tools is None:
+        from langchain.agents import Tool
+
+        _langchain_tools = [
+            Tool(name=name, func=func, description=description)
+            for name, (func, description) in TOOL_REGISTRY.items()
+        ]
+    return _langchain_tools
+
+
+def __getattr__(name):
+    # Keeps `from app.connectors.diagnostic_tools import LANGCHAIN_TOOLS` working.
+    if name == "LANGCHAIN_TOOLS":
+        return get_langchain_tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
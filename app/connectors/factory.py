@@ -1,8 +1,14 @@
 # connectors/factory.py
 import os
-from typing import Dict, Optional, Type
+from functools import partial
+from typing import Dict, List, Optional, Type
 from app.connectors.base_connector import BaseConnector
 from app.connectors import hf_connector, openai_connector, http_connector
+from app.connectors.response_cache import CachedConnector, CachePolicy
+from app.connectors.rate_limiter import RateLimitedConnector, get_rate_limiter, DEFAULT_EXPECTED_OUTPUT_TOKENS
+from app.connectors.failover import FailoverCandidate, FailoverConnector
+from app.connectors.hedging import HedgePolicy
+from core.env import env_flag, env_number
 from core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -10,6 +16,9 @@ logger = get_logger(__name__)
 # Cache single connector instance per task
 _connector_instances: Dict[str, BaseConnector] = {}
 
+# Parameters that have _ALT variants in env (see diagnostic_tools)
+ALT_PARAMS = ["URL", "TOKEN", "MODEL"]
+
 
 class ConnectorFactory:
     """
@@ -19,6 +28,13 @@ class ConnectorFactory:
 
     _registry: Dict[str, Type[BaseConnector]] = {}
 
+    # Canonical connector name → env prefix for its settings
+    _env_prefix: Dict[str, str] = {
+        "huggingface": "HUGGINGFACE_CON",
+        "openai": "OPENAI_CON",
+        "http": "HTTP_CON",
+    }
+
     # Alias → canonical connector name map
     _canonical_map: Dict[str, str] = {
         "hf": "huggingface",
@@ -33,6 +49,12 @@ class ConnectorFactory:
         cls._registry[name.lower()] = connector_cls
         logger.debug(f"Registered connector type: {name}")
 
+    @classmethod
+    def canonical_type(cls, connector_type: str) -> str:
+        """Normalize a connector type or alias (e.g. 'hf') to its registered name."""
+        connector_type = connector_type.strip().lower()
+        return cls._canonical_map.get(connector_type, connector_type)
+
     @staticmethod
     def _get_env_var(base_name: str, alt_config: bool, allowlist: list[str], default: Optional[str]):
         """Helper for resolving environment variables with optional _ALT suffix."""
@@ -46,6 +68,40 @@ class ConnectorFactory:
         logger.debug(f"Resolved env {env_key} → {value}")
         return value
 
+    @classmethod
+    def has_alt_config(cls, canon_type: str) -> bool:
+        """True if any {PREFIX}_*_ALT variable is set for this connector type."""
+        prefix = cls._env_prefix.get(canon_type, canon_type.upper())
+        return any(
+            name.startswith(f"{prefix}_") and name.endswith("_ALT") and value.strip()
+            for name, value in os.environ.items()
+        )
+
+    @classmethod
+    def _apply_rate_limit(
+        cls,
+        canon_type: str,
+        connector: BaseConnector,
+        base_url: Optional[str],
+        api_key: Optional[str]
+    ) -> BaseConnector:
+        """
+        Wrap the connector with the shared limiter for its provider/base URL/API key.
+        Limits come from {PREFIX}_RPM, {PREFIX}_TPM and {PREFIX}_MAX_IN_FLIGHT; unset limits are not enforced,
+        but provider Retry-After / rate-limit headers are always honoured.
+        """
+        prefix = cls._env_prefix.get(canon_type, canon_type.upper())
+        limiter = get_rate_limiter(
+            provider=canon_type,
+            base_url=base_url,
+            api_key=api_key,
+            rpm=env_number(f"{prefix}_RPM", None, float),
+            tpm=env_number(f"{prefix}_TPM", None, float),
+            max_in_flight=env_number(f"{prefix}_MAX_IN_FLIGHT", None, int),
+        )
+        expected_output = env_number(f"{prefix}_EXPECTED_OUTPUT_TOKENS", None, int) or DEFAULT_EXPECTED_OUTPUT_TOKENS
+        return RateLimitedConnector(connector, limiter, expected_output_tokens=expected_output)
+
     @classmethod
     def create_connector(
         cls,
@@ -59,7 +115,7 @@ class ConnectorFactory:
         connector_type = connector_type.strip().lower()
 
         # Normalize alias to canonical connector type
-        canon_type = cls._canonical_map.get(connector_type, connector_type)
+        canon_type = cls.canonical_type(connector_type)
 
         if canon_type not in cls._registry:
             raise ValueError(f"Unsupported connector type '{connector_type}'.")
@@ -74,9 +130,10 @@ class ConnectorFactory:
             if not token or not model:
                 raise ValueError("HUGGINGFACE_CON_TOKEN and HUGGINGFACE_CON_MODEL must be set in env.")
 
-            return cls._registry[canon_type](
+            connector = cls._registry[canon_type](
                 token=token, model=model, provider=provider, api_url=api_url
             )
+            return cls._apply_rate_limit(canon_type, connector, api_url, token)
 
         # --- OpenAI Connector ---
         elif canon_type == "openai":
@@ -87,7 +144,14 @@ class ConnectorFactory:
             if not api_key or not model:
                 raise ValueError("OPENAI_CON_API_TOKEN and OPENAI_CON_MODEL must be set in env.")
 
-            return cls._registry[canon_type](base_url=base_url, api_key=api_key, model_name=model)
+            connector = cls._registry[canon_type](
+                base_url=base_url,
+                api_key=api_key,
+                model_name=model,
+                timeout=env_number("OPENAI_CON_TIMEOUT_IN_SECS", None, float),
+                pool_size=env_number("OPENAI_CON_POOL_SIZE", None, int),
+            )
+            return cls._apply_rate_limit(canon_type, connector, base_url, api_key)
 
         # --- HTTP Connector ---
         elif canon_type == "http":
@@ -98,11 +162,77 @@ class ConnectorFactory:
             if not api_url or not api_token:
                 raise ValueError("HTTP_CON_URL and HTTP_CON_API_TOKEN must be set in env.")
 
-            return cls._registry[canon_type](api_url=api_url, api_token=api_token, model_name=model)
+            connector = cls._registry[canon_type](
+                api_url=api_url,
+                api_token=api_token,
+                model_name=model,
+                timeout=env_number("HTTP_CON_TIMEOUT_IN_SECS", None, float),
+                pool_size=env_number("HTTP_CON_POOL_SIZE", None, int),
+                connect_retries=env_number("HTTP_CON_CONNECT_RETRIES", None, int),
+                gzip_min_bytes=env_number("HTTP_CON_GZIP_MIN_BYTES", None, int),
+            )
+            return cls._apply_rate_limit(canon_type, connector, api_url, api_token)
 
         raise ValueError(f"No factory handler for connector type '{connector_type}'.")
 
 
+def _candidate_label(canon_type: str, alt_config: bool, alt_param_allowlist: list[str]) -> str:
+    if not alt_config or not alt_param_allowlist:
+        return canon_type
+    if sorted(p.upper() for p in alt_param_allowlist) == sorted(ALT_PARAMS):
+        return f"{canon_type}[alt]"
+    return f"{canon_type}[alt:{','.join(sorted(p.upper() for p in alt_param_allowlist))}]"
+
+
+def _failover_chain(
+    task: str,
+    connector_type: str,
+    alt_config: bool,
+    alt_param_allowlist: list[str],
+    default: Optional[str]
+) -> List[FailoverCandidate]:
+    """
+    Ordered connector configurations for a task: the requested one first, then (unless
+    CIRCUIT_BREAKER_FAILOVER=false) its _ALT config and the CONNECTOR_PRECEDENCE providers.
+    """
+    canon_type = ConnectorFactory.canonical_type(connector_type)
+    specs = [(canon_type, alt_config, alt_param_allowlist)]
+
+    if env_flag("CIRCUIT_BREAKER_FAILOVER", True):
+        if not alt_config and ConnectorFactory.has_alt_config(canon_type):
+            specs.append((canon_type, True, ALT_PARAMS))
+
+        precedence = [p.strip() for p in os.getenv("CONNECTOR_PRECEDENCE", "").split(",") if p.strip()]
+        for other in precedence:
+            other_type = ConnectorFactory.canonical_type(other)
+            if other_type == canon_type or other_type not in ConnectorFactory._registry:
+                continue
+            specs.append((other_type, False, []))
+            if ConnectorFactory.has_alt_config(other_type):
+                specs.append((other_type, True, ALT_PARAMS))
+
+    candidates: List[FailoverCandidate] = []
+    seen = set()
+    for spec_type, spec_alt, spec_allowlist in specs:
+        label = _candidate_label(spec_type, spec_alt, spec_allowlist)
+        if label in seen:
+            continue
+        seen.add(label)
+        candidates.append(FailoverCandidate(
+            label,
+            partial(
+                ConnectorFactory.create_connector,
+                connector_type=spec_type,
+                alt_config=spec_alt,
+                alt_param_allowlist=spec_allowlist,
+                default=default
+            ),
+        ))
+
+    logger.debug(f"Failover chain for task '{task}': {[c.label for c in candidates]}")
+    return candidates
+
+
 def get_connector(
     task: str,
     reload: bool = False,
@@ -114,6 +244,11 @@ def get_connector(
     """
     Factory access function.
     Returns cached connector instance per task (unless reload=True).
+    Layers, outermost first:
+      - LLM response cache, governed by the task's CachePolicy
+      - circuit-breaker failover down the CONNECTOR_PRECEDENCE / _ALT chain,
+        optionally hedging slow calls to the next candidate
+      - per-provider rate limiter (applied by ConnectorFactory)
     """
     key = task.lower()
     alt_param_allowlist = alt_param_allowlist or []
@@ -130,12 +265,16 @@ def get_connector(
     if not connector_type:
         raise ValueError(f"No connector type configured for task '{task}'.")
 
-    # Create connector via the factory
-    connector = ConnectorFactory.create_connector(
-        connector_type=connector_type,
-        alt_config=alt_config,
-        alt_param_allowlist=alt_param_allowlist,
-        default=default
+    # Create connector via the factory, behind per-config circuit breakers
+    connector = FailoverConnector(
+        task,
+        _failover_chain(task, connector_type, alt_config, alt_param_allowlist, default),
+        hedge_policy=HedgePolicy.for_task(task),
+    )
+    connector = CachedConnector(
+        connector,
+        connector_type=ConnectorFactory.canonical_type(connector_type),
+        policy=CachePolicy.for_task(task),
     )
 
     _connector_instances[key] = connector
@@ -0,0 +1,340 @@
+# connectors/failover.py
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .base_connector import BaseConnector, ConnectorWrapper
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker
+from .hedging import HedgePolicy, get_hedge_executor, get_latency_tracker
+from core.logger import get_logger
+from core.exceptions import CircuitOpenError
+
+logger = get_logger(__name__)
+
+
+class FailoverCandidate:
+    """One entry of a failover chain: a connector configuration plus its circuit breaker."""
+
+    def __init__(self, label: str, factory: Callable[[], BaseConnector], breaker: Optional[CircuitBreaker] = None):
+        self.label = label
+        self.factory = factory
+        self.breaker = breaker or get_circuit_breaker(label)
+        self._connector: Optional[BaseConnector] = None
+        self.unavailable_reason: Optional[str] = None
+
+    def get(self) -> BaseConnector:
+        """Build the connector on first use; configuration errors mark the candidate unavailable."""
+        if self._connector is None:
+            self._connector = self.factory()
+        return self._connector
+
+    def __repr__(self) -> str:
+        return f"<FailoverCandidate {self.label} state={self.breaker.state}>"
+
+
+class _CallClock:
+    """When a call began running. Hedge executor calls set it from the worker, so queueing is not counted."""
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = started_at
+        self.started = threading.Event()
+        if started_at is not None:
+            self.started.set()
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        self.started.set()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at if self.started_at is not None else 0.0
+
+
+class FailoverConnector(ConnectorWrapper):
+    """
+    Routes calls down an ordered chain of connector configurations
+    (primary, its _ALT config, then the CONNECTOR_PRECEDENCE providers).
+
+    Candidates whose circuit is open are skipped without a network call, so a
+    provider that is down costs one fast fail instead of a diagnostic round-trip.
+    Attribute lookups (model_name, ...) resolve on the primary connector.
+
+    With hedging enabled, a non-streaming call that has not answered within the
+    candidate's observed latency percentile is duplicated to the next candidate
+    (budget permitting); the first successful answer wins and the other call is
+    cancelled (async) or abandoned (sync).
+    """
+
+    def __init__(self, task: str, candidates: List[FailoverCandidate], hedge_policy: Optional[HedgePolicy] = None):
+        if not candidates:
+            raise ValueError(f"No connector candidates configured for task '{task}'.")
+        self.task = task
+        self.candidates = candidates
+        self.hedge_policy = hedge_policy
+        # Build the primary eagerly so misconfiguration surfaces exactly as before.
+        super().__init__(candidates[0].get())
+
+    def _available(self) -> Iterator[tuple]:
+        """Yield (candidate, connector) pairs whose circuit admits a call."""
+        for candidate in self.candidates:
+            if candidate.unavailable_reason:
+                continue
+            if not candidate.breaker.allow_request():
+                logger.info(f"Skipping connector '{candidate.label}' for task '{self.task}': circuit open.")
+                continue
+            try:
+                connector = candidate.get()
+            except Exception as exc:
+                candidate.unavailable_reason = str(exc)
+                candidate.breaker.record_failure()
+                logger.warning(f"Connector '{candidate.label}' unavailable for failover: {exc}")
+                continue
+            yield candidate, connector
+
+    def _exhausted(self, last_error: Optional[BaseException], last_result: Any):
+        if last_error is not None:
+            raise last_error
+        if last_result is not None:
+            return last_result
+        raise CircuitOpenError(
+            f"All connectors for task '{self.task}' are unavailable: "
+            + ", ".join(f"{c.label}={c.breaker.state}" for c in self.candidates)
+        )
+
+    @staticmethod
+    def _succeeded(result: Any) -> bool:
+        return isinstance(result, dict) and result.get("status") == "success"
+
+    @property
+    def hedging(self) -> bool:
+        return self.hedge_policy is not None and self.hedge_policy.enabled and len(self.candidates) > 1
+
+    def _record_outcome(self, candidate: FailoverCandidate, clock: _CallClock, future) -> None:
+        """Done-callback feeding the breaker and latency tracker, also for calls that lost a hedge race."""
+        if future.cancelled() or clock.started_at is None:
+            candidate.breaker.release()
+            return
+        latency = clock.elapsed()
+        if future.exception() is None and self._succeeded(future.result()):
+            candidate.breaker.record_success(latency)
+            get_latency_tracker(candidate.label).record(latency)
+        else:
+            candidate.breaker.record_failure(latency)
+
+    def _hedge_delay(self, pending: Dict[Any, FailoverCandidate], hedged: bool) -> Optional[float]:
+        """Wait bound for the in-flight call; None once a hedge was considered or several calls race."""
+        if hedged or len(pending) != 1:
+            return None
+        return self.hedge_policy.delay_for(next(iter(pending.values())).label)
+
+    def _abandon(self, pending: Dict[Any, FailoverCandidate], spare: Optional[tuple]) -> None:
+        for future, candidate in pending.items():
+            logger.info(f"Cancelling hedged call to '{candidate.label}' for task '{self.task}'.")
+            future.cancel()
+        if spare is not None:
+            spare[0].breaker.release()
+
+    def _hedged_send_query(self, prompt: str, **kwargs: Any):
+        budget = self.hedge_policy.budget
+        budget.record_request()
+        available = self._available()
+        pending: Dict[Future, FailoverCandidate] = {}
+        clocks: Dict[Future, _CallClock] = {}
+        spare: Optional[tuple] = None
+        hedge_future, hedged = None, False
+        last_error, last_result = None, None
+
+        def launch(candidate: FailoverCandidate, connector: BaseConnector) -> Future:
+            clock = _CallClock()
+
+            def call():
+                clock.start()
+                return connector.send_query(prompt, **kwargs)
+
+            future = get_hedge_executor().submit(call)
+            # Also wakes the hedge timer for a call that never got to run
+            future.add_done_callback(lambda _: clock.started.set())
+            future.add_done_callback(partial(self._record_outcome, candidate, clock))
+            pending[future] = candidate
+            clocks[future] = clock
+            return future
+
+        while True:
+            if not pending:
+                nxt, spare = spare or next(available, None), None
+                if nxt is None:
+                    break
+                launch(*nxt)
+
+            delay = self._hedge_delay(pending, hedged)
+            if delay is not None:
+                # The hedge timer runs from when the call started, not from when it was queued
+                clock = clocks[next(iter(pending))]
+                clock.started.wait()
+                delay = max(0.0, delay - clock.elapsed())
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                spare = next(available, None)
+                if spare is not None and budget.try_acquire():
+                    slow = next(iter(pending.values())).label
+                    logger.info(f"Hedging task '{self.task}': '{slow}' is slow, also asking '{spare[0].label}'.")
+                    hedge_future, spare = launch(*spare), None
+                continue
+
+            for future in done:
+                candidate = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    logger.warning(f"Connector '{candidate.label}' failed for task '{self.task}': {exc}")
+                    last_error = exc
+                    continue
+
+                if self._succeeded(result):
+                    self._abandon(pending, spare)
+                    if future is hedge_future:
+                        budget.record_hedge_win()
+                    if candidate is not self.candidates[0]:
+                        logger.info(f"Task '{self.task}' served by failover connector '{candidate.label}'.")
+                    return result
+                last_result = result
+
+        return self._exhausted(last_error, last_result)
+
+    async def _hedged_asend_query(self, prompt: str, **kwargs: Any):
+        budget = self.hedge_policy.budget
+        budget.record_request()
+        available = self._available()
+        pending: Dict[asyncio.Task, FailoverCandidate] = {}
+        spare: Optional[tuple] = None
+        hedge_task, hedged = None, False
+        last_error, last_result = None, None
+
+        def launch(candidate: FailoverCandidate, connector: BaseConnector) -> asyncio.Task:
+            task = asyncio.ensure_future(connector.asend_query(prompt, **kwargs))
+            task.add_done_callback(partial(self._record_outcome, candidate, _CallClock(time.monotonic())))
+            pending[task] = candidate
+            return task
+
+        try:
+            while True:
+                if not pending:
+                    nxt, spare = spare or next(available, None), None
+                    if nxt is None:
+                        break
+                    launch(*nxt)
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=self._hedge_delay(pending, hedged), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    spare = next(available, None)
+                    if spare is not None and budget.try_acquire():
+                        slow = next(iter(pending.values())).label
+                        logger.info(f"Hedging task '{self.task}': '{slow}' is slow, also asking '{spare[0].label}'.")
+                        hedge_task, spare = launch(*spare), None
+                    continue
+
+                for task in done:
+                    candidate = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as exc:
+                        logger.warning(f"Connector '{candidate.label}' failed for task '{self.task}': {exc}")
+                        last_error = exc
+                        continue
+
+                    if self._succeeded(result):
+                        if task is hedge_task:
+                            budget.record_hedge_win()
+                        return result
+                    last_result = result
+        finally:
+            # Also runs when the caller is cancelled: no call outlives the hedge.
+            self._abandon(pending, spare)
+
+        return self._exhausted(last_error, last_result)
+
+    def send_query(self, prompt: str, stream: bool = False, **kwargs: Any):
+        if stream:
+            return self.stream_query(prompt, **kwargs)
+        if self.hedging:
+            return self._hedged_send_query(prompt, **kwargs)
+
+        last_error, last_result = None, None
+        for candidate, connector in self._available():
+            start = time.monotonic()
+            try:
+                result = connector.send_query(prompt, **kwargs)
+            except Exception as exc:
+                candidate.breaker.record_failure(time.monotonic() - start)
+                logger.warning(f"Connector '{candidate.label}' failed for task '{self.task}': {exc}")
+                last_error = exc
+                continue
+
+            if self._succeeded(result):
+                candidate.breaker.record_success(time.monotonic() - start)
+                if candidate is not self.candidates[0]:
+                    logger.info(f"Task '{self.task}' served by failover connector '{candidate.label}'.")
+                return result
+
+            candidate.breaker.record_failure(time.monotonic() - start)
+            last_result = result
+
+        return self._exhausted(last_error, last_result)
+
+    def stream_query(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        last_error = None
+        for candidate, connector in self._available():
+            start = time.monotonic()
+            started = False
+            try:
+                for chunk in connector.send_query(prompt, stream=True, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as exc:
+                candidate.breaker.record_failure(time.monotonic() - start)
+                if started:
+                    # Output already reached the caller; switching providers would corrupt it.
+                    raise
+                logger.warning(f"Connector '{candidate.label}' failed to stream for task '{self.task}': {exc}")
+                last_error = exc
+                continue
+
+            candidate.breaker.record_success(time.monotonic() - start)
+            return
+
+        self._exhausted(last_error, None)
+
+    async def asend_query(self, prompt: str, **kwargs: Any):
+        if self.hedging:
+            return await self._hedged_asend_query(prompt, **kwargs)
+
+        last_error, last_result = None, None
+        for candidate, connector in self._available():
+            start = time.monotonic()
+            try:
+                result = await connector.asend_query(prompt, **kwargs)
+            except Exception as exc:
+                candidate.breaker.record_failure(time.monotonic() - start)
+                logger.warning(f"Connector '{candidate.label}' failed for task '{self.task}': {exc}")
+                last_error = exc
+                continue
+
+            if self._succeeded(result):
+                candidate.breaker.record_success(time.monotonic() - start)
+                return result
+
+            candidate.breaker.record_failure(time.monotonic() - start)
+            last_result = result
+
+        return self._exhausted(last_error, last_result)
+
+    async def aclose(self) -> None:
+        for candidate in self.candidates:
+            if candidate._connector is not None:
+                await candidate._connector.aclose()
@@ -0,0 +1,165 @@
+# connectors/hedging.py
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from core.env import env_flag, env_number
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_DELAY_IN_SECS = 15.0
+DEFAULT_MIN_DELAY_IN_SECS = 1.0
+DEFAULT_BUDGET = 0.1
+DEFAULT_BUDGET_BURST = 1.0
+DEFAULT_MAX_WORKERS = 16
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one connector configuration."""
+
+    def __init__(self, window_size: int = 200):
+        self._samples: deque = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, pct: float, min_samples: int) -> Optional[float]:
+        """Nearest-rank percentile, or None until `min_samples` latencies have been seen."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples or len(samples) < min_samples:
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgeBudget:
+    """
+    Caps hedged (duplicate) requests to a fraction of primary requests.
+    Every primary request earns `ratio` tokens, up to `burst`; a hedge spends one.
+    """
+
+    def __init__(self, ratio: float, burst: float = DEFAULT_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "hedges": 0, "denied": 0, "hedge_wins": 0}
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.ratio <= 0 or self._tokens < 1.0:
+                self.stats["denied"] += 1
+                return False
+            self._tokens -= 1.0
+            self.stats["hedges"] += 1
+            return True
+
+    def record_hedge_win(self) -> None:
+        with self._lock:
+            self.stats["hedge_wins"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["tokens"] = round(self._tokens, 3)
+        stats["hedge_ratio"] = round(stats["hedges"] / stats["requests"], 4) if stats["requests"] else 0.0
+        return stats
+
+
+@dataclass
+class HedgePolicy:
+    """Per-task hedging settings; disabled unless HEDGE_ENABLED / {TASK}_HEDGE_ENABLED is set."""
+    task: str
+    enabled: bool
+    percentile: float
+    min_samples: int
+    default_delay: float
+    min_delay: float
+
+    @classmethod
+    def for_task(cls, task: str) -> "HedgePolicy":
+        prefix = task.upper()
+        return cls(
+            task=task.lower(),
+            enabled=env_flag(f"{prefix}_HEDGE_ENABLED", env_flag("HEDGE_ENABLED", False)),
+            percentile=env_number("HEDGE_PERCENTILE", DEFAULT_PERCENTILE),
+            min_samples=env_number("HEDGE_MIN_SAMPLES", DEFAULT_MIN_SAMPLES, int),
+            default_delay=env_number("HEDGE_DEFAULT_DELAY_IN_SECS", DEFAULT_DELAY_IN_SECS),
+            min_delay=env_number("HEDGE_MIN_DELAY_IN_SECS", DEFAULT_MIN_DELAY_IN_SECS),
+        )
+
+    @property
+    def budget(self) -> HedgeBudget:
+        return get_hedge_budget(self.task)
+
+    def delay_for(self, label: str) -> float:
+        """How long to wait on `label` before hedging: its observed latency percentile, or the default."""
+        observed = get_latency_tracker(label).percentile(self.percentile, self.min_samples)
+        if observed is None:
+            return self.default_delay
+        return max(self.min_delay, observed)
+
+
+# Trackers and budgets are shared per configuration / task and survive connector reloads.
+_trackers: Dict[str, LatencyTracker] = {}
+_budgets: Dict[str, HedgeBudget] = {}
+_registry_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_latency_tracker(label: str) -> LatencyTracker:
+    with _registry_lock:
+        tracker = _trackers.get(label)
+        if tracker is None:
+            tracker = _trackers[label] = LatencyTracker()
+        return tracker
+
+
+def get_hedge_budget(task: str) -> HedgeBudget:
+    """Budget for a task from {TASK}_HEDGE_BUDGET (fraction of extra requests), else HEDGE_BUDGET."""
+    key = task.lower()
+    with _registry_lock:
+        budget = _budgets.get(key)
+        if budget is None:
+            ratio = env_number(f"{key.upper()}_HEDGE_BUDGET", env_number("HEDGE_BUDGET", DEFAULT_BUDGET))
+            budget = _budgets[key] = HedgeBudget(ratio, env_number("HEDGE_BUDGET_BURST", DEFAULT_BUDGET_BURST))
+        return budget
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """Shared pool for hedged synchronous calls; an abandoned call keeps its worker until it returns."""
+    global _executor
+    with _registry_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=env_number("HEDGE_MAX_WORKERS", DEFAULT_MAX_WORKERS, int),
+                thread_name_prefix="llm-hedge",
+            )
+        return _executor
+
+
+def get_hedge_stats() -> Dict[str, Any]:
+    """Hedge budgets per task plus sample counts of the latency trackers."""
+    with _registry_lock:
+        budgets = dict(_budgets)
+        trackers = dict(_trackers)
+    return {
+        "budgets": {task: budget.get_stats() for task, budget in budgets.items()},
+        "latency_samples": {label: len(tracker) for label, tracker in trackers.items()},
+    }
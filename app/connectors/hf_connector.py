@@ -1,4 +1,4 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator
 from huggingface_hub import InferenceClient
 from .base_connector import BaseConnector
 from core.logger import get_logger
@@ -29,6 +29,7 @@ class HuggingFaceConnector(BaseConnector):
         self.provider = provider
         self.api_url = api_url
         self._client: Optional[InferenceClient] = None
+        self._async_client = None
 
     def _get_client(self) -> InferenceClient:
         """
@@ -53,13 +54,49 @@ class HuggingFaceConnector(BaseConnector):
             logger.critical(f"Failed to initialize Hugging Face client: {exc}", exc_info=True)
             raise HuggingFaceConnectorError("Client initialization failed.") from exc
 
-    def send_query(self, prompt: str, model: Optional[str] = None) -> Dict[str, Optional[str]]:
+    def _get_async_client(self):
+        """
+        Lazily initialize and cache the AsyncInferenceClient instance.
+        Imported on first use since the async client needs the optional aiohttp extra.
+        """
+        if self._async_client:
+            return self._async_client
+
+        try:
+            from huggingface_hub import AsyncInferenceClient
+
+            if self.api_url:
+                self._async_client = AsyncInferenceClient(
+                    api_key=self.token,
+                    base_url=self.api_url
+                )
+            else:
+                self._async_client = AsyncInferenceClient(api_key=self.token)
+
+            return self._async_client
+
+        except Exception as exc:
+            logger.critical(f"Failed to initialize async Hugging Face client: {exc}", exc_info=True)
+            raise HuggingFaceConnectorError("Async client initialization failed.") from exc
+
+    @staticmethod
+    def _to_result(completion) -> Dict[str, Optional[str]]:
+        """Convert a chat completion into the connector response structure."""
+        if completion and getattr(completion, "choices", None):
+            response_text = completion.choices[0].message.content.strip()
+            return {"status": "success", "response": response_text, "error": None}
+
+        logger.error("Empty or invalid completion response from Hugging Face API.")
+        return {"status": "fail", "response": None, "error": "Empty or invalid completion response from Hugging Face API."}
+
+    def send_query(self, prompt: str, model: Optional[str] = None, stream: bool = False):
         """
         Sends a prompt to the Hugging Face Inference API and returns a structured response.
 
         Args:
             prompt (str): User prompt or input text.
             model (Optional[str]): Optional model override.
+            stream (bool): If True, return an iterator of text chunks instead (see stream_query).
 
         Returns:
             dict: {
@@ -68,6 +105,9 @@ class HuggingFaceConnector(BaseConnector):
                 "error": str or None
             }
         """
+        if stream:
+            return self.stream_query(prompt, model=model)
+
         model_to_use = model or self.model
         client = self._get_client()
 
@@ -76,14 +116,62 @@ class HuggingFaceConnector(BaseConnector):
                 model=model_to_use,
                 messages=[{"role": "user", "content": prompt}]
             )
+            return self._to_result(completion)
+
+        except Exception as exc:
+            logger.exception("Hugging Face API request failed.")
+            raise HuggingFaceConnectorError(f"Failed to get response from Hugging Face API: {exc}")
+
+    def stream_query(self, prompt: str, model: Optional[str] = None) -> Iterator[str]:
+        """
+        Streams a chat completion, yielding content deltas as they arrive.
+
+        Raises:
+            HuggingFaceConnectorError: On any API or client failure, including mid-stream.
+        """
+        model_to_use = model or self.model
+        client = self._get_client()
+
+        try:
+            completion_stream = client.chat.completions.create(
+                model=model_to_use,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True
+            )
+            for chunk in completion_stream:
+                choices = getattr(chunk, "choices", None)
+                if choices and choices[0].delta and choices[0].delta.content:
+                    yield choices[0].delta.content
 
-            if completion and getattr(completion, "choices", None):
-                response_text = completion.choices[0].message.content.strip()
-                return {"status": "success", "response": response_text, "error": None}
+        except Exception as exc:
+            logger.exception("Hugging Face API streaming request failed.")
+            raise HuggingFaceConnectorError(f"Failed to stream response from Hugging Face API: {exc}")
 
-            logger.error("Empty or invalid completion response from Hugging Face API.")
-            return {"status": "fail", "response": None, "error": "Empty or invalid completion response from Hugging Face API."}
+    async def asend_query(self, prompt: str, model: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """
+        Async variant of send_query using the native AsyncInferenceClient.
+
+        Raises:
+            HuggingFaceConnectorError: On any API or client failure.
+        """
+        model_to_use = model or self.model
+        client = self._get_async_client()
+
+        try:
+            completion = await client.chat.completions.create(
+                model=model_to_use,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return self._to_result(completion)
 
         except Exception as exc:
             logger.exception("Hugging Face API request failed.")
             raise HuggingFaceConnectorError(f"Failed to get response from Hugging Face API: {exc}")
+
+    async def aclose(self) -> None:
+        """Close the async client's HTTP session."""
+        if self._async_client:
+            close = getattr(self._async_client, "close", None)
+            if close:
+                await close()
+            self._async_client = None
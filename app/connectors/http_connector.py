@@ -1,30 +1,118 @@
+import gzip
+import json
+from typing import Iterator, Optional
+import httpx
 import requests
 from .base_connector import BaseConnector
+from .session_pool import DEFAULT_POOL_SIZE, get_session
 from core.logger import get_logger
 from core.exceptions import HTTPConnectorError
 
 logger = get_logger(__name__)
 
+DEFAULT_TIMEOUT_IN_SECS = 30.0
+
 
 class HTTPConnector(BaseConnector):
     """
     A connector for interacting with custom HTTP-based LLM APIs.
     It expects a JSON response that may follow OpenAI-style or custom schema.
+    Requests go through a pooled keep-alive session shared per API host.
     """
 
-    def __init__(self, api_url: str, api_token: str, model_name: str):
+    def __init__(
+        self,
+        api_url: str,
+        api_token: str,
+        model_name: str,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        connect_retries: Optional[int] = None,
+        gzip_min_bytes: Optional[int] = None,
+    ):
         """
         Initializes the HTTP connector with URL, token, and model name.
+
+        Args:
+            timeout (float): Per-request timeout in seconds (default 30).
+            pool_size (int): Keep-alive connections kept per host.
+            connect_retries (int): Retries for failed connection attempts.
+            gzip_min_bytes (int): Gzip request bodies at least this large (0/None disables).
         """
         self.api_url = api_url
         self.api_token = api_token
         self.model_name = model_name
+        self.timeout = timeout or DEFAULT_TIMEOUT_IN_SECS
+        self.gzip_min_bytes = gzip_min_bytes or 0
         self.headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
+        self.pool_size = pool_size
+        self.session = get_session(self.api_url, pool_size=pool_size, connect_retries=connect_retries)
+        self._async_client: Optional[httpx.AsyncClient] = None
 
-    def send_query(self, prompt: str, temperature: float = 0.7):
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Lazily initialize and cache the httpx AsyncClient.
+        Its connection pool is bound to the event loop that first uses it.
+        """
+        if self._async_client:
+            return self._async_client
+
+        size = self.pool_size or DEFAULT_POOL_SIZE
+        self._async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+            timeout=self.timeout,
+        )
+        return self._async_client
+
+    def _encode_payload(self, payload: dict):
+        """Serialize the payload, gzip-compressing it when it crosses the size threshold."""
+        body = json.dumps(payload).encode("utf-8")
+        headers = dict(self.headers)
+
+        if self.gzip_min_bytes and len(body) >= self.gzip_min_bytes:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+
+        return body, headers
+
+    def _build_payload(self, prompt: str, temperature: float) -> dict:
+        return {
+            "prompt": prompt,
+            "model": self.model_name,
+            "temperature": temperature
+        }
+
+    @staticmethod
+    def _to_result(data) -> dict:
+        """Map an OpenAI-style or simple JSON body onto the connector response structure."""
+        # Handle OpenAI-style response
+        if isinstance(data, dict) and "choices" in data and data["choices"]:
+            message = data["choices"][0].get("message", {})
+            content = message.get("content", "")
+            return {"status": "success", "response": content.strip(), "error": None}
+
+        # Handle simpler response structure
+        elif isinstance(data, dict) and "response" in data:
+            return {"status": "success", "response": data["response"], "error": None}
+
+        logger.error("Empty or invalid response structure received from API.")
+        return {"status": "fail", "response": None, "error": "Empty or invalid response structure received from API."}
+
+    @staticmethod
+    def _extract_stream_delta(data) -> str:
+        """Pull the text delta out of one streamed event (OpenAI-style or simple schema)."""
+        if not isinstance(data, dict):
+            return ""
+        if data.get("choices"):
+            choice = data["choices"][0]
+            delta = choice.get("delta") or choice.get("message") or {}
+            return delta.get("content") or choice.get("text") or ""
+        return data.get("response") or ""
+
+    def send_query(self, prompt: str, temperature: float = 0.7, stream: bool = False):
         """
         Sends a prompt to the configured HTTP API endpoint.
         Returns the model's response in a structured format.
@@ -32,45 +120,117 @@ class HTTPConnector(BaseConnector):
         Args:
             prompt (str): Input text to send to the API.
             temperature (float): Sampling temperature for generation.
+            stream (bool): If True, return an iterator of text chunks instead (see stream_query).
 
         Returns:
             dict: {
                 "status": "success" or "fail",
                 "response": str or None,
-                "error": str or None
+                "error": str or None,
+                "headers": response headers (used for rate-limit tracking)
             }
 
         Raises:
             HTTPConnectorError: On any network or response error.
         """
-        payload = {
-            "prompt": prompt,
-            "model": self.model_name,
-            "temperature": temperature
-        }
+        if stream:
+            return self.stream_query(prompt, temperature=temperature)
+
+        payload = self._build_payload(prompt, temperature)
 
         try:
-            response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=30)
+            body, headers = self._encode_payload(payload)
+            response = self.session.post(self.api_url, headers=headers, data=body, timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
+            result = self._to_result(response.json())
+            result["headers"] = dict(response.headers)
+            return result
 
-            # Handle OpenAI-style response
-            if isinstance(data, dict) and "choices" in data and data["choices"]:
-                message = data["choices"][0].get("message", {})
-                content = message.get("content", "")
-                return {"status": "success", "response": content.strip(), "error": None}
+        except requests.exceptions.RequestException as e:
+            logger.exception("HTTP request failed while connecting to LLM API.")
+            raise HTTPConnectorError(f"HTTP request failed: {e}") from e
 
-            # Handle simpler response structure
-            elif isinstance(data, dict) and "response" in data:
-                return {"status": "success", "response": data["response"], "error": None}
+        except ValueError as e:
+            logger.exception("Invalid JSON response received from API.")
+            raise HTTPConnectorError(f"Invalid JSON response: {e}") from e
 
-            logger.error("Empty or invalid response structure received from API.")
-            return {"status": "fail", "response": None, "error": "Empty or invalid response structure received from API."}
+    def stream_query(self, prompt: str, temperature: float = 0.7) -> Iterator[str]:
+        """
+        Streams the response, accepting server-sent events ("data: {...}") or
+        newline-delimited JSON. Servers that ignore the stream flag and answer
+        with a single JSON body are yielded as one chunk.
+
+        Raises:
+            HTTPConnectorError: On any network or response error, including mid-stream.
+        """
+        payload = self._build_payload(prompt, temperature)
+        payload["stream"] = True
+
+        try:
+            body, headers = self._encode_payload(payload)
+            with self.session.post(
+                self.api_url, headers=headers, data=body, timeout=self.timeout, stream=True
+            ) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "")
+
+                if "event-stream" not in content_type and "ndjson" not in content_type:
+                    result = self._to_result(response.json())
+                    if result["status"] != "success":
+                        raise HTTPConnectorError(result["error"])
+                    yield result["response"]
+                    return
+
+                for raw_line in response.iter_lines():
+                    # Decode explicitly: requests assumes latin-1 for text/* without a charset.
+                    line = raw_line.decode("utf-8").strip()
+                    if not line or line.startswith(":"):
+                        # Blank separator or SSE comment / keep-alive
+                        continue
+                    if line.startswith("data:"):
+                        line = line[len("data:"):].strip()
+                    if line == "[DONE]":
+                        break
+                    delta = self._extract_stream_delta(json.loads(line))
+                    if delta:
+                        yield delta
 
         except requests.exceptions.RequestException as e:
+            logger.exception("HTTP streaming request failed while connecting to LLM API.")
+            raise HTTPConnectorError(f"HTTP request failed: {e}") from e
+
+        except ValueError as e:
+            logger.exception("Invalid JSON event received from streaming API.")
+            raise HTTPConnectorError(f"Invalid JSON response: {e}") from e
+
+    async def asend_query(self, prompt: str, temperature: float = 0.7):
+        """
+        Async variant of send_query using a non-blocking httpx client.
+
+        Raises:
+            HTTPConnectorError: On any network or response error.
+        """
+        payload = self._build_payload(prompt, temperature)
+        client = self._get_async_client()
+
+        try:
+            body, headers = self._encode_payload(payload)
+            response = await client.post(self.api_url, headers=headers, content=body)
+            response.raise_for_status()
+            result = self._to_result(response.json())
+            result["headers"] = dict(response.headers)
+            return result
+
+        except httpx.HTTPError as e:
             logger.exception("HTTP request failed while connecting to LLM API.")
             raise HTTPConnectorError(f"HTTP request failed: {e}") from e
 
         except ValueError as e:
             logger.exception("Invalid JSON response received from API.")
             raise HTTPConnectorError(f"Invalid JSON response: {e}") from e
+
+    async def aclose(self) -> None:
+        """Close the async client's connection pool."""
+        if self._async_client:
+            await self._async_client.aclose()
+            self._async_client = None
@@ -1,65 +1,168 @@
-from openai import OpenAI
+from typing import Iterator, Optional
+from openai import AsyncOpenAI, OpenAI
 from .base_connector import BaseConnector
+from .session_pool import get_httpx_client
 from core.logger import get_logger
 from core.exceptions import OpenAIConnectorError
 
 logger = get_logger(__name__)
 
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
 
 class OpenAIConnector(BaseConnector):
     """
     Connector for interacting with OpenAI or OpenRouter chat completion APIs.
     """
 
-    def __init__(self, base_url: str, api_key: str, model_name: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model_name: str,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+    ):
         """
         Initializes the OpenAI connector with base URL, API key, and model name.
+        The underlying HTTP connection pool is shared per host and survives reloads.
         """
         self.base_url = base_url
         self.api_key = api_key
         self.model_name = model_name
+        self.timeout = timeout
+        self._async_client: Optional[AsyncOpenAI] = None
         try:
-            self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+            client_kwargs = {
+                "base_url": self.base_url,
+                "api_key": self.api_key,
+                "http_client": get_httpx_client(self.base_url or DEFAULT_BASE_URL, pool_size=pool_size),
+            }
+            if self.timeout:
+                client_kwargs["timeout"] = self.timeout
+            self.client = OpenAI(**client_kwargs)
         except Exception as exc:
             logger.critical(f"Failed to initialize OpenAI client: {exc}", exc_info=True)
             raise OpenAIConnectorError("Client initialization failed.") from exc
 
-    def send_query(self, prompt: str, temperature: float = 0.7) -> dict:
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        Lazily initialize and cache the AsyncOpenAI client.
+        It keeps its own connection pool, bound to the event loop that first uses it.
+        """
+        if self._async_client:
+            return self._async_client
+
+        try:
+            client_kwargs = {"base_url": self.base_url, "api_key": self.api_key}
+            if self.timeout:
+                client_kwargs["timeout"] = self.timeout
+            self._async_client = AsyncOpenAI(**client_kwargs)
+            return self._async_client
+
+        except Exception as exc:
+            logger.critical(f"Failed to initialize async OpenAI client: {exc}", exc_info=True)
+            raise OpenAIConnectorError("Async client initialization failed.") from exc
+
+    @staticmethod
+    def _to_result(completion) -> dict:
+        """Convert a chat completion into the connector response structure."""
+        if completion and completion.choices:
+            content = completion.choices[0].message.content.strip()
+            return {"status": "success", "response": content, "error": None}
+
+        logger.error("Empty or invalid completion response from OpenAI API.")
+        return {
+            "status": "fail",
+            "response": None,
+            "error": "Empty or invalid completion response from OpenAI API."
+        }
+
+    def send_query(self, prompt: str, temperature: float = 0.7, stream: bool = False):
         """
         Sends a chat completion request and returns structured response.
 
         Args:
             prompt (str): User input text.
             temperature (float): Sampling temperature for output diversity.
+            stream (bool): If True, return an iterator of text chunks instead (see stream_query).
 
         Returns:
             dict: {
                 "status": "success" or "fail",
                 "response": str or None,
-                "error": str or None
+                "error": str or None,
+                "headers": response headers (used for rate-limit tracking)
             }
 
         Raises:
             OpenAIConnectorError: On any API or client failure.
         """
+        if stream:
+            return self.stream_query(prompt, temperature=temperature)
+
         try:
-            completion = self.client.chat.completions.create(
+            # Raw response gives access to the x-ratelimit-* headers for the rate limiter
+            raw_response = self.client.chat.completions.with_raw_response.create(
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
             )
+            result = self._to_result(raw_response.parse())
+            result["headers"] = dict(raw_response.headers)
+            return result
 
-            if completion and completion.choices:
-                content = completion.choices[0].message.content.strip()
-                return {"status": "success", "response": content, "error": None}
+        except Exception as exc:
+            logger.critical(f"OpenAIConnectorError: {exc}", exc_info=True)
+            raise OpenAIConnectorError(f"Failed to get response from OpenAI API: {exc}") from exc
 
-            logger.error("Empty or invalid completion response from OpenAI API.")
-            return {
-                "status": "fail",
-                "response": None,
-                "error": "Empty or invalid completion response from OpenAI API."
-            }
+    def stream_query(self, prompt: str, temperature: float = 0.7) -> Iterator[str]:
+        """
+        Streams a chat completion, yielding content deltas as they arrive.
+
+        Raises:
+            OpenAIConnectorError: On any API or client failure, including mid-stream.
+        """
+        try:
+            completion_stream = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                stream=True,
+            )
+            for chunk in completion_stream:
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as exc:
+            logger.critical(f"OpenAIConnectorError: {exc}", exc_info=True)
+            raise OpenAIConnectorError(f"Failed to stream response from OpenAI API: {exc}") from exc
+
+    async def asend_query(self, prompt: str, temperature: float = 0.7) -> dict:
+        """
+        Async variant of send_query using the native AsyncOpenAI client.
+
+        Raises:
+            OpenAIConnectorError: On any API or client failure.
+        """
+        client = self._get_async_client()
+
+        try:
+            raw_response = await client.chat.completions.with_raw_response.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+            )
+            result = self._to_result(raw_response.parse())
+            result["headers"] = dict(raw_response.headers)
+            return result
 
         except Exception as exc:
             logger.critical(f"OpenAIConnectorError: {exc}", exc_info=True)
             raise OpenAIConnectorError(f"Failed to get response from OpenAI API: {exc}") from exc
+
+    async def aclose(self) -> None:
+        """Close the async client's connection pool."""
+        if self._async_client:
+            await self._async_client.close()
+            self._async_client = None
@@ -0,0 +1,379 @@
+# connectors/rate_limiter.py
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from .base_connector import BaseConnector, ConnectorWrapper
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Rough chars-per-token ratio used to estimate prompt/response token counts.
+CHARS_PER_TOKEN = 4
+DEFAULT_EXPECTED_OUTPUT_TOKENS = 1024
+# Pause applied on a 429 that carries no Retry-After / reset information.
+DEFAULT_429_BACKOFF_IN_SECS = 5.0
+_SEMAPHORE_POLL_IN_SECS = 0.05
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute / 60` tokens per second.
+    Reservations may drive the balance negative; the caller then sleeps until it is
+    repaid, which keeps waiters first-come-first-served without a queue.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.per_minute = float(per_minute)
+        self.rate = self.per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens and return how long the caller must wait before proceeding."""
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Refund (positive) or charge (negative) tokens after the real usage is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+    def clamp(self, remaining: float) -> None:
+        """Never believe we have more budget than the provider reports."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(remaining))
+
+    def drain(self) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse '20', '1.5', '6m0s', '250ms', '1h2m3s' into seconds."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r"([\d.]+)\s*(ms|h|m|s)", value):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+def _parse_reset(value: str, now: float) -> Optional[float]:
+    """Reset headers are either a delay, an epoch in seconds or an epoch in milliseconds."""
+    seconds = _parse_duration(value)
+    if seconds is None:
+        return None
+    if seconds > 1e12:
+        return max(0.0, seconds / 1000.0 - now)
+    if seconds > 1e9:
+        return max(0.0, seconds - now)
+    return seconds
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Dict[str, float]:
+    """
+    Normalize Retry-After and x-ratelimit-* headers (OpenAI, OpenRouter and
+    generic styles) into: retry_after, remaining_requests, remaining_tokens,
+    reset_requests, reset_tokens (all delays in seconds).
+    """
+    lowered = {str(k).lower(): str(v) for k, v in headers.items()}
+    now = time.time()
+    info: Dict[str, float] = {}
+
+    if "retry-after-ms" in lowered:
+        try:
+            info["retry_after"] = float(lowered["retry-after-ms"]) / 1000.0
+        except ValueError:
+            pass
+    elif "retry-after" in lowered:
+        seconds = _parse_duration(lowered["retry-after"])
+        if seconds is None:
+            try:
+                seconds = max(0.0, parsedate_to_datetime(lowered["retry-after"]).timestamp() - now)
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            info["retry_after"] = seconds
+
+    for field, names in (
+        ("remaining_requests", ("x-ratelimit-remaining-requests", "x-ratelimit-remaining")),
+        ("remaining_tokens", ("x-ratelimit-remaining-tokens",)),
+    ):
+        for name in names:
+            if name in lowered:
+                try:
+                    info[field] = float(lowered[name])
+                except ValueError:
+                    pass
+                break
+
+    for field, names in (
+        ("reset_requests", ("x-ratelimit-reset-requests", "x-ratelimit-reset")),
+        ("reset_tokens", ("x-ratelimit-reset-tokens",)),
+    ):
+        for name in names:
+            if name in lowered:
+                seconds = _parse_reset(lowered[name], now)
+                if seconds is not None:
+                    info[field] = seconds
+                break
+
+    return info
+
+
+def _find_response_details(error: BaseException):
+    """Walk the exception chain for an HTTP status code and response headers."""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        response = getattr(current, "response", None)
+        status = getattr(current, "status_code", None) or getattr(response, "status_code", None)
+        headers = getattr(response, "headers", None)
+        if status is not None or headers is not None:
+            return status, headers or {}
+        current = current.__cause__ or current.__context__
+    return None, {}
+
+
+class ProviderRateLimiter:
+    """
+    Client-side limits for one provider/base URL/API key:
+      - requests-per-minute and tokens-per-minute buckets
+      - a max-in-flight semaphore
+      - pauses and clamps driven by Retry-After / x-ratelimit-* headers
+    Any limit left unset (None) is not enforced.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+    ):
+        self.name = name
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.semaphore = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, float] = {"requests": 0, "throttled": 0, "wait_seconds": 0.0, "rate_limited": 0}
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = max(0.0, self._blocked_until - time.monotonic())
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket:
+            wait = max(wait, self.token_bucket.reserve(estimated_tokens))
+        with self._lock:
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self.stats["wait_seconds"] += wait
+        if wait > 0:
+            logger.info(f"Rate limiter '{self.name}' delaying request by {wait:.2f}s")
+        return wait
+
+    @contextmanager
+    def limit(self, estimated_tokens: int):
+        """Block until a request of `estimated_tokens` may be sent; hold an in-flight slot meanwhile."""
+        if self.semaphore:
+            self.semaphore.acquire()
+        try:
+            wait = self._reserve(estimated_tokens)
+            if wait > 0:
+                time.sleep(wait)
+            yield
+        finally:
+            if self.semaphore:
+                self.semaphore.release()
+
+    @asynccontextmanager
+    async def alimit(self, estimated_tokens: int):
+        """Async variant of limit(); waits without blocking the event loop."""
+        if self.semaphore:
+            while not self.semaphore.acquire(blocking=False):
+                await asyncio.sleep(_SEMAPHORE_POLL_IN_SECS)
+        try:
+            wait = self._reserve(estimated_tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            if self.semaphore:
+                self.semaphore.release()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        logger.warning(f"Rate limiter '{self.name}' paused for {seconds:.2f}s")
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Fold provider rate-limit headers into the local buckets."""
+        if not headers:
+            return
+        info = parse_rate_limit_headers(headers)
+
+        if info.get("retry_after"):
+            self.pause(info["retry_after"])
+
+        for remaining_key, reset_key, bucket in (
+            ("remaining_requests", "reset_requests", self.request_bucket),
+            ("remaining_tokens", "reset_tokens", self.token_bucket),
+        ):
+            if remaining_key not in info:
+                continue
+            if bucket:
+                bucket.clamp(info[remaining_key])
+            if info[remaining_key] <= 0 and info.get(reset_key):
+                self.pause(info[reset_key])
+
+    def observe_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        if self.token_bucket:
+            self.token_bucket.adjust(estimated_tokens - actual_tokens)
+
+    def observe_error(self, error: BaseException) -> None:
+        status, headers = _find_response_details(error)
+        if headers:
+            self.observe_headers(headers)
+        if status == 429:
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            info = parse_rate_limit_headers(headers) if headers else {}
+            if not info.get("retry_after") and not info.get("reset_requests"):
+                self.pause(DEFAULT_429_BACKOFF_IN_SECS)
+            if self.request_bucket:
+                self.request_bucket.drain()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["paused_for"] = round(max(0.0, self._blocked_until - time.monotonic()), 3)
+        return stats
+
+
+# Limiters outlive connector instances so reloads/failovers keep their budget state.
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    base_url: Optional[str],
+    api_key: Optional[str],
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    max_in_flight: Optional[int] = None,
+) -> ProviderRateLimiter:
+    """Return the shared limiter for provider + base URL + API key (limits apply on first creation)."""
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+    key = f"{provider}|{base_url or ''}|{key_hash}"
+
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = ProviderRateLimiter(
+                name=f"{provider}@{base_url or 'default'}",
+                rpm=rpm,
+                tpm=tpm,
+                max_in_flight=max_in_flight,
+            )
+            _limiters[key] = limiter
+        return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.get_stats() for limiter in limiters}
+
+
+class RateLimitedConnector(ConnectorWrapper):
+    """Applies a ProviderRateLimiter around every call of the wrapped connector."""
+
+    def __init__(
+        self,
+        inner: BaseConnector,
+        limiter: ProviderRateLimiter,
+        expected_output_tokens: int = DEFAULT_EXPECTED_OUTPUT_TOKENS,
+    ):
+        super().__init__(inner)
+        self.limiter = limiter
+        self.expected_output_tokens = expected_output_tokens
+
+    def _estimate(self, prompt: str) -> int:
+        return estimate_tokens(prompt) + self.expected_output_tokens
+
+    def _settle(self, prompt: str, estimated: int, result: Any) -> None:
+        if isinstance(result, dict):
+            self.limiter.observe_headers(result.get("headers"))
+            actual = estimate_tokens(prompt) + estimate_tokens(result.get("response"))
+            self.limiter.observe_usage(estimated, actual)
+
+    def send_query(self, prompt: str, stream: bool = False, **kwargs: Any):
+        if stream:
+            return self.stream_query(prompt, **kwargs)
+
+        estimated = self._estimate(prompt)
+        with self.limiter.limit(estimated):
+            try:
+                result = self.inner.send_query(prompt, **kwargs)
+            except Exception as exc:
+                self.limiter.observe_error(exc)
+                raise
+        self._settle(prompt, estimated, result)
+        return result
+
+    def stream_query(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        estimated = self._estimate(prompt)
+        received = 0
+        with self.limiter.limit(estimated):
+            try:
+                for chunk in self.inner.send_query(prompt, stream=True, **kwargs):
+                    received += len(chunk)
+                    yield chunk
+            except Exception as exc:
+                self.limiter.observe_error(exc)
+                raise
+        self.limiter.observe_usage(estimated, estimate_tokens(prompt) + received // CHARS_PER_TOKEN)
+
+    async def asend_query(self, prompt: str, **kwargs: Any):
+        estimated = self._estimate(prompt)
+        async with self.limiter.alimit(estimated):
+            try:
+                result = await self.inner.asend_query(prompt, **kwargs)
+            except Exception as exc:
+                self.limiter.observe_error(exc)
+                raise
+        self._settle(prompt, estimated, result)
+        return result
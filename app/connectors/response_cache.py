@@ -0,0 +1,299 @@
+# connectors/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from .base_connector import BaseConnector, ConnectorWrapper
+from core.env import env_flag, env_int
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_TTL_IN_SECS = 24 * 60 * 60
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_MAX_MB = 256
+
+
+def make_cache_key(connector_type: str, model: Optional[str], temperature: float, prompt: str) -> str:
+    """Content-addressed key: connector type, model, temperature and a hash of the rendered prompt."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    material = json.dumps([connector_type, model or "", round(float(temperature), 4), prompt_hash])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier LLM response cache.
+      - In-memory LRU tier bounded by entry count
+      - Optional on-disk sqlite tier bounded by total size, evicting least recently used
+    Entries expire after their TTL in both tiers.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: int = DEFAULT_DISK_MAX_MB * 1024 * 1024,
+    ):
+        self.memory_entries = memory_entries
+        self.disk_path = disk_path
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bypasses": 0,
+        }
+
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def _open_disk(self, disk_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+            self._db.commit()
+        except sqlite3.Error as exc:
+            logger.error(f"Disabling on-disk LLM cache at {disk_path}: {exc}")
+            self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row and row[1] > now:
+                        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, row[1], row[0])
+                        self.stats["disk_hits"] += 1
+                        return row[0]
+                    if row:
+                        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._db.commit()
+                except sqlite3.Error as exc:
+                    logger.warning(f"LLM cache disk lookup failed: {exc}")
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, response: str, ttl: int) -> None:
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, expires_at, response)
+            self.stats["stores"] += 1
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, size, expires_at, last_access)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (key, response, len(response.encode("utf-8")), expires_at, now),
+                    )
+                    self._evict_disk(now)
+                    self._db.commit()
+                except sqlite3.Error as exc:
+                    logger.warning(f"LLM cache disk write failed: {exc}")
+
+    def _remember(self, key: str, expires_at: float, response: str) -> None:
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows until under the size bound."""
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.disk_max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.stats["bypasses"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+@dataclass
+class CachePolicy:
+    """Per-task cache policy: sampling at temperature > 0 makes reuse a deliberate choice."""
+    enabled: bool
+    ttl: int
+
+    @classmethod
+    def for_task(cls, task: str) -> "CachePolicy":
+        """Resolve {TASK}_LLM_CACHE_ENABLED / {TASK}_LLM_CACHE_TTL_IN_SECS, falling back to the global settings."""
+        prefix = task.upper()
+        enabled = env_flag(f"{prefix}_LLM_CACHE_ENABLED", env_flag("LLM_CACHE_ENABLED", True))
+        ttl = env_int(f"{prefix}_LLM_CACHE_TTL_IN_SECS", env_int("LLM_CACHE_TTL_IN_SECS", DEFAULT_TTL_IN_SECS))
+        return cls(enabled=enabled, ttl=ttl)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache, configured from env on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache_dir = os.getenv("LLM_CACHE_DIR")
+                _cache = ResponseCache(
+                    memory_entries=env_int("LLM_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES),
+                    disk_path=os.path.join(cache_dir, "llm_responses.sqlite3") if cache_dir else None,
+                    disk_max_bytes=env_int("LLM_CACHE_MAX_MB", DEFAULT_DISK_MAX_MB) * 1024 * 1024,
+                )
+    return _cache
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the process-wide LLM response cache."""
+    return get_response_cache().get_stats()
+
+
+class CachedConnector(ConnectorWrapper):
+    """
+    Serves repeated prompts from the response cache.
+    Only successful responses are stored. Pass bypass_cache=True to force a fresh call;
+    the fresh response then replaces the cached one.
+    """
+
+    def __init__(
+        self,
+        inner: BaseConnector,
+        connector_type: str,
+        policy: CachePolicy,
+        cache: Optional[ResponseCache] = None,
+    ):
+        super().__init__(inner)
+        self.connector_type = connector_type
+        self.policy = policy
+        self.cache = cache or get_response_cache()
+
+    def _key(self, prompt: str, kwargs: Dict[str, Any]) -> str:
+        model = kwargs.get("model") or getattr(self.inner, "model_name", None) or getattr(self.inner, "model", None)
+        temperature = kwargs.get("temperature", DEFAULT_TEMPERATURE)
+        return make_cache_key(self.connector_type, model, temperature, prompt)
+
+    def send_query(self, prompt: str, stream: bool = False, bypass_cache: bool = False, **kwargs: Any):
+        if stream:
+            return self.stream_query(prompt, bypass_cache=bypass_cache, **kwargs)
+
+        if not self.policy.enabled:
+            return self.inner.send_query(prompt, **kwargs)
+
+        key = self._key(prompt, kwargs)
+        if bypass_cache:
+            self.cache.record_bypass()
+        else:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {self.connector_type} connector.")
+                return {"status": "success", "response": cached, "error": None}
+
+        result = self.inner.send_query(prompt, **kwargs)
+        self._store(key, result)
+        return result
+
+    def stream_query(self, prompt: str, bypass_cache: bool = False, **kwargs: Any) -> Iterator[str]:
+        if not self.policy.enabled:
+            yield from self.inner.send_query(prompt, stream=True, **kwargs)
+            return
+
+        key = self._key(prompt, kwargs)
+        if bypass_cache:
+            self.cache.record_bypass()
+        else:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {self.connector_type} connector (stream).")
+                yield cached
+                return
+
+        chunks = []
+        for chunk in self.inner.send_query(prompt, stream=True, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        # Only reached when the stream completed without error
+        self.cache.set(key, "".join(chunks), self.policy.ttl)
+
+    async def asend_query(self, prompt: str, bypass_cache: bool = False, **kwargs: Any):
+        if not self.policy.enabled:
+            return await self.inner.asend_query(prompt, **kwargs)
+
+        key = self._key(prompt, kwargs)
+        if bypass_cache:
+            self.cache.record_bypass()
+        else:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {"status": "success", "response": cached, "error": None}
+
+        result = await self.inner.asend_query(prompt, **kwargs)
+        self._store(key, result)
+        return result
+
+    def _store(self, key: str, result: Any) -> None:
+        if isinstance(result, dict) and result.get("status") == "success" and result.get("response"):
+            self.cache.set(key, result["response"], self.policy.ttl)
@@ -0,0 +1,118 @@
+# connectors/session_pool.py
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Shared keep-alive sessions, one per scheme://host.
+# Kept at module level so they outlive connector instances recreated by
+# get_connector(..., reload=True) during failover.
+_sessions: Dict[str, requests.Session] = {}
+_httpx_clients: Dict[str, httpx.Client] = {}
+_sessions_lock = threading.Lock()
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_IN_SECS = 0.5
+
+
+def _pool_key(api_url: str) -> str:
+    """Sessions are shared per origin so alternate URLs on the same host reuse connections."""
+    parts = urlsplit(api_url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _build_session(pool_size: int, connect_retries: int, retry_backoff: float) -> requests.Session:
+    """Create a session whose adapter keeps `pool_size` connections alive per host."""
+    # Only connection establishment is retried: the request has not reached the
+    # server yet, so replaying a POST is safe. Read/status errors surface to the caller.
+    retry = Retry(
+        total=connect_retries,
+        connect=connect_retries,
+        read=0,
+        redirect=0,
+        status=0,
+        other=0,
+        backoff_factor=retry_backoff,
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(
+    api_url: str,
+    pool_size: Optional[int] = None,
+    connect_retries: Optional[int] = None,
+    retry_backoff: Optional[float] = None,
+) -> requests.Session:
+    """
+    Return the pooled keep-alive session for the origin of `api_url`.
+    Pool settings only apply when the session is first created for that origin.
+    """
+    key = _pool_key(api_url)
+
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session(
+                pool_size or DEFAULT_POOL_SIZE,
+                DEFAULT_CONNECT_RETRIES if connect_retries is None else connect_retries,
+                DEFAULT_RETRY_BACKOFF_IN_SECS if retry_backoff is None else retry_backoff,
+            )
+            _sessions[key] = session
+            logger.info(f"Created pooled HTTP session for {key} (pool_size={pool_size or DEFAULT_POOL_SIZE})")
+        return session
+
+
+def get_httpx_client(api_url: str, pool_size: Optional[int] = None) -> httpx.Client:
+    """
+    Return the pooled httpx client for the origin of `api_url`.
+    Used by SDK-based connectors (OpenAI) that accept an injected http client.
+    """
+    key = _pool_key(api_url)
+
+    client = _httpx_clients.get(key)
+    if client is not None:
+        return client
+
+    with _sessions_lock:
+        client = _httpx_clients.get(key)
+        if client is None:
+            size = pool_size or DEFAULT_POOL_SIZE
+            client = httpx.Client(
+                limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+                follow_redirects=True,
+            )
+            _httpx_clients[key] = client
+            logger.info(f"Created pooled httpx client for {key} (pool_size={size})")
+        return client
+
+
+def close_sessions() -> None:
+    """Close and forget every pooled session and client (e.g. on shutdown)."""
+    with _sessions_lock:
+        for key, session in list(_sessions.items()) + list(_httpx_clients.items()):
+            try:
+                session.close()
+            except Exception as exc:
+                logger.warning(f"Failed to close HTTP session for {key}: {exc}")
+        _sessions.clear()
+        _httpx_clients.clear()
@@ -0,0 +1,151 @@
+# connectors/stream_parser.py
+from typing import Dict, Iterable, Optional
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class JSONFieldStreamParser:
+    """
+    Incrementally extracts top-level string fields from a JSON object that is
+    still being received, e.g. "latex_code" while an LLM response streams in.
+
+    Text before the opening brace (prose, markdown fences) is ignored. Only
+    string values of the requested top-level keys are decoded; everything
+    else is skipped while tracking nesting.
+
+    Usage:
+        parser = JSONFieldStreamParser(["latex_code"])
+        for chunk in connector.send_query(prompt, stream=True):
+            for field, text in parser.feed(chunk).items():
+                ...
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = set(fields)
+        self.values: Dict[str, str] = {}
+        self.completed: set = set()
+
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode_buf: Optional[str] = None
+        self._pending_high_surrogate: Optional[int] = None
+        self._expect_key = False
+        self._string_is_key = False
+        self._key_buf: list = []
+        self._current_key: Optional[str] = None
+        self._target: Optional[str] = None
+
+    def feed(self, chunk: str) -> Dict[str, str]:
+        """
+        Consume the next chunk and return the newly decoded text per field.
+        Fields with no new text in this chunk are omitted.
+        """
+        emitted: Dict[str, list] = {}
+
+        for ch in chunk:
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            if self._in_string:
+                self._consume_string_char(ch, emitted)
+                continue
+
+            if self._depth == 0:
+                # Top-level object closed; ignore trailing text.
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_is_key = self._depth == 1 and self._expect_key
+                if self._string_is_key:
+                    self._key_buf = []
+                elif self._depth == 1 and self._current_key in self.fields:
+                    self._target = self._current_key
+                    self.values.setdefault(self._target, "")
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and ch == ",":
+                self._expect_key = True
+                self._current_key = None
+            elif self._depth == 1 and ch == ":":
+                self._expect_key = False
+
+        return {field: "".join(parts) for field, parts in emitted.items() if parts}
+
+    def _consume_string_char(self, ch: str, emitted: Dict[str, list]) -> None:
+        if self._unicode_buf is not None:
+            self._unicode_buf += ch
+            if len(self._unicode_buf) == 4:
+                self._append(self._decode_unicode(self._unicode_buf), emitted)
+                self._unicode_buf = None
+            return
+
+        if self._escape:
+            self._escape = False
+            if ch == "u":
+                self._unicode_buf = ""
+            else:
+                self._append(_SIMPLE_ESCAPES.get(ch, ch), emitted)
+            return
+
+        if ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._close_string()
+        else:
+            self._append(ch, emitted)
+
+    def _decode_unicode(self, hex_digits: str) -> str:
+        try:
+            code = int(hex_digits, 16)
+        except ValueError:
+            return ""
+
+        if 0xD800 <= code <= 0xDBFF:
+            self._pending_high_surrogate = code
+            return ""
+        if 0xDC00 <= code <= 0xDFFF and self._pending_high_surrogate is not None:
+            high = self._pending_high_surrogate
+            self._pending_high_surrogate = None
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        return chr(code)
+
+    def _append(self, text: str, emitted: Dict[str, list]) -> None:
+        if not text:
+            return
+        if self._string_is_key:
+            self._key_buf.append(text)
+        elif self._target is not None:
+            self.values[self._target] += text
+            emitted.setdefault(self._target, []).append(text)
+
+    def _close_string(self) -> None:
+        self._in_string = False
+        if self._string_is_key:
+            self._current_key = "".join(self._key_buf)
+            self._string_is_key = False
+        elif self._target is not None:
+            self.completed.add(self._target)
+            self._target = None
+
+    @property
+    def finished(self) -> bool:
+        """True once the top-level JSON object has been closed."""
+        return self._started and self._depth == 0
@@ -1,14 +1,21 @@
 import base64
 import os
 import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
+import google_auth_httplib2
+import httplib2
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from core.env import env_int
 from core.logger import get_logger
 from core.exceptions import SendEmailError
 
@@ -21,9 +28,96 @@ SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
 if isinstance(SCOPES, str):
     SCOPES = [s.strip() for s in SCOPES.split(",") if s.strip()]
 
-
-
-def get_gmail_service():
+# Credentials are refreshed this long before they expire
+DEFAULT_REFRESH_MARGIN_IN_SECS = 300
+# Wait before retrying a failed background refresh
+REFRESH_RETRY_IN_SECS = 30
+
+
+def _refresh_margin() -> timedelta:
+    return timedelta(seconds=env_int("GMAIL_TOKEN_REFRESH_MARGIN_IN_SECS", DEFAULT_REFRESH_MARGIN_IN_SECS))
+
+
+def _utcnow() -> datetime:
+    # google-auth keeps Credentials.expiry as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# -----------------------------
+# Process-wide service
+# -----------------------------
+# (service, credentials, token path), replaced as a whole
+_session = None
+_service_lock = threading.Lock()
+# Refreshes and token-file writes, shared by senders and the refresh thread
+_token_lock = threading.Lock()
+# Set to stop the current session's refresh thread
+_refresher_stop = threading.Event()
+# httplib2.Http is not thread-safe, so every sending thread gets its own
+_thread_http = threading.local()
+
+_stats = {"services_built": 0, "refreshes": 0, "inline_refreshes": 0, "refresh_failures": 0, "token_writes": 0, "sends": 0}
+_stats_lock = threading.Lock()
+
+
+def _record(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def _save_token(creds, token_path: str) -> None:
+    """Write the token next to its final path and rename it, so a reader never sees a partial file."""
+    with _token_lock:
+        token_dir = os.path.dirname(os.path.abspath(token_path))
+        fd, tmp_path = tempfile.mkstemp(dir=token_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as token_file:
+                token_file.write(creds.to_json())
+            os.replace(tmp_path, token_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    _record("token_writes")
+
+
+def _needs_refresh(creds) -> bool:
+    return not creds.valid or (creds.expiry is not None and creds.expiry - _refresh_margin() <= _utcnow())
+
+
+def _refresh(creds, token_path: str, inline: bool = False) -> None:
+    with _token_lock:
+        # Another thread may have refreshed while this one waited
+        if not _needs_refresh(creds):
+            return
+        creds.refresh(Request())
+    _save_token(creds, token_path)
+    _record("inline_refreshes" if inline else "refreshes")
+    logger.info(f"Refreshed Gmail credentials; valid until {creds.expiry} UTC")
+
+
+def _refresh_loop(creds, token_path: str, stop: threading.Event) -> None:
+    """Refresh the credentials ahead of expiry until reset_gmail_service() sets `stop`."""
+    while True:
+        if creds.expiry is None:
+            return
+        wait = (creds.expiry - _refresh_margin() - _utcnow()).total_seconds()
+        if stop.wait(max(wait, 0)):
+            return
+        try:
+            _refresh(creds, token_path)
+            if not _needs_refresh(creds):
+                continue
+            # Token lifetime shorter than the margin; do not refresh in a tight loop
+            logger.warning("Refreshed Gmail token expires within the refresh margin")
+        except Exception as e:
+            _record("refresh_failures")
+            logger.error(f"Background Gmail token refresh failed: {e}")
+        if stop.wait(REFRESH_RETRY_IN_SECS):
+            return
+
+
+def _load_credentials():
     creds = None
 
     # Corrected variable roles
@@ -49,15 +143,74 @@ def get_gmail_service():
             creds = flow.run_local_server(port=0)
 
         # Save new token
-        with open(token_path, 'w') as token_file:
-            token_file.write(creds.to_json())
+        _save_token(creds, token_path)
+
+    return creds, token_path
+
+
+def _get_session():
+    global _session, _refresher_stop
+    session = _session
+    if session is None:
+        with _service_lock:
+            if _session is None:
+                creds, token_path = _load_credentials()
+                service = build("gmail", "v1", credentials=creds, static_discovery=True, cache_discovery=False)
+                _refresher_stop = threading.Event()
+                if creds.refresh_token:
+                    threading.Thread(
+                        target=_refresh_loop,
+                        args=(creds, token_path, _refresher_stop),
+                        name="gmail-token-refresh",
+                        daemon=True,
+                    ).start()
+                _session = (service, creds, token_path)
+                _record("services_built")
+            session = _session
+    return session
+
+
+def get_gmail_service():
+    """
+    The process-wide Gmail API service, built on first use.
+
+    The service is built from the discovery document bundled with
+    google-api-python-client (no discovery request), and a daemon thread
+    refreshes the credentials GMAIL_TOKEN_REFRESH_MARGIN_IN_SECS before they
+    expire, so sends do not wait on the token file or on a refresh.
+    """
+    return _get_session()[0]
+
 
-    return build('gmail', 'v1', credentials=creds)
+def reset_gmail_service() -> None:
+    """Drop the cached service (e.g. after the token was revoked); the next send builds a new one."""
+    global _session
+    with _service_lock:
+        _refresher_stop.set()
+        _session = None
+
+
+def _get_thread_http(creds):
+    """AuthorizedHttp for the calling thread, rebuilt when the service was reset."""
+    http = getattr(_thread_http, "http", None)
+    if http is None or http.credentials is not creds:
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+        _thread_http.http = http
+    return http
+
+
+def get_gmail_stats():
+    """Services built, background and inline token refreshes, token-file writes and sends."""
+    with _stats_lock:
+        return dict(_stats)
 
 
 def send_email_with_attachment(receiver_email, email_subject, email_body_text, resume_path, cover_letter_path=None):
     try:
-        service = get_gmail_service()
+        service, creds, token_path = _get_session()
+        # Only when the background refresh fell behind (e.g. after a failure)
+        if _needs_refresh(creds):
+            _refresh(creds, token_path, inline=True)
 
         # Construct email
         message = MIMEMultipart()
@@ -76,9 +229,16 @@ def send_email_with_attachment(receiver_email, email_subject, email_body_text, r
         raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
         body = {'raw': raw_message}
 
-        send_result = service.users().messages().send(userId="me", body=body).execute()
+        send_result = service.users().messages().send(userId="me", body=body).execute(http=_get_thread_http(creds))
+        _record("sends")
         return "Application sent!"
 
+    except RefreshError as error:
+        # The stored grant is no longer usable; rebuild from the token file next time
+        reset_gmail_service()
+        logger.critical(f"Failed to send application email to {receiver_email}: {str(error)}", exc_info=True)
+        raise SendEmailError(f"Could not send email to {receiver_email}") from error
+
     except Exception as error:
         logger.critical(f"Failed to send application email to {receiver_email}: {str(error)}", exc_info=True)
         raise SendEmailError(f"Could not send email to {receiver_email}") from error
@@ -1,3 +1,5 @@
 from .file_parser import extract_text_from_pdf
-from .pdf_generator import generate_pdf
-__all__ = ["extract_text_from_pdf", "generate_pdf"]
+from .pdf_generator import generate_pdf, get_compile_stats, get_format_cache_stats
+from .pdf_cache import get_pdf_cache_stats
+from .text_cache import get_pdf_text_cache_stats
+__all__ = ["extract_text_from_pdf", "generate_pdf", "get_compile_stats", "get_format_cache_stats", "get_pdf_cache_stats", "get_pdf_text_cache_stats"]
@@ -1,26 +1,61 @@
-import pdfplumber
+import os
+import re
+from typing import Optional
+
+from pylatexenc import latexwalker, macrospec
+from pylatexenc.latex2text import LatexNodes2Text
 from core.logger import get_logger
 from core.exceptions import ExtractTextError, TexFileReadError
+from .pdf_extractors import extract_text, resolve_backend
+from .text_cache import get_pdf_text_cache, make_text_cache_key, pdf_text_cache_enabled
 logger = get_logger(__name__)
 
+# pylatexenc 2.0 knows how to render \href but not how to parse its two arguments.
+_LATEX_PARSE_CONTEXT = latexwalker.get_default_latex_context_db()
+_LATEX_PARSE_CONTEXT.add_context_category(
+    "hyperref", prepend=True, macros=[macrospec.MacroSpec("href", "{{")]
+)
+
+
+
+def _read_pdf_bytes(pdf_file) -> bytes:
+    """Raw bytes of a PDF given as a path or a file-like object (e.g. a Streamlit UploadedFile)."""
+    if hasattr(pdf_file, "read"):
+        pdf_file.seek(0)
+        data = pdf_file.read()
+        pdf_file.seek(0)
+        return data
+    with open(pdf_file, "rb") as f:
+        return f.read()
 
 
-def extract_text_from_pdf(pdf_file) -> str:
+def extract_text_from_pdf(pdf_file, use_cache: bool = True, backend: Optional[str] = None) -> str:
     """
     Extracts text content from the uploaded PDF resume.
     
     Args:
-        file path string the PDF.
+        file path string or file-like object of the PDF.
+        use_cache: serve repeated extractions of the same content from the
+            PDF text cache (PDF_TEXT_CACHE_ENABLED).
+        backend: extraction backend, 'pypdf' or 'pdfplumber' (default: PDF_EXTRACT_BACKEND).
         
     Returns:
         Extracted plain text as a string.
     """
     try:
-        text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        return text.strip()
+        data = _read_pdf_bytes(pdf_file)
+        backend = resolve_backend(backend)
+
+        if not (use_cache and pdf_text_cache_enabled()):
+            return extract_text(data, backend)
+
+        cache = get_pdf_text_cache()
+        key = make_text_cache_key(data, backend)
+        text = cache.get(key, source_size=len(data))
+        if text is None:
+            text = extract_text(data, backend)
+            cache.set(key, text)
+        return text
         
     except Exception as error:
         
@@ -52,3 +87,120 @@ def read_tex_file(tex_file):
 
     except Exception as e:
         raise TexFileReadError(f"Failed to read .tex file: {e}")
+
+
+# -----------------------------
+# LaTeX -> plain text
+# -----------------------------
+# Regex passes at C speed; pylatexenc builds a full node tree and is kept as
+# the thorough backend (LATEX_TEXT_BACKEND=pylatexenc).
+
+# Balanced {...} argument, up to three levels deep.
+_ARG = r"\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*\}"
+_OPT = r"\[[^\]]*\]"
+
+# Commands whose arguments are layout or metadata rather than text; dropped with their arguments.
+_LAYOUT_COMMANDS = (
+    "vspace", "hspace", "setlength", "addtolength", "setcounter", "color", "definecolor",
+    "fontsize", "pagestyle", "thispagestyle", "label", "ref", "includegraphics", "extracolsep",
+    "titleformat", "titlespacing", "hypersetup", "geometry", "usepackage", "newcommand", "renewcommand",
+)
+# Inline formatting commands; any other command left in the body (usually a template
+# macro such as \resumeItem or \resumeSubheading) starts a new line.
+_INLINE_COMMANDS = frozenset((
+    "textbf", "textit", "texttt", "textsc", "textsf", "textrm", "textup", "textmd", "emph", "underline",
+    "uline", "mbox", "makebox", "text", "tiny", "scriptsize", "footnotesize", "small", "normalsize",
+    "large", "Large", "LARGE", "huge", "Huge", "bfseries", "itshape", "scshape", "ttfamily", "sffamily",
+    "rmfamily", "mdseries", "upshape", "centering", "raggedright", "raggedleft", "noindent", "indent",
+    "hfill", "vfill", "fill", "quad", "qquad", "strut", "smallskip", "medskip", "bigskip",
+    "textwidth", "linewidth", "titlerule", "hrule", "hline", "faicon",
+))
+_LATEX_SYMBOLS = {
+    "ldots": "...", "dots": "...", "textbar": "|", "textbullet": "•", "cdot": "·",
+    "textasciitilde": "~", "textbackslash": "\\", "LaTeX": "LaTeX", "TeX": "TeX",
+}
+# Escaped characters are parked on private-use code points until braces and $ are stripped.
+_ESCAPES = {"&": "\ue000", "%": "\ue001", "$": "\ue002", "#": "#", "_": "_", "{": "\ue003", "}": "\ue004"}
+_RESTORE = str.maketrans({"\ue000": "&", "\ue001": "%", "\ue002": "$", "\ue003": "{", "\ue004": "}"})
+
+_RE_COMMENT = re.compile(r"(?<!\\)%[^\n]*")
+_RE_ESCAPE = re.compile(r"\\([&%$#_{}])")
+_RE_HREF = re.compile(r"\\href\s*\{([^{}]*)\}\s*(" + _ARG + ")")
+_RE_URL = re.compile(r"\\url\s*\{([^{}]*)\}")
+_RE_LAYOUT = re.compile(r"\\(?:" + "|".join(_LAYOUT_COMMANDS) + r")\*?(?:\s*" + _OPT + r")?(?:\s*" + _ARG + ")*")
+_RE_TEXTCOLOR = re.compile(r"\\textcolor\s*" + _ARG)
+_RE_TABULAR = re.compile(r"\\begin\{(?:tabular\*?|tabularx|array)\}(?:\s*(?:" + _OPT + "|" + _ARG + "))*")
+_RE_ENV = re.compile(r"\\(?:begin|end)\{[^{}]*\}(?:\s*" + _OPT + ")?")
+_RE_SECTION = re.compile(r"\\(?:section|subsection|subsubsection|paragraph)\*?\s*(" + _ARG + ")")
+_RE_ITEM = re.compile(r"\\item\b(?:\s*" + _OPT + ")?")
+_RE_LINEBREAK = re.compile(r"\\\\(?:\s*" + _OPT + r")?|\\(?:newline|par|linebreak)\b")
+_RE_SYMBOL = re.compile(r"\\(" + "|".join(_LATEX_SYMBOLS) + r")\b(?:\{\})?")
+_RE_COMMAND = re.compile(r"\\([A-Za-z@]+)\*?(?:\s*" + _OPT + ")?")
+_RE_CONTROL_SYMBOL = re.compile(r"\\.")
+_RE_ADJACENT_ARGS = re.compile(r"\}[ \t]*\{")
+_RE_MATH = re.compile(r"\$")
+
+
+def _href_to_text(match: "re.Match") -> str:
+    url, text = match.group(1), match.group(2)[1:-1]
+    bare_url = re.sub(r"^(?:mailto:|https?://)(?:www\.)?", "", url).rstrip("/")
+    return text if bare_url and bare_url in text else f"{text} ({url})"
+
+
+def _latex_to_text_fast(latex_code: str) -> str:
+    text = _RE_COMMENT.sub("", latex_code)
+    text = _RE_ESCAPE.sub(lambda m: _ESCAPES[m.group(1)], text)
+    text = _RE_HREF.sub(_href_to_text, text)
+    text = _RE_URL.sub(r"\1", text)
+    text = _RE_LAYOUT.sub("", text)
+    text = _RE_TEXTCOLOR.sub("", text)
+    text = _RE_TABULAR.sub("\n", text)
+    text = _RE_ENV.sub("\n", text)
+    text = _RE_SECTION.sub(lambda m: "\n\n" + m.group(1)[1:-1] + "\n", text)
+    text = _RE_ITEM.sub("\n- ", text)
+    text = _RE_LINEBREAK.sub("\n", text)
+    text = _RE_SYMBOL.sub(lambda m: _LATEX_SYMBOLS[m.group(1)], text)
+    text = _RE_COMMAND.sub(lambda m: " " if m.group(1) in _INLINE_COMMANDS else "\n", text)
+    text = _RE_CONTROL_SYMBOL.sub(" ", text)
+    # Consecutive arguments of custom macros (e.g. \resumeSubheading{..}{..}) are separate fields.
+    text = _RE_ADJACENT_ARGS.sub(" ", text)
+    text = _RE_MATH.sub("", text)
+    text = text.replace("{", "").replace("}", "").replace("~", " ").replace("&", " | ")
+    text = text.replace("---", "\u2014").replace("--", "\u2013").replace("``", '"').replace("''", '"')
+    text = text.translate(_RESTORE)
+
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    text = re.sub(r"(?m)^- *\n+", "- ", "\n".join(lines))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _latex_to_text_pylatexenc(latex_code: str) -> str:
+    try:
+        return LatexNodes2Text().latex_to_text(latex_code, latex_context=_LATEX_PARSE_CONTEXT).strip()
+    except Exception as error:
+        # pylatexenc 2.0 fails on some environments (e.g. tabular*); fall back to the regex converter.
+        logger.warning(f"pylatexenc could not convert LaTeX ({error}); using the fast converter.")
+        return _latex_to_text_fast(latex_code)
+
+
+def latex_to_text(latex_code: str, backend: Optional[str] = None) -> str:
+    """
+    Converts LaTeX source to plain text (the document body only, without the preamble).
+    Used to hand resume content to prompts without compiling and re-extracting a PDF.
+
+    Args:
+        latex_code: LaTeX source, a full document or a fragment.
+        backend: "fast" (regex passes, default) or "pylatexenc"; defaults to LATEX_TEXT_BACKEND.
+    """
+    body = latex_code
+    start = body.find("\\begin{document}")
+    if start != -1:
+        body = body[start + len("\\begin{document}"):]
+    end = body.rfind("\\end{document}")
+    if end != -1:
+        body = body[:end]
+
+    backend = (backend or os.getenv("LATEX_TEXT_BACKEND", "fast")).strip().lower()
+    if backend == "pylatexenc":
+        return _latex_to_text_pylatexenc(body)
+    return _latex_to_text_fast(body)
@@ -0,0 +1,230 @@
+# file_utils/latex_sanitizer.py
+import re
+
+from core.env import env_flag
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Same word list as pdf_generator.sanitize_latex_output (the reference implementation).
+KNOWN_COMMANDS = (
+    "noindent", "normalsize", "small", "tiny", "large", "Large", "LARGE", "huge", "Huge",
+    "textbf", "textit", "underline", "emph", "item", "section", "subsection", "subsubsection",
+    "paragraph", "subparagraph", "texttt", "textsc", "centering", "raggedright", "raggedleft",
+    "today", "vspace", "hspace", "newline", "linebreak", "newpage", "clearpage", "tableofcontents",
+    "maketitle", "author", "title", "date", "begin", "end", "includegraphics", "caption",
+    "label", "ref", "cite", "url", "footnote", "itemize", "enumerate", "flushleft",
+    "flushright", "center", "rule", "bfseries", "itshape", "ttfamily", "scshape",
+    "textwidth", "textheight", "linewidth", "parindent", "baselineskip", "textcolor",
+    "color", "pagebreak", "nopagebreak", "hfill", "vfill", "hline", "cline",
+)
+
+# -----------------------------
+# Precompiled scanners
+# -----------------------------
+# Scanners start with a literal or a single character class and keep context
+# checks out of the leading position, so the regex engine can skip straight to
+# candidate positions instead of trying every alternative at every character.
+
+
+def _trie_pattern(words) -> str:
+    """Regex for `words` factored by common prefix, so a non-matching position fails on its first letter."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # An end-of-word marker makes the remainder optional
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+_COMMAND_INITIALS = "".join(sorted({cmd[0] for cmd in KNOWN_COMMANDS}))
+
+# Missing backslash: a known word after whitespace or '{' (consumed and
+# re-emitted) and before whitespace, '\', '{' or the end of the text.
+_COMMAND_SCANNER = re.compile(
+    rf"(?P<lead>[\s{{])(?=[{_COMMAND_INITIALS}])(?P<word>{_trie_pattern(KNOWN_COMMANDS)})(?=[\s\\{{]|\Z)"
+)
+_USEPACKAGE_COMMAND = re.compile(r"\\usepackage\{\\(\w+)\}")
+# Applied with a newline prepended, so the first line is covered too
+_LEADING_ESCAPED_PERCENT = re.compile(r"\n[ \t]*\\%(?=\s|\Z)")
+# Environment names are fixed after \textbf flattening, which can join text into
+# new \begin{\env} sequences. \end-to-\end comes first and takes a following
+# {\env} with it, matching the order the repairs were originally applied in.
+_ENVIRONMENT_SCANNER = re.compile(
+    r"\\end-to-\\end(?:\{\\(?P<e2e_env>\w+)\})?"                         # \end-to-\end typo
+    r"|\\(?P<env_cmd>begin|end)\{\\(?P<env>\w+)\}"                        # \begin{\env}
+)
+
+_VERT = re.compile(r"\$\s*\\?vert\s*\$")
+_BAR = re.compile(r"\$\s*\|\s*\$")
+# Cheap trigger for the scan: a \textbf{ inside another, with at most one
+# level of groups before it
+_NESTED_TEXTBF_PREFIX = re.compile(r"\\textbf\{(?:[^{}]|\{[^{}]*\})*?\\textbf\{")
+# \textbf{, escaped characters (\{, \}, \\) and braces, for the nested-\textbf scan
+_TEXTBF_BRACES = re.compile(r"\\textbf\{|\\.|[{}]", re.S)
+_LIST_BLOCKS = {
+    env: re.compile(rf"\\begin\{{{env}\}}(.*?)\\end\{{{env}\}}", re.S) for env in ("itemize", "enumerate")
+}
+_NOINDENT = re.compile(r"\\noindent")
+
+# Comments are dropped and unescaped specials escaped in the same scan; whether
+# a match is itself escaped is decided in _escape_special.
+_SPECIALS_SCANNER = re.compile(r"%[^\n]*|[&_#]|\$\$?")
+
+_BEGIN_ENV = re.compile(r"\\begin\{(\w+)\}")
+_END_ENV = re.compile(r"\\end\{(\w+)\}")
+_BLANK_LINES = re.compile(r"\n\n\n+")
+_BLANK_RUNS = re.compile(r"[ \t]+")
+_SPACE_RUNS = re.compile(r"  +")
+
+
+def _repair_command(match: "re.Match") -> str:
+    return match.group("lead") + "\\" + match.group("word")
+
+
+def _repair_environment(match: "re.Match") -> str:
+    if match.lastgroup == "env":
+        return f"\\{match.group('env_cmd')}{{{match.group('env')}}}"
+    # \end-to-\end, with the \end{\env} repair applied to its tail
+    env = match.group("e2e_env")
+    return f"end-to-end{{{env}}}" if env else "end-to-end"
+
+
+def _escape_special(match: "re.Match") -> str:
+    token = match.group(0)
+    start = match.start()
+    previous = match.string[start - 1] if start else ""
+    if token == "$$":
+        return token
+    if token == "$":
+        # A lone $ is escaped unless it directly follows another $
+        return token if previous == "$" else "\\$"
+    if previous == "\\":
+        if token[0] == "%":
+            # \% is text; the rest of the line is scanned on its own
+            return "%" + _SPECIALS_SCANNER.sub(_escape_special, token[1:])
+        return token
+    if token[0] == "%":
+        return ""
+    return "\\" + token
+
+
+def _flatten_textbf(latex_code: str) -> str:
+    """
+    \\textbf nested inside \\textbf reduced to the outer one in a single scan:
+    the inner '\\textbf{' and its matching '}' are dropped, whatever lies between.
+    """
+    parts = []
+    pos = 0
+    # Per open brace: "bold" (outer \textbf), "drop" (nested \textbf) or "" (other group)
+    stack = []
+    bold = 0
+    for match in _TEXTBF_BRACES.finditer(latex_code):
+        token = match.group(0)
+        if token == "\\textbf{":
+            if bold:
+                parts.append(latex_code[pos:match.start()])
+                pos = match.end()
+                stack.append("drop")
+            else:
+                stack.append("bold")
+                bold += 1
+        elif token == "{":
+            stack.append("")
+        elif token == "}" and stack:
+            kind = stack.pop()
+            if kind == "drop":
+                parts.append(latex_code[pos:match.start()])
+                pos = match.end()
+            elif kind == "bold":
+                bold -= 1
+    parts.append(latex_code[pos:])
+    return "".join(parts)
+
+
+def _strip_list_noindent(env: str, match: "re.Match") -> str:
+    return f"\\begin{{{env}}}" + _NOINDENT.sub("", match.group(1)) + f"\\end{{{env}}}"
+
+
+def sanitize_latex(latex_code: str) -> str:
+    """
+    Repair common LLM mistakes in generated LaTeX.
+
+    Produces the same output as pdf_generator.sanitize_latex_output, but every
+    pattern is compiled once, the missing-backslash, environment-name and
+    special-character repairs each take a single scan, the rarely needed
+    repairs (nested \\textbf, \\noindent in lists, $ vert $) are skipped when
+    their trigger is absent, and environments are auto-closed from one pass
+    over \\begin/\\end. Nested \\textbf is flattened by one brace-matching
+    scan instead of the reference's fixed-point regex loop, which is quadratic
+    and mismatches braces when the inner argument contains a group; outputs
+    differ only in that case.
+    """
+    latex_code = latex_code.replace("\\n", "\n")
+
+    if "\\usepackage{\\" in latex_code:
+        latex_code = _USEPACKAGE_COMMAND.sub(r"\\usepackage{\1}", latex_code)
+    if "\\%" in latex_code:
+        latex_code = _LEADING_ESCAPED_PERCENT.sub("\n%", "\n" + latex_code)[1:]
+    # The leading space stands in for the start of the text as a word boundary
+    latex_code = _COMMAND_SCANNER.sub(_repair_command, " " + latex_code)[1:]
+
+    if "$" in latex_code:
+        if "vert" in latex_code:
+            latex_code = _VERT.sub("$|$", latex_code)
+        if "|" in latex_code:
+            latex_code = _BAR.sub("$|$", latex_code)
+
+    if _NESTED_TEXTBF_PREFIX.search(latex_code):
+        latex_code = _flatten_textbf(latex_code)
+
+    if "{\\" in latex_code or "\\end-to-" in latex_code:
+        latex_code = _ENVIRONMENT_SCANNER.sub(_repair_environment, latex_code)
+
+    if "\\noindent" in latex_code:
+        for env, pattern in _LIST_BLOCKS.items():
+            latex_code = pattern.sub(lambda m, env=env: _strip_list_noindent(env, m), latex_code)
+
+    latex_code = _SPECIALS_SCANNER.sub(_escape_special, latex_code)
+
+    # Document structure
+    if "\\documentclass" not in latex_code:
+        latex_code = "\\documentclass[11pt,a4paper]{article}\n" + latex_code
+    if "\\begin{document}" not in latex_code:
+        latex_code += "\n\\begin{document}"
+    if "\\end{document}" not in latex_code:
+        latex_code += "\n\\end{document}"
+
+    closed = set(_END_ENV.findall(latex_code))
+    missing = []
+    for env in _BEGIN_ENV.findall(latex_code):
+        if env not in closed:
+            closed.add(env)
+            missing.append(f"\n\\end{{{env}}}")
+    latex_code += "".join(missing)
+
+    diff = latex_code.count("{") - latex_code.count("}")
+    if diff > 0:
+        latex_code += "}" * diff
+
+    latex_code = _BLANK_LINES.sub("\n\n", latex_code)
+    # Collapse blank runs to one space (without tabs only runs of two or more
+    # change), after which the blanks around newlines are exactly " \n" and "\n ".
+    latex_code = (_BLANK_RUNS if "\t" in latex_code else _SPACE_RUNS).sub(" ", latex_code)
+    latex_code = latex_code.replace(" \n", "\n").replace("\n ", "\n")
+    return latex_code.strip()
+
+
+def sanitize_enabled() -> bool:
+    """LATEX_SANITIZE turns the sanitizer on in the compile path."""
+    return env_flag("LATEX_SANITIZE", False)
@@ -0,0 +1,310 @@
+# file_utils/latex_validator.py
+"""
+Structural checks on generated LaTeX, run before the source reaches pdflatex.
+
+One linear pass over the significant tokens (braces, specials, math shifts,
+\\begin/\\end, comments, paragraph breaks) checks:
+  - brace balance, including braces left open across an environment boundary
+  - \\begin/\\end nesting
+  - document structure: a single \\documentclass and document environment,
+    no \\usepackage in the body
+  - math shifts left open at a paragraph break or the end of the document
+  - specials outside math that pdflatex rejects: & outside alignments,
+    _ and ^ outside math, # outside macro parameters
+
+Problems are reported with 1-based line and column numbers. Anything pdflatex
+accepts is let through; the checks only cover errors that would stop the compile.
+"""
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from core.env import env_flag
+from core.exceptions import LatexValidationError
+from core.logger import get_logger
+from .latex_sanitizer import sanitize_enabled, sanitize_latex
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_DIAGNOSTICS = 20
+
+# Environments whose body is typeset in math mode
+MATH_ENVIRONMENTS = frozenset(
+    name + star
+    for name in ("equation", "align", "alignat", "gather", "multline", "flalign", "eqnarray", "math", "displaymath")
+    for star in ("", "*")
+)
+# Environments in which & separates cells
+ALIGNMENT_ENVIRONMENTS = MATH_ENVIRONMENTS | frozenset((
+    "tabular", "tabular*", "tabularx", "tabulary", "longtable", "supertabular", "xltabular", "array",
+    "matrix", "pmatrix", "bmatrix", "Bmatrix", "vmatrix", "Vmatrix", "smallmatrix", "cases",
+    "split", "aligned", "alignedat", "gathered",
+))
+# Commands whose first braced argument is taken literally (URLs, file names, keys)
+LITERAL_ARGUMENT_COMMANDS = frozenset((
+    "url", "href", "nolinkurl", "path", "label", "ref", "pageref", "eqref", "autoref", "cref", "Cref",
+    "cite", "citep", "citet", "nocite", "includegraphics", "input", "include", "bibliography",
+    "bibliographystyle", "hypersetup", "newcommand", "renewcommand", "providecommand",
+    "newenvironment", "renewenvironment", "def",
+))
+# Math delimiters: opener -> closer
+_MATH_SHIFTS = {"$": "$", "$$": "$$", "\\(": "\\)", "\\[": "\\]"}
+
+# Only tokens that can change the outcome are matched; plain text and commands
+# the checks do not care about are skipped by the regex engine, not in Python.
+# The leading lookahead lets the engine skip to candidate characters instead of
+# trying every alternative at every position.
+_TOKEN = re.compile(
+    r"(?=[%\n\\$&_^#{}])"
+    r"(?:(?P<comment>%[^\n]*)"
+    r"|(?P<par>\n[ \t]*\n)"
+    r"|(?P<verbatim>\\begin\{(?P<verbatim_env>verbatim\*?|Verbatim|lstlisting|minted)\}(?:.|\n)*?\\end\{(?P=verbatim_env)\})"
+    r"|(?P<verb>\\verb\*?(?P<verb_delim>[^A-Za-z\s*])[^\n]*?(?P=verb_delim))"
+    r"|(?P<environment>\\(?P<env_cmd>begin|end)[ \t]*\{(?P<env>[^{}\n]*)\})"
+    r"|(?P<math>\$\$?|\\[()\[\]])"
+    rf"|(?P<command>\\(?P<name>documentclass|usepackage|{'|'.join(sorted(LITERAL_ARGUMENT_COMMANDS, reverse=True))})(?![A-Za-z@]))"
+    r"|(?P<escaped>\\[^A-Za-z@\n])"
+    r"|(?P<open>\{)"
+    r"|(?P<close>\})"
+    r"|(?P<special>[&_^]|#(?!\d|#)))"
+)
+_NEWLINE = re.compile(r"\n")
+
+
+@dataclass(frozen=True)
+class LatexDiagnostic:
+    line: int
+    column: int
+    code: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"line {self.line}, column {self.column}: {self.message}"
+
+
+class _Scan:
+    """State of one validation pass. Positions are kept as offsets and only turned into line/column when reported."""
+
+    def __init__(self, latex_code: str, max_diagnostics: int):
+        self.latex_code = latex_code
+        self.max_diagnostics = max_diagnostics
+        self.diagnostics: List[LatexDiagnostic] = []
+        self._line_starts: Optional[List[int]] = None
+        # Offsets of the open braces
+        self.braces: List[int] = []
+        # (name, offset, brace depth at \begin) of the open environments
+        self.environments: List[tuple] = []
+        # (opener, offset) of the open math shift, if any
+        self.math: Optional[tuple] = None
+        self.math_environments = 0
+        self.alignment_environments = 0
+        # Brace depth inside which specials are literal (argument of \url etc.)
+        self.literal_depth: Optional[int] = None
+        self.literal_pending = False
+        self.documentclass_seen = False
+        self.in_body = False
+
+    @property
+    def full(self) -> bool:
+        return len(self.diagnostics) >= self.max_diagnostics
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        """1-based (line, column) of `offset`."""
+        if self._line_starts is None:
+            self._line_starts = [0] + [m.end() for m in _NEWLINE.finditer(self.latex_code)]
+        index = bisect_right(self._line_starts, offset) - 1
+        return index + 1, offset - self._line_starts[index] + 1
+
+    def where(self, offset: int) -> str:
+        return "line {}, column {}".format(*self.locate(offset))
+
+    def report(self, offset: int, code: str, message: str) -> None:
+        if not self.full:
+            line, column = self.locate(offset)
+            self.diagnostics.append(LatexDiagnostic(line, column, code, message))
+
+    def begin(self, name: str, offset: int) -> None:
+        if name == "document":
+            if self.in_body:
+                self.report(offset, "structure", "duplicate \\begin{document}")
+            elif self.environments:
+                self.report(offset, "structure", f"\\begin{{document}} inside \\begin{{{self.environments[-1][0]}}}")
+            if not self.documentclass_seen:
+                self.report(offset, "structure", "\\begin{document} before \\documentclass")
+            self.in_body = True
+        self.environments.append((name, offset, len(self.braces)))
+        self.math_environments += name in MATH_ENVIRONMENTS
+        self.alignment_environments += name in ALIGNMENT_ENVIRONMENTS
+
+    def end(self, name: str, offset: int) -> bool:
+        """Close `name`; True once \\end{document} is reached."""
+        if not self.environments:
+            self.report(offset, "environment", f"\\end{{{name}}} without a matching \\begin")
+            return False
+        open_name, open_offset, depth = self.environments[-1]
+        if open_name != name:
+            self.report(offset, "environment",
+                        f"\\end{{{name}}} closes \\begin{{{open_name}}} opened at {self.where(open_offset)}")
+            if name not in (env[0] for env in self.environments):
+                return False
+            # Unwind to the matching \begin so one typo does not cascade
+            while self.environments[-1][0] != name:
+                self._pop_environment()
+            open_name, open_offset, depth = self.environments[-1]
+        if len(self.braces) != depth:
+            self.report(offset, "brace", f"unbalanced braces inside \\begin{{{name}}} opened at {self.where(open_offset)}")
+            del self.braces[depth:]
+            if self.literal_depth is not None and self.literal_depth > depth:
+                self.literal_depth = None
+        self._pop_environment()
+        return name == "document"
+
+    def _pop_environment(self) -> None:
+        name = self.environments.pop()[0]
+        self.math_environments -= name in MATH_ENVIRONMENTS
+        self.alignment_environments -= name in ALIGNMENT_ENVIRONMENTS
+
+    def math_shift(self, token: str, offset: int) -> None:
+        if self.math is None:
+            if token in _MATH_SHIFTS:
+                self.math = (token, offset)
+            else:
+                opener = token.replace(")", "(").replace("]", "[")
+                self.report(offset, "math", f"{token} without an opening {opener}")
+            return
+        opener, open_offset = self.math
+        if token == _MATH_SHIFTS[opener]:
+            self.math = None
+        elif opener == "$" and token == "$$":
+            # $a$$b$: one formula closes and the next opens
+            self.math = ("$", offset + 1)
+        else:
+            self.report(offset, "math", f"{token} inside math opened with {opener} at {self.where(open_offset)}")
+
+    def special(self, char: str, offset: int) -> None:
+        if self.literal_depth is not None or not self.in_body:
+            return
+        if char == "&":
+            if not self.alignment_environments:
+                self.report(offset, "special", "unescaped & outside a tabular or alignment (use \\&)")
+        elif char == "#":
+            self.report(offset, "special", "unescaped # (use \\#)")
+        elif self.math is None and not self.math_environments:
+            self.report(offset, "special", f"{char} outside math mode (use \\{char})")
+
+
+def validate_latex(latex_code: str, max_diagnostics: int = DEFAULT_MAX_DIAGNOSTICS) -> List[LatexDiagnostic]:
+    """
+    Check the structure of a LaTeX document in one pass and return its problems,
+    at most `max_diagnostics` of them. Problems are listed as found; anything
+    left open is reported after the pass. An empty list means nothing was
+    found that would stop pdflatex.
+    """
+    scan = _Scan(latex_code, max_diagnostics)
+    braces, diagnostics = scan.braces, scan.diagnostics
+    document_ended = False
+    # Set to resume scanning at an offset: a '%' inside a literal argument
+    # (\href{...%20...}) is text, not a comment, so the rest of its line is scanned.
+    resume_at: Optional[int] = 0
+
+    while resume_at is not None:
+        matches, resume_at = _TOKEN.finditer(latex_code, resume_at), None
+        for match in matches:
+            kind = match.lastgroup
+            offset = match.start()
+
+            # Braces are most of the tokens, so they are handled inline
+            if kind == "open":
+                braces.append(offset)
+                if scan.literal_pending:
+                    scan.literal_pending = False
+                    scan.literal_depth = len(braces)
+                continue
+            if kind == "close":
+                if braces:
+                    if scan.literal_depth == len(braces):
+                        scan.literal_depth = None
+                    braces.pop()
+                    continue
+                scan.report(offset, "brace", "} without a matching {")
+            if kind == "comment":
+                if scan.literal_depth is not None:
+                    resume_at = offset + 1
+                    break
+            elif kind == "special":
+                scan.special(match.group(kind), offset)
+            elif kind == "math":
+                if scan.literal_depth is None:
+                    scan.math_shift(match.group(kind), offset)
+            elif kind == "par":
+                if scan.math is not None:
+                    opener, open_offset = scan.math
+                    scan.report(open_offset, "math", f"{opener} not closed before the paragraph break")
+                    scan.math = None
+                scan.literal_pending = False
+            elif kind == "command":
+                name = match.group("name")
+                if name == "documentclass":
+                    if scan.documentclass_seen:
+                        scan.report(offset, "structure", "duplicate \\documentclass")
+                    scan.documentclass_seen = True
+                elif name == "usepackage":
+                    if scan.in_body:
+                        scan.report(offset, "structure", "\\usepackage after \\begin{document}")
+                else:
+                    scan.literal_pending = True
+            elif kind == "environment":
+                name = match.group("env").strip()
+                if match.group("env_cmd") == "begin":
+                    scan.begin(name, offset)
+                elif scan.end(name, offset):
+                    document_ended = True
+                    break
+
+            if len(diagnostics) >= max_diagnostics:
+                break
+
+    if not scan.full:
+        _report_unclosed(scan, document_ended)
+    return scan.diagnostics
+
+
+def _report_unclosed(scan: _Scan, document_ended: bool) -> None:
+    end = len(scan.latex_code)
+    if scan.math is not None:
+        opener, offset = scan.math
+        scan.report(offset, "math", f"{opener} is never closed")
+    for name, offset, _ in reversed(scan.environments):
+        scan.report(offset, "environment", f"\\begin{{{name}}} is never closed")
+    for offset in reversed(scan.braces):
+        scan.report(offset, "brace", "{ is never closed")
+    if not scan.documentclass_seen:
+        scan.report(0, "structure", "missing \\documentclass")
+    if not scan.in_body:
+        scan.report(end, "structure", "missing \\begin{document}")
+    elif not document_ended and not any(env[0] == "document" for env in scan.environments):
+        scan.report(end, "structure", "missing \\end{document}")
+
+
+def validation_enabled() -> bool:
+    """LATEX_VALIDATE (default on) checks generated LaTeX before it is compiled."""
+    return env_flag("LATEX_VALIDATE", True)
+
+
+def check_latex(latex_code: str) -> None:
+    """
+    Raise LatexValidationError if the document would not compile. Validates the
+    source pdflatex will see, i.e. after the sanitizer when LATEX_SANITIZE is on.
+    No-op when LATEX_VALIDATE is off.
+    """
+    if not validation_enabled():
+        return
+    if sanitize_enabled():
+        latex_code = sanitize_latex(latex_code)
+    diagnostics = validate_latex(latex_code)
+    if diagnostics:
+        summary = "; ".join(str(d) for d in diagnostics[:5])
+        more = f" (+{len(diagnostics) - 5} more)" if len(diagnostics) > 5 else ""
+        logger.warning(f"Generated LaTeX failed validation with {len(diagnostics)} problem(s): {summary}{more}")
+        raise LatexValidationError(f"Invalid LaTeX: {summary}{more}", diagnostics)
@@ -0,0 +1,208 @@
+# file_utils/pdf_cache.py
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+from datetime import date
+from typing import Any, Dict, Optional
+
+from core.env import env_flag, env_int
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_MB = 256
+# Bump when a change to the compile pipeline alters the PDFs produced for the same source.
+# The key covers the source, not the compile environment: the one input known
+# to vary is the date, so sources that print it (\today, or \maketitle without
+# an explicit \date{...}) get the current date in their key and are cached for
+# the day only. Other run-dependent output (\jobname tricks, \input of files
+# that change) is not detected; disable the cache for such documents.
+PDF_CACHE_VERSION = "1"
+
+_TRAILING_WHITESPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_TODAY = re.compile(r"\\today(?![A-Za-z])")
+_MAKETITLE = re.compile(r"\\maketitle(?![A-Za-z])")
+_EXPLICIT_DATE = re.compile(r"\\date\s*\{")
+
+
+def normalize_latex(latex_code: str) -> str:
+    """Whitespace-only differences (line endings, trailing blanks) produce the same PDF."""
+    text = latex_code.replace("\r\n", "\n").replace("\r", "\n")
+    return _TRAILING_WHITESPACE.sub("", text).strip()
+
+
+def is_date_dependent(latex_code: str) -> bool:
+    """Whether the compiled PDF shows the compile date."""
+    if _TODAY.search(latex_code):
+        return True
+    # \maketitle prints \today unless the document sets its own date
+    return bool(_MAKETITLE.search(latex_code)) and not _EXPLICIT_DATE.search(latex_code)
+
+
+def make_pdf_cache_key(latex_code: str, engine_version: str, format_mode: str) -> str:
+    """
+    Content-addressed key: normalized source, engine version, format mode and
+    cache version, plus today's date for sources that print it.
+    """
+    source = normalize_latex(latex_code)
+    parts = [PDF_CACHE_VERSION, engine_version, format_mode, source]
+    if is_date_dependent(source):
+        parts.append(date.today().isoformat())
+    material = "\0".join(parts)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LatexPdfCache:
+    """
+    Compiled PDFs stored by source hash, so identical LaTeX skips pdflatex.
+    The directory is bounded by total size; least recently used PDFs
+    (by mtime, refreshed on every hit) are evicted first.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_served": 0,
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Place the cached PDF for `key` at output_path (hard link, else copy). False on a miss."""
+        cached = self._path(key)
+        try:
+            os.utime(cached)
+            size = os.path.getsize(cached)
+            place_file(cached, output_path)
+        except OSError:
+            with self._lock:
+                self.stats["misses"] += 1
+            return False
+
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["bytes_served"] += size
+        return True
+
+    def store(self, key: str, pdf_path: str) -> None:
+        """Copy a freshly compiled PDF into the cache, then evict down to the size bound."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(pdf_path, tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except OSError as exc:
+            logger.warning(f"PDF cache write failed: {exc}")
+            return
+
+        with self._lock:
+            self.stats["stores"] += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pdf"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+                self.stats["evictions"] += 1
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        try:
+            files = [f for f in os.listdir(self.cache_dir) if f.endswith(".pdf")]
+            stats["entries"] = len(files)
+            stats["disk_bytes"] = sum(os.path.getsize(os.path.join(self.cache_dir, f)) for f in files)
+        except OSError:
+            stats["entries"] = 0
+            stats["disk_bytes"] = 0
+        return stats
+
+
+def place_file(source: str, destination: str, move: bool = False) -> None:
+    """
+    Atomically make `destination` a copy of `source`: readers see either the old
+    file or the complete new one. Moves rename and copies hard-link when source and
+    destination share a filesystem; otherwise the data is copied to a temporary
+    file next to the destination, which is then renamed into place.
+    """
+    dest_dir = os.path.dirname(os.path.abspath(destination))
+    if move:
+        try:
+            os.replace(source, destination)
+            return
+        except OSError:
+            pass  # Different filesystem (e.g. a tmpfs workspace)
+
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        if move:
+            shutil.copyfile(source, tmp_path)
+        else:
+            os.remove(tmp_path)
+            try:
+                os.link(source, tmp_path)
+            except OSError:
+                shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if move:
+        os.remove(source)
+
+
+_cache: Optional[LatexPdfCache] = None
+_cache_lock = threading.Lock()
+
+
+def pdf_cache_enabled() -> bool:
+    return env_flag("LATEX_PDF_CACHE_ENABLED", True)
+
+
+def get_pdf_cache() -> LatexPdfCache:
+    """Process-wide PDF cache, configured from env on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LatexPdfCache(
+                    os.getenv("LATEX_PDF_CACHE_DIR", "data/cache/pdf"),
+                    max_bytes=env_int("LATEX_PDF_CACHE_MAX_MB", DEFAULT_MAX_MB) * 1024 * 1024,
+                )
+    return _cache
+
+
+def get_pdf_cache_stats() -> Dict[str, Any]:
+    """Hits, misses, evictions and disk usage of the compiled PDF cache."""
+    return get_pdf_cache().get_stats()
@@ -0,0 +1,135 @@
+# file_utils/pdf_extractors.py
+"""
+Pluggable PDF text extraction backends.
+
+  - pypdf       fast path; reads the content streams without layout analysis
+  - pdfplumber  layout-aware; pages are processed one at a time and each page's
+                parsed objects are released before the next is opened
+
+Long documents can be split into page ranges and extracted on a process pool.
+The backend is chosen with PDF_EXTRACT_BACKEND; every backend returns the
+pages' text joined by newlines.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import pdfplumber
+from pypdf import PdfReader
+
+from core.env import env_flag, env_int
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BACKEND = "pdfplumber"
+DEFAULT_PARALLEL_MIN_PAGES = 16
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+def _pypdf_pages(data: bytes, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    reader = PdfReader(io.BytesIO(data))
+    pages = reader.pages[start:stop]
+    return [(page.extract_text() or "").strip() for page in pages]
+
+
+def _pdfplumber_pages(data: bytes, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    texts = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[start:stop]:
+            texts.append((page.extract_text() or "").strip())
+            # Drop the page's chars/layout objects now instead of when the PDF closes
+            page.flush_cache()
+    return texts
+
+
+BACKENDS: Dict[str, Callable[..., List[str]]] = {
+    "pypdf": _pypdf_pages,
+    "pdfplumber": _pdfplumber_pages,
+}
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Backend name from the argument or PDF_EXTRACT_BACKEND; unknown names fall back to the default."""
+    name = (backend or os.getenv("PDF_EXTRACT_BACKEND") or DEFAULT_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        logger.warning(f"Unknown PDF extraction backend '{name}'; using {DEFAULT_BACKEND}.")
+        return DEFAULT_BACKEND
+    return name
+
+
+# -----------------------------
+# Page-parallel mode
+# -----------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process-wide pool, created on first use. Spawned rather than forked: the app is multi-threaded."""
+    global _pool, _pool_workers
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool_workers = max(1, env_int("PDF_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+                _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=multiprocessing.get_context("spawn"))
+                logger.info(f"Started PDF extraction pool with {_pool_workers} workers")
+    return _pool
+
+
+def shutdown_pool(wait: bool = False) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=True)
+            _pool = None
+
+
+def _extract_range(backend: str, data: bytes, start: int, stop: int) -> List[str]:
+    """Worker entry point; module-level so it can be pickled."""
+    return BACKENDS[backend](data, start, stop)
+
+
+def count_pages(data: bytes) -> int:
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+def _extract_parallel(backend: str, data: bytes, page_count: int) -> List[str]:
+    pool = _get_pool()
+    chunks = max(1, min(_pool_workers, page_count))
+    size = -(-page_count // chunks)
+    futures = [
+        pool.submit(_extract_range, backend, data, start, min(start + size, page_count))
+        for start in range(0, page_count, size)
+    ]
+    texts: List[str] = []
+    for future in futures:
+        texts.extend(future.result())
+    return texts
+
+
+def extract_text(data: bytes, backend: Optional[str] = None, parallel: Optional[bool] = None) -> str:
+    """
+    Extract the text of a PDF given as bytes.
+
+    Args:
+        backend: 'pypdf' or 'pdfplumber' (default: PDF_EXTRACT_BACKEND).
+        parallel: split pages across the process pool. Defaults to PDF_EXTRACT_PARALLEL,
+            and only applies to documents of at least PDF_EXTRACT_PARALLEL_MIN_PAGES pages.
+    """
+    name = resolve_backend(backend)
+    if parallel is None:
+        parallel = env_flag("PDF_EXTRACT_PARALLEL", False)
+
+    if parallel:
+        page_count = count_pages(data)
+        if page_count >= env_int("PDF_EXTRACT_PARALLEL_MIN_PAGES", DEFAULT_PARALLEL_MIN_PAGES):
+            return "\n".join(_extract_parallel(name, data, page_count)).strip()
+
+    return "\n".join(BACKENDS[name](data)).strip()
@@ -1,9 +1,27 @@
 import subprocess
+import hashlib
 import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+from core.env import env_flag, env_int
 from core.logger import get_logger
 import re
 from core.exceptions import PDFGenerationError
+from .latex_sanitizer import sanitize_enabled, sanitize_latex
+from .pdf_cache import get_pdf_cache, make_pdf_cache_key, pdf_cache_enabled, place_file
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory limits are skipped there
+    resource = None
 
 logger = get_logger(__name__)
 
@@ -36,7 +54,8 @@ def sanitize_latex_output(latex_code: str) -> str:
     }
 
     # Fix missing backslashes
-    pattern = re.compile(r'(?<!\\)(?<=\s|^|\{)(' + "|".join(re.escape(cmd) for cmd in known_commands) + r')(?=\s|\\|{|$)')
+    # Lookbehinds must be fixed-width, so the start-of-text case is a separate branch
+    pattern = re.compile(r'(?<!\\)(?:(?<=\s|\{)|^)(' + "|".join(re.escape(cmd) for cmd in known_commands) + r')(?=\s|\\|{|$)')
     latex_code = pattern.sub(r'\\\1', latex_code)
 
     # --- Fix misused math-mode vertical bars --- 
@@ -108,12 +127,405 @@ def sanitize_latex_output(latex_code: str) -> str:
     return latex_code
 
 
+# -----------------------------
+# LaTeX compile service
+# -----------------------------
+DEFAULT_COMPILE_TIMEOUT_IN_SECS = 60
+DEFAULT_COMPILE_MEMORY_LIMIT_MB = 1024
+LATENCY_WINDOW = 256
+
+
+def _memory_limiter(limit_bytes: int):
+    """preexec_fn that caps the child's address space; only calls setrlimit, which is safe after fork."""
+    def apply_limit():
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    return apply_limit
+
+
+def run_latex_command(
+    command: List[str],
+    timeout: Optional[float] = None,
+    memory_limit_mb: Optional[int] = None,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run a TeX command with a wall-clock timeout and an address-space limit.
+
+    The command gets its own process group, so on timeout the whole group
+    (pdflatex and anything it spawned) is killed before TimeoutExpired is raised.
+    A non-zero exit raises CalledProcessError, as subprocess.run(check=True) does.
+    """
+    if timeout is None:
+        timeout = env_int("LATEX_COMPILE_TIMEOUT_IN_SECS", DEFAULT_COMPILE_TIMEOUT_IN_SECS)
+    if memory_limit_mb is None:
+        memory_limit_mb = env_int("LATEX_COMPILE_MEMORY_LIMIT_MB", DEFAULT_COMPILE_MEMORY_LIMIT_MB)
+
+    preexec_fn = None
+    if resource is not None and memory_limit_mb > 0:
+        preexec_fn = _memory_limiter(memory_limit_mb * 1024 * 1024)
+
+    proc = subprocess.Popen(
+        command,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+        preexec_fn=preexec_fn,
+    )
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout if timeout > 0 else None)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        stdout, stderr = proc.communicate()
+        logger.error(f"LaTeX compilation killed after {timeout}s: {' '.join(command)}")
+        raise subprocess.TimeoutExpired(command, timeout, output=stdout, stderr=stderr)
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, command, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class LatexCompileService:
+    """
+    Bounded pool of LaTeX compiles.
+
+    At most `max_parallel` pdflatex processes run at once; further jobs wait in
+    the executor queue. Tracks queue depth, queue wait and compile latency.
+    """
+
+    def __init__(self, max_parallel: int):
+        self.max_parallel = max(1, max_parallel)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="latex-compile")
+        self._lock = threading.Lock()
+        self._queue_wait: deque = deque(maxlen=LATENCY_WINDOW)
+        self._compile_secs: deque = deque(maxlen=LATENCY_WINDOW)
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "queued": 0,
+            "running": 0,
+            "max_queue_depth": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "timeouts": 0,
+        }
+
+    def submit(self, latex_code: str, output_filename: str, output_dir: str) -> "Future[str]":
+        """Queue a compile; the future resolves to the PDF path."""
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self.stats["submitted"] += 1
+            self.stats["queued"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.stats["queued"])
+        return self._executor.submit(self._run, latex_code, output_filename, output_dir, enqueued_at)
+
+    def compile(self, latex_code: str, output_filename: str, output_dir: str) -> str:
+        """Compile and wait for the PDF path."""
+        return self.submit(latex_code, output_filename, output_dir).result()
+
+    def _run(self, latex_code: str, output_filename: str, output_dir: str, enqueued_at: float) -> str:
+        started_at = time.perf_counter()
+        with self._lock:
+            self.stats["queued"] -= 1
+            self.stats["running"] += 1
+            self._queue_wait.append(started_at - enqueued_at)
+
+        outcome = "failed"
+        try:
+            path = create_pdf_from_latex(latex_code, output_filename, output_dir)
+            outcome = "succeeded"
+            return path
+        except subprocess.TimeoutExpired:
+            outcome = "timeouts"
+            raise
+        finally:
+            with self._lock:
+                self.stats["running"] -= 1
+                self.stats[outcome] += 1
+                self._compile_secs.append(time.perf_counter() - started_at)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            queue_wait = list(self._queue_wait)
+            compile_secs = list(self._compile_secs)
+        stats["max_parallel"] = self.max_parallel
+        stats["queue_wait_p50_secs"] = round(_percentile(queue_wait, 50), 3)
+        stats["queue_wait_p95_secs"] = round(_percentile(queue_wait, 95), 3)
+        stats["compile_p50_secs"] = round(_percentile(compile_secs, 50), 3)
+        stats["compile_p95_secs"] = round(_percentile(compile_secs, 95), 3)
+        return stats
+
+
+# -----------------------------
+# Preamble format cache
+# -----------------------------
+PDFLATEX = "pdflatex"
+BEGIN_DOCUMENT = "\\begin{document}"
+
+_engine_version: Optional[str] = None
+_engine_version_lock = threading.Lock()
+
+
+def get_engine_version() -> Optional[str]:
+    """First line of `pdflatex --version`, or None when pdflatex is unavailable. Probed once."""
+    global _engine_version
+    if _engine_version is None:
+        with _engine_version_lock:
+            if _engine_version is None:
+                try:
+                    out = subprocess.run([PDFLATEX, "--version"], capture_output=True, text=True, timeout=10)
+                    _engine_version = out.stdout.splitlines()[0].strip() if out.stdout else ""
+                except (OSError, subprocess.SubprocessError) as exc:
+                    logger.warning(f"Could not determine {PDFLATEX} version: {exc}")
+                    _engine_version = ""
+    return _engine_version or None
+
+
+def split_preamble(latex_code: str) -> Optional[Tuple[str, str]]:
+    """(preamble, body) split at the first \\begin{document}, or None if there is none."""
+    index = latex_code.find(BEGIN_DOCUMENT)
+    if index <= 0:
+        return None
+    return latex_code[:index], latex_code[index:]
+
+
+class LatexFormatCache:
+    """
+    Dumped pdflatex formats keyed by preamble hash.
+
+    The first document with a given preamble pays for `pdflatex -ini` with the
+    preamble followed by \\dump; later documents with that preamble compile
+    only their body against the stored .fmt and skip reloading every package.
+    The key includes the engine version, so a TeX upgrade rebuilds formats.
+    Preambles that cannot be dumped are remembered and compiled normally.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._unbuildable: set = set()
+        self._timings: Dict[str, deque] = {
+            "with_format": deque(maxlen=LATENCY_WINDOW),
+            "without_format": deque(maxlen=LATENCY_WINDOW),
+            "build": deque(maxlen=LATENCY_WINDOW),
+        }
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "builds": 0,
+            "build_failures": 0,
+            "fallbacks": 0,
+        }
+
+    def key(self, preamble: str, engine_version: str) -> str:
+        return hashlib.sha256(f"{engine_version}\n{preamble}".encode("utf-8")).hexdigest()[:32]
+
+    def env(self) -> Dict[str, str]:
+        """Subprocess environment in which kpathsea finds the cached formats (trailing ':' keeps the defaults)."""
+        env = dict(os.environ)
+        env["TEXFORMATS"] = f"{self.cache_dir}{os.pathsep}{env.get('TEXFORMATS', '')}"
+        return env
+
+    def format_for(self, latex_code: str) -> Optional[Tuple[str, str]]:
+        """(format name, document body) for `latex_code`, building the format if needed; None to compile normally."""
+        parts = split_preamble(latex_code)
+        engine_version = get_engine_version()
+        if parts is None or engine_version is None:
+            return None
+        preamble, body = parts
+
+        name = self.key(preamble, engine_version)
+        if os.path.exists(self._fmt_path(name)):
+            self._count("hits")
+            return name, body
+
+        with self._lock:
+            if name in self._unbuildable:
+                return None
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+
+        with build_lock:
+            if not os.path.exists(self._fmt_path(name)) and not self._build(name, preamble):
+                return None
+        return name, body
+
+    def _fmt_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.fmt")
+
+    def _build(self, name: str, preamble: str) -> bool:
+        started_at = time.perf_counter()
+        build_dir = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            build_dir = tempfile.mkdtemp(prefix=f"{name}_", dir=self.cache_dir)
+            with open(os.path.join(build_dir, f"{name}.tex"), "w", encoding="utf-8") as f:
+                f.write(preamble)
+                f.write("\n\\dump\n")
+            run_latex_command(
+                [PDFLATEX, "-ini", "-interaction=nonstopmode", f"-jobname={name}", f"&{PDFLATEX}", f"{name}.tex"],
+                cwd=build_dir,
+            )
+            # Publish atomically so concurrent compiles never load a partial format
+            os.replace(os.path.join(build_dir, f"{name}.fmt"), self._fmt_path(name))
+            secs = time.perf_counter() - started_at
+            with self._lock:
+                self.stats["builds"] += 1
+                self._timings["build"].append(secs)
+            logger.info(f"Built LaTeX format {name} in {secs:.2f}s")
+            return True
+        except (OSError, subprocess.SubprocessError) as exc:
+            logger.warning(f"Could not build LaTeX format for preamble {name}; compiling without it: {exc}")
+            with self._lock:
+                self.stats["build_failures"] += 1
+                self._unbuildable.add(name)
+            return False
+        finally:
+            if build_dir:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.stats[counter] += 1
+
+    def record_compile(self, with_format: bool, secs: float) -> None:
+        with self._lock:
+            self._timings["with_format" if with_format else "without_format"].append(secs)
+
+    def record_fallback(self) -> None:
+        self._count("fallbacks")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            timings = {label: list(samples) for label, samples in self._timings.items()}
+        for label, samples in timings.items():
+            stats[f"{label}_count"] = len(samples)
+            stats[f"{label}_p50_secs"] = round(_percentile(samples, 50), 3)
+        return stats
+
+
+_format_cache: Optional[LatexFormatCache] = None
+_format_cache_lock = threading.Lock()
+
+
+def format_cache_enabled() -> bool:
+    return env_flag("LATEX_FORMAT_CACHE_ENABLED", False)
+
+
+def get_format_cache() -> LatexFormatCache:
+    """Process-wide format cache in LATEX_FORMAT_CACHE_DIR."""
+    global _format_cache
+    if _format_cache is None:
+        with _format_cache_lock:
+            if _format_cache is None:
+                _format_cache = LatexFormatCache(os.getenv("LATEX_FORMAT_CACHE_DIR", "data/cache/latex_fmt"))
+    return _format_cache
+
+
+def get_format_cache_stats() -> Dict[str, Any]:
+    """Format builds/hits/fallbacks and median compile time with and without a cached format."""
+    return get_format_cache().get_stats()
+
+
+def _compile_tex(latex_code: str, tex_file: str, output_dir: str) -> subprocess.CompletedProcess:
+    """
+    Compile `tex_file` (which holds `latex_code`) into output_dir.
+    With LATEX_FORMAT_CACHE_ENABLED, the body is compiled against the cached
+    preamble format, falling back to a full compile if that fails.
+    """
+    command = [PDFLATEX, "-interaction=nonstopmode", "-output-directory", output_dir]
+
+    if format_cache_enabled():
+        cache = get_format_cache()
+        cached = cache.format_for(latex_code)
+        if cached is not None:
+            fmt_name, body = cached
+            with open(tex_file, "w", encoding="utf-8") as f:
+                f.write(body)
+            started_at = time.perf_counter()
+            try:
+                result = run_latex_command(command[:1] + [f"-fmt={fmt_name}"] + command[1:] + [tex_file], env=cache.env())
+                cache.record_compile(True, time.perf_counter() - started_at)
+                return result
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"Compile against format {fmt_name} failed (returncode={e.returncode}); retrying without it.")
+                cache.record_fallback()
+                with open(tex_file, "w", encoding="utf-8") as f:
+                    f.write(latex_code)
+
+    started_at = time.perf_counter()
+    result = run_latex_command(command + [tex_file])
+    get_format_cache().record_compile(False, time.perf_counter() - started_at)
+    return result
+
+
+_compile_service: Optional[LatexCompileService] = None
+_compile_service_lock = threading.Lock()
+
+
+def get_compile_service() -> LatexCompileService:
+    """Process-wide compile service, sized from LATEX_COMPILE_MAX_PARALLEL on first use."""
+    global _compile_service
+    if _compile_service is None:
+        with _compile_service_lock:
+            if _compile_service is None:
+                max_parallel = env_int("LATEX_COMPILE_MAX_PARALLEL", min(4, os.cpu_count() or 1))
+                _compile_service = LatexCompileService(max_parallel)
+                logger.info(f"Started LaTeX compile service (max_parallel={_compile_service.max_parallel})")
+    return _compile_service
+
+
+def get_compile_stats() -> Dict[str, Any]:
+    """Queue depth, outcome counters and latency percentiles of the compile service."""
+    return get_compile_service().get_stats()
+
+
+# -----------------------------
+# Compile workspaces
+# -----------------------------
+TMPFS_DIR = "/dev/shm"
+WORKSPACE_TEX_BASE = "document"
+
+
+def _workspace_root() -> Optional[str]:
+    """
+    Parent directory for per-job workspaces: LATEX_WORKSPACE_DIR if set, else
+    /dev/shm when LATEX_WORKSPACE_TMPFS is on and usable, else the system temp dir.
+    """
+    configured = os.getenv("LATEX_WORKSPACE_DIR")
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    if env_flag("LATEX_WORKSPACE_TMPFS", False) and os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK):
+        return TMPFS_DIR
+    return None
 
 
 def create_pdf_from_latex(latex_code_raw, output_filename="document.pdf", output_dir=None):
     """
     Compiles LaTeX code into a PDF file using pdflatex.
 
+    The compile runs in a private temporary directory, so parallel jobs never
+    share .tex/.aux/.log files; only the finished PDF is moved, atomically,
+    into output_dir.
+
     Args:
         latex_code (str): The raw LaTeX code to compile.
                           It is assumed this string is a complete LaTeX document.
@@ -123,85 +535,86 @@ def create_pdf_from_latex(latex_code_raw, output_filename="document.pdf", output
         output_dir = os.getenv("DATA_DIR")
 
     if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
+        os.makedirs(output_dir, exist_ok=True)
 
-    # Use a unique temporary .tex file name to avoid conflicts
-    timestamp_for_temp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    temp_tex_base = f"temp_{timestamp_for_temp}"
-    temp_tex_file = os.path.join(output_dir, f"{temp_tex_base}.tex")
-    
     pdf_output_path = os.path.join(output_dir, output_filename)
 
+    latex_code = sanitize_latex(latex_code_raw) if sanitize_enabled() else latex_code_raw
 
-   
-    #latex_code =  sanitize_latex_output(latex_code_raw)
+    # Identical source (retries, cached LLM responses, reruns) reuses the stored PDF
+    cache_key = None
+    engine_version = get_engine_version() if pdf_cache_enabled() else None
+    if engine_version:
+        format_mode = "fmt" if format_cache_enabled() else "plain"
+        cache_key = make_pdf_cache_key(latex_code, engine_version, format_mode)
+        if get_pdf_cache().fetch(cache_key, pdf_output_path):
+            logger.info(f"PDF cache hit; reused compiled PDF for {output_filename}")
+            return pdf_output_path
 
-    with open(temp_tex_file, "w", encoding="utf-8") as f:
-        f.write(latex_code_raw)
+    workspace = tempfile.mkdtemp(prefix="latex_", dir=_workspace_root())
+    temp_tex_file = os.path.join(workspace, f"{WORKSPACE_TEX_BASE}.tex")
 
     try:
-        compile_command = [
-            "pdflatex",
-            "-interaction=nonstopmode",  # Don't prompt for input on errors
-            "-output-directory", output_dir,  # Place output files in generated_docs
-            temp_tex_file
-        ]
-        result = subprocess.run(compile_command, check=True, capture_output=True, text=True)
+        with open(temp_tex_file, "w", encoding="utf-8") as f:
+            f.write(latex_code)
+
+        result = _compile_tex(latex_code, temp_tex_file, workspace)
 
         # The output PDF will have the same base name as the .tex file
-        generated_pdf_name = f"{temp_tex_base}.pdf"
-        generated_pdf_path = os.path.join(output_dir, generated_pdf_name)
+        generated_pdf_path = os.path.join(workspace, f"{WORKSPACE_TEX_BASE}.pdf")
 
         if os.path.exists(generated_pdf_path):
-            if generated_pdf_path != pdf_output_path:
-                os.rename(generated_pdf_path, pdf_output_path)
+            place_file(generated_pdf_path, pdf_output_path, move=True)
             print(f"PDF created successfully: {pdf_output_path}")
+            if cache_key:
+                get_pdf_cache().store(cache_key, pdf_output_path)
         else:
             logger.error("PDF output not found after compilation.")
             raise RuntimeError("PDF output not found after compilation.")
 
-        # Clean up temporary files (aux, log, etc. generated by pdflatex)
-        temp_files_to_clean = [
-            f"{temp_tex_base}.aux",
-            f"{temp_tex_base}.log",
-            f"{temp_tex_base}.fls",
-            f"{temp_tex_base}.fdb_latexmk"  # Generated by latexmk if used
-        ]
-        for ext in temp_files_to_clean:
-            file_to_remove = os.path.join(output_dir, ext)
-            if os.path.exists(file_to_remove):
-                os.remove(file_to_remove)
-        
-        os.remove(temp_tex_file)  # Remove the .tex file itself
-
         return pdf_output_path
 
     except subprocess.CalledProcessError as e:
         logger.error(f"LaTeX compilation failed returncode={e.returncode} STDOUT={e.stdout} STDERR={e.stderr}")
-
-        # Attempt to clean up temp .tex file even if compilation failed
-        if os.path.exists(temp_tex_file):
-            os.remove(temp_tex_file)
         raise  # Re-raise the exception after logging
 
+    except subprocess.TimeoutExpired:
+        raise
+
     except Exception as e:
         logger.error(f"Latex to PDF Generation Error occurred: {e}")
-        if os.path.exists(temp_tex_file):
-            os.remove(temp_tex_file)
         raise PDFGenerationError(f"Latex to PDF Generation Error due to: {e}")
 
+    finally:
+        # The .tex, .aux, .log etc. never leave the workspace
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def _resolve_pdf(future: "Future[str]") -> str:
+    try:
+        file_path = future.result()
+        if not os.path.exists(file_path):
+            raise RuntimeError(f"PDF generation failed: {file_path} not found.")
+        return file_path
+
+    except Exception as e:
+        logger.critical(f"PDF generation failed: {str(e)}", exc_info=True)
+        raise RuntimeError("Failed to generate PDF") from e
+
 
-def generate_pdf(latex_code: str, file_name: str, output_dir: str) -> str:
+def generate_pdf(latex_code: str, file_name: str, output_dir: str, wait: bool = True) -> Union[str, "Future[str]"]:
     """
     Generates a PDF from provided LaTeX code for a resume.
     Ensures proper logging, directory handling, and error management.
+    The compile runs on the bounded LaTeX compile service.
 
     Args:
         latex_code (str): The complete LaTeX code for the resume.
+        wait (bool): Block until the PDF is ready. When False, return a
+            Future that resolves to the path (or raises RuntimeError).
 
     Returns:
-        str: The path to the generated PDF file.
+        str: The path to the generated PDF file, or a Future of it.
 
     Raises:
         ValueError: If latex_code is empty.
@@ -212,18 +625,23 @@ def generate_pdf(latex_code: str, file_name: str, output_dir: str) -> str:
         logger.error("Empty LaTeX code received for PDF generation.")
         raise ValueError("LaTeX code cannot be empty.")
 
-    try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"{file_name}_{timestamp}.pdf"
+    # Timestamp for readability, random suffix so jobs finishing in the same second never collide
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_filename = f"{file_name}_{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
 
-        os.makedirs(output_dir, exist_ok=True)
-        
-        file_path = create_pdf_from_latex(latex_code, output_filename, output_dir)
-        if not os.path.exists(file_path):
-            raise RuntimeError(f"PDF generation failed: {file_path} not found.")
+    os.makedirs(output_dir, exist_ok=True)
 
-        return file_path
+    compile_future = get_compile_service().submit(latex_code, output_filename, output_dir)
+    if wait:
+        return _resolve_pdf(compile_future)
 
-    except Exception as e:
-        logger.critical(f"PDF generation failed: {str(e)}", exc_info=True)
-        raise RuntimeError("Failed to generate PDF")
+    result: "Future[str]" = Future()
+
+    def _on_done(done: "Future[str]") -> None:
+        try:
+            result.set_result(_resolve_pdf(done))
+        except Exception as e:
+            result.set_exception(e)
+
+    compile_future.add_done_callback(_on_done)
+    return result
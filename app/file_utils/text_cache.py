@@ -0,0 +1,148 @@
+# file_utils/text_cache.py
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from core.env import env_flag, env_int
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 64
+
+
+def make_text_cache_key(data: bytes, extractor: str) -> str:
+    """Content-addressed key: hash of the PDF bytes plus the extractor that produced the text."""
+    return f"{hashlib.sha256(data).hexdigest()}-{extractor}"
+
+
+class PdfTextCache:
+    """
+    Two-tier cache of text extracted from PDFs, keyed by file content rather than path.
+      - In-memory LRU tier bounded by entry count
+      - Optional on-disk tier, one UTF-8 text file per key
+    A rewritten PDF hashes to a new key, so stale text is never served.
+    """
+
+    def __init__(self, memory_entries: int = DEFAULT_MEMORY_ENTRIES, disk_dir: Optional[str] = None):
+        self.memory_entries = memory_entries
+        self.disk_dir = disk_dir
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            # PDF bytes that did not have to be parsed thanks to a hit
+            "bytes_saved": 0,
+        }
+
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+            except OSError as exc:
+                logger.error(f"Disabling on-disk PDF text cache at {disk_dir}: {exc}")
+                self.disk_dir = None
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def get(self, key: str, source_size: int = 0) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["bytes_saved"] += source_size
+                return text
+
+            if self.disk_dir:
+                try:
+                    with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                        text = f.read()
+                except FileNotFoundError:
+                    text = None
+                except OSError as exc:
+                    logger.warning(f"PDF text cache disk lookup failed: {exc}")
+                    text = None
+                if text is not None:
+                    self._remember(key, text)
+                    self.stats["disk_hits"] += 1
+                    self.stats["bytes_saved"] += source_size
+                    return text
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, text: str) -> None:
+        with self._lock:
+            self._remember(key, text)
+            self.stats["stores"] += 1
+
+            if self.disk_dir:
+                # Write-then-rename so a concurrent reader never sees a partial file
+                try:
+                    fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(text)
+                    os.replace(tmp_path, self._disk_path(key))
+                except OSError as exc:
+                    logger.warning(f"PDF text cache disk write failed: {exc}")
+
+    def _remember(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir:
+                for name in os.listdir(self.disk_dir):
+                    if name.endswith(".txt"):
+                        try:
+                            os.remove(os.path.join(self.disk_dir, name))
+                        except OSError:
+                            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[PdfTextCache] = None
+_cache_lock = threading.Lock()
+
+
+def pdf_text_cache_enabled() -> bool:
+    return env_flag("PDF_TEXT_CACHE_ENABLED", True)
+
+
+def get_pdf_text_cache() -> PdfTextCache:
+    """Process-wide cache, configured from env on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PdfTextCache(
+                    memory_entries=env_int("PDF_TEXT_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES),
+                    disk_dir=os.getenv("PDF_TEXT_CACHE_DIR") or None,
+                )
+    return _cache
+
+
+def get_pdf_text_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and bytes saved of the process-wide PDF text cache."""
+    return get_pdf_text_cache().get_stats()
@@ -0,0 +1,285 @@
+# batch.py
+"""
+Headless batch runner: tailors the resume, and optionally writes a cover letter
+and sends the application email, for every job posting in a JSONL or CSV file.
+Each row runs through the stage pipeline in app/agents/pipeline.py.
+
+    python batch.py --resume my_resume.tex --jobs postings.jsonl --workers 4 --send-email
+
+Each row needs a role, company, recruiter email and job description. Per-row
+status and stage timings are appended to <output-dir>/manifest.jsonl as rows
+finish, so an interrupted run can be resumed with --skip-completed.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+from core.env import env_int
+from core.logger import get_logger
+from app.agents import build_application_pipeline
+from app.agents.response_decoder import get_decoder_stats
+from app.agents.prompt_budget import get_prompt_stats
+from app.agents.resume_edits import get_edit_stats
+from core.prompt_loader import get_prompt_registry_stats
+from app.email_utils.gmail_sender import get_gmail_stats
+from app.file_utils import (
+    get_compile_stats,
+    get_format_cache_stats,
+    get_pdf_cache_stats,
+    get_pdf_text_cache_stats,
+)
+from app.agents.pipeline import (
+    COVER_LETTER_COMPILE,
+    COVER_LETTER_LLM,
+    FAILED,
+    RESUME_COMPILE,
+    RESUME_LLM,
+    SEND,
+    SUCCESS,
+)
+
+logger = get_logger(__name__)
+
+# Accepted column / key names for each required field.
+FIELD_ALIASES = {
+    "role": ("role", "job_role", "position", "title"),
+    "company": ("company", "company_name"),
+    "recruiter_email": ("recruiter_email", "receiver_email", "email"),
+    "job_description": ("job_description", "description", "jd"),
+}
+
+
+# ----------------------------------------
+# Input
+# ----------------------------------------
+def _normalize_row(raw: Dict[str, Any]) -> Dict[str, str]:
+    lowered = {str(k).strip().lower(): v for k, v in raw.items() if k is not None}
+    row = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = next((lowered[a] for a in aliases if lowered.get(a)), "")
+        row[field] = str(value).strip()
+    return row
+
+
+def load_jobs(path: str) -> List[Dict[str, str]]:
+    """Read job postings from a .jsonl or .csv file."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            raw_rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            raw_rows = [json.loads(line) for line in f if line.strip()]
+    return [_normalize_row(raw) for raw in raw_rows]
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")[:40] or "job"
+
+
+# ----------------------------------------
+# Manifest
+# ----------------------------------------
+class Manifest:
+    """Append-only JSONL of row results, safe to write from worker threads."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def completed_rows(self) -> set:
+        if not self.path.exists():
+            return set()
+        with open(self.path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return {r["row"] for r in records if r.get("status") == "success"}
+
+    def write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+# ----------------------------------------
+# Pipeline
+# ----------------------------------------
+class BatchRunner:
+    """Runs the application pipeline for each row on a worker pool with per-stage limits."""
+
+    def __init__(
+        self,
+        resume_file: str,
+        output_dir: Path,
+        workers: int,
+        stage_limits: Dict[str, int],
+        cover_letter: bool = True,
+        send_email: bool = False,
+        parallel_drafting: Optional[bool] = None,
+    ):
+        self.resume_file = resume_file
+        self.output_dir = output_dir
+        self.workers = workers
+        self.cover_letter = cover_letter
+        self.send_email = send_email
+        self.parallel_drafting = parallel_drafting
+        # Semaphores are shared by every row's pipeline, so they bound each stage batch-wide.
+        self.stage_limits = {stage: threading.BoundedSemaphore(limit) for stage, limit in stage_limits.items()}
+        self.manifest = Manifest(output_dir / "manifest.jsonl")
+
+    def run_row(self, index: int, job: Dict[str, str]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {
+            "row": index,
+            "role": job["role"],
+            "company": job["company"],
+            "recruiter_email": job["recruiter_email"],
+            "status": "running",
+            "failed_stage": None,
+            "error": None,
+            "resume_path": None,
+            "cover_letter_path": None,
+            "email_sent": False,
+            "timings": {},
+        }
+        required = ("role", "job_description", "recruiter_email") if self.send_email else ("role", "job_description")
+        missing = [field for field in required if not job[field]]
+        if missing:
+            record.update(status="skipped", error=f"missing fields: {', '.join(missing)}")
+            return record
+
+        row_dir = self.output_dir / f"{index:04d}_{_slug(job['company'] or job['role'])}"
+        start = time.monotonic()
+        try:
+            pipeline = build_application_pipeline(
+                resume_file=self.resume_file,
+                job_role=job["role"],
+                company=job["company"],
+                job_description=job["job_description"],
+                receiver_email=job["recruiter_email"],
+                cover_letter=self.cover_letter,
+                send_email=self.send_email,
+                parallel_drafting=self.parallel_drafting,
+                resume_dir=str(row_dir),
+                cover_letter_dir=str(row_dir),
+                stream=False,
+                stage_limits=self.stage_limits,
+            )
+            results = pipeline.run()
+        except Exception as e:
+            logger.error(f"Batch row {index} failed to start: {e}", exc_info=True)
+            record.update(status="failed", failed_stage="setup", error=str(e))
+            results = {}
+
+        for result in results.values():
+            record["timings"][result.name] = result.duration
+            if result.status == FAILED and record["failed_stage"] is None:
+                record.update(status="failed", failed_stage=result.name, error=result.error)
+
+        if RESUME_COMPILE in results and results[RESUME_COMPILE].status == SUCCESS:
+            record["resume_path"] = results[RESUME_COMPILE].value
+        if COVER_LETTER_COMPILE in results and results[COVER_LETTER_COMPILE].status == SUCCESS:
+            record["cover_letter_path"] = results[COVER_LETTER_COMPILE].value
+        record["email_sent"] = SEND in results and results[SEND].status == SUCCESS
+        if record["status"] == "running":
+            record["status"] = "success"
+
+        record["total_secs"] = round(time.monotonic() - start, 3)
+        return record
+
+    def run(self, jobs: List[Dict[str, str]], skip_completed: bool = False) -> List[Dict[str, Any]]:
+        done = self.manifest.completed_rows() if skip_completed else set()
+        pending = [(i, job) for i, job in enumerate(jobs) if i not in done]
+        logger.info(f"Batch: {len(pending)} rows to process ({len(done)} already completed), {self.workers} workers.")
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            futures = {pool.submit(self.run_row, i, job): i for i, job in pending}
+            for future in as_completed(futures):
+                record = future.result()
+                record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+                self.manifest.write(record)
+                results.append(record)
+                logger.info(f"Batch row {record['row']} {record['status']} "
+                            f"({record.get('total_secs', 0)}s): {record['company']} / {record['role']}")
+        return results
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("success", "failed", "skipped")}
+    durations = sorted(r["total_secs"] for r in results if r["status"] == "success")
+    summary: Dict[str, Any] = {"rows": len(results), **counts}
+    if durations:
+        summary["p50_secs"] = round(statistics.median(durations), 2)
+        summary["p95_secs"] = durations[min(len(durations) - 1, int(0.95 * len(durations)))]
+    return summary
+
+
+# ----------------------------------------
+# CLI
+# ----------------------------------------
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resume", required=True, help="LaTeX resume (.tex) to tailor for every posting")
+    parser.add_argument("--jobs", required=True, help="JSONL or CSV file of job postings")
+    parser.add_argument("--output-dir", help="where PDFs and manifest.jsonl go (default: BATCH_DIR/<timestamp>)")
+    parser.add_argument("--workers", type=int, default=env_int("BATCH_WORKERS", 4))
+    parser.add_argument("--max-resume", type=int, help="concurrent resume generations (default: --workers)")
+    parser.add_argument("--max-cover-letter", type=int, help="concurrent cover letter generations (default: --workers)")
+    parser.add_argument("--max-email", type=int, default=1, help="concurrent email sends (default: 1)")
+    parser.add_argument("--no-cover-letter", action="store_true", help="skip cover letter generation")
+    parser.add_argument("--send-email", action="store_true", help="send the application email for each row")
+    parser.add_argument("--parallel-drafting", action="store_true", default=None,
+                        help="draft cover letter and email from the original resume while it is tailored")
+    parser.add_argument("--skip-completed", action="store_true",
+                        help="skip rows already marked successful in the output dir's manifest")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    output_dir = Path(args.output_dir or Path(os.getenv("BATCH_DIR", "data/batch")) / datetime.now().strftime("%Y%m%d_%H%M%S"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = load_jobs(args.jobs)
+    runner = BatchRunner(
+        resume_file=args.resume,
+        output_dir=output_dir,
+        workers=args.workers,
+        stage_limits={
+            RESUME_LLM: args.max_resume or args.workers,
+            COVER_LETTER_LLM: args.max_cover_letter or args.workers,
+            SEND: args.max_email,
+        },
+        cover_letter=not args.no_cover_letter,
+        send_email=args.send_email,
+        parallel_drafting=args.parallel_drafting,
+    )
+    results = runner.run(jobs, skip_completed=args.skip_completed)
+
+    summary = summarize(results)
+    logger.info(f"Batch finished: {summary}. Manifest: {runner.manifest.path}")
+    logger.info(f"Prompt tokens: {get_prompt_stats()}")
+    logger.info(f"Prompt registry: {get_prompt_registry_stats()}")
+    logger.info(f"Gmail service: {get_gmail_stats()}")
+    logger.info(f"LLM response decoding: {get_decoder_stats()}")
+    logger.info(f"Resume edit scripts: {get_edit_stats()}")
+    logger.info(f"PDF text cache: {get_pdf_text_cache_stats()}")
+    logger.info(f"LaTeX compile service: {get_compile_stats()}")
+    logger.info(f"LaTeX format cache: {get_format_cache_stats()}")
+    logger.info(f"Compiled PDF cache: {get_pdf_cache_stats()}")
+    print(json.dumps(summary))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+# benchmarks/import_time.py
+"""
+Cold-start cost of `import app.agents`.
+
+Each sample runs in a fresh interpreter. "lazy" is the import as shipped;
+"eager" additionally builds the diagnostic agent, which is what every import
+paid for when core.error_handler initialized it at module load.
+
+    python benchmarks/import_time.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+LAZY = """
+import time
+start = time.perf_counter()
+import app.agents
+elapsed = time.perf_counter() - start
+import sys, json
+print(json.dumps({"secs": elapsed, "langchain_loaded": "langchain" in sys.modules}))
+"""
+
+EAGER = """
+import time
+start = time.perf_counter()
+import app.agents
+from core.error_handler import get_diagnostic_agent
+get_diagnostic_agent()
+elapsed = time.perf_counter() - start
+import sys, json
+print(json.dumps({"secs": elapsed, "langchain_loaded": "langchain" in sys.modules}))
+"""
+
+
+def _sample(code: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("LOG_DIR", str(REPO_ROOT / "logs"))
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _summarize(label: str, samples: list) -> dict:
+    secs = [s["secs"] for s in samples]
+    summary = {
+        "mode": label,
+        "runs": len(secs),
+        "median_ms": round(statistics.median(secs) * 1000, 1),
+        "min_ms": round(min(secs) * 1000, 1),
+        "max_ms": round(max(secs) * 1000, 1),
+        "langchain_loaded": samples[-1]["langchain_loaded"],
+    }
+    print(json.dumps(summary))
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per mode")
+    args = parser.parse_args()
+
+    # One throwaway run per mode so .pyc compilation is not measured.
+    _sample(LAZY)
+    _sample(EAGER)
+
+    lazy = _summarize("lazy", [_sample(LAZY) for _ in range(args.runs)])
+    eager = _summarize("eager", [_sample(EAGER) for _ in range(args.runs)])
+
+    saved = eager["median_ms"] - lazy["median_ms"]
+    print(f"Cold import of app.agents: {lazy['median_ms']} ms lazy vs {eager['median_ms']} ms eager "
+          f"({saved:.1f} ms saved per process start)")
+
+
+if __name__ == "__main__":
+    main()
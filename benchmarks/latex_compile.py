@@ -0,0 +1,66 @@
+# benchmarks/latex_compile.py
+"""
+pdflatex compile time with and without the cached preamble format.
+
+Compiles the same document --runs times the normal way, then with
+LATEX_FORMAT_CACHE_ENABLED (the first of those builds the format and is
+reported separately). Needs pdflatex on PATH.
+
+    python benchmarks/latex_compile.py resume.tex --runs 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("LOG_DIR", "logs")
+
+from app.file_utils import pdf_generator  # noqa: E402
+
+
+def _compile_times(latex: str, output_dir: str, runs: int) -> list:
+    samples = []
+    for i in range(runs):
+        start = time.perf_counter()
+        pdf_generator.create_pdf_from_latex(latex, f"bench_{i}.pdf", output_dir)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tex", help="LaTeX document to compile")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if shutil.which(pdf_generator.PDFLATEX) is None:
+        sys.exit(f"{pdf_generator.PDFLATEX} not found on PATH")
+
+    latex = Path(args.tex).read_text(encoding="utf-8")
+    workdir = tempfile.mkdtemp(prefix="latex_bench_")
+    os.environ["LATEX_FORMAT_CACHE_DIR"] = os.path.join(workdir, "fmt")
+    try:
+        os.environ["LATEX_FORMAT_CACHE_ENABLED"] = "false"
+        plain = _compile_times(latex, workdir, args.runs)
+
+        os.environ["LATEX_FORMAT_CACHE_ENABLED"] = "true"
+        first, *cached = _compile_times(latex, workdir, args.runs + 1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = pdf_generator.get_format_cache_stats()
+    print(f"{'without format':<22} median {statistics.median(plain):7.3f} s")
+    print(f"{'first (builds format)':<22}        {first:7.3f} s")
+    print(f"{'with cached format':<22} median {statistics.median(cached):7.3f} s")
+    print(f"\n{stats}")
+    if stats["build_failures"] or stats["fallbacks"]:
+        print("The preamble could not be used as a format; later runs compiled normally.")
+
+
+if __name__ == "__main__":
+    main()
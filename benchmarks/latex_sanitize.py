@@ -0,0 +1,114 @@
+# benchmarks/latex_sanitize.py
+"""
+Golden-corpus check and throughput of the LaTeX sanitizer.
+
+Every benchmarks/data/sanitizer/<name>.tex is a sample of LLM output; the
+matching <name>.expected.tex holds what latex_sanitizer.sanitize_latex must
+make of it. pdf_generator.sanitize_latex_output (the reference implementation)
+is expected to agree except on nested \textbf whose inner argument contains a
+group, which it mismatches (broken_structure). Throughput is then measured on
+inputs of 10-200 KB built by repeating the corpus, and on deeply nested
+\textbf, where the reference's fixed-point loop is quadratic.
+
+    python benchmarks/latex_sanitize.py --runs 5
+    python benchmarks/latex_sanitize.py --update-golden   # after an intended change
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("LOG_DIR", "logs")
+
+from app.file_utils.latex_sanitizer import sanitize_latex  # noqa: E402
+from app.file_utils.pdf_generator import sanitize_latex_output  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "data" / "sanitizer"
+SIZES_KB = (10, 50, 100, 200)
+NESTED_SIZES_KB = (1, 2, 4, 8)
+# Samples on which the reference is known to differ from the golden output
+REFERENCE_DEVIATIONS = {"broken_structure"}
+
+
+def load_corpus():
+    return {
+        path.stem: path.read_text(encoding="utf-8")
+        for path in sorted(CORPUS_DIR.glob("*.tex"))
+        if not path.name.endswith(".expected.tex")
+    }
+
+
+def check_golden(corpus, update: bool) -> bool:
+    ok = True
+    for name, source in corpus.items():
+        golden_path = CORPUS_DIR / f"{name}.expected.tex"
+        fast = sanitize_latex(source)
+        if update:
+            golden_path.write_text(fast, encoding="utf-8")
+        golden = golden_path.read_text(encoding="utf-8")
+        reference = sanitize_latex_output(source)
+        reference_ok = (reference == golden) != (name in REFERENCE_DEVIATIONS)
+        ok = ok and fast == golden and reference_ok
+        reference_status = "ok" if reference == golden else "differs"
+        if name in REFERENCE_DEVIATIONS:
+            reference_status += " (expected)" if reference != golden else " (deviation gone?)"
+        print(f"{name:<36} reference={reference_status} "
+              f"sanitize_latex={'ok' if fast == golden else 'differs'}")
+    return ok
+
+
+def build_input(corpus, size_kb: int) -> str:
+    blob = "\n".join(corpus.values())
+    repeats = size_kb * 1024 // len(blob) + 1
+    return (blob + "\n") * repeats
+
+
+def build_nested_input(size_kb: int) -> str:
+    """\textbf nested size_kb * 85 levels deep."""
+    depth = size_kb * 1024 // 12
+    return "\\textbf{word " * depth + "x" + "}" * depth
+
+
+def _median_secs(func, text: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(text)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--update-golden", action="store_true", help="rewrite the expected outputs from the reference")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if not check_golden(corpus, args.update_golden):
+        sys.exit("sanitize_latex does not match the golden corpus")
+
+    print(f"\n{'input':>8}{'reference':>14}{'sanitize_latex':>16}{'MB/s':>8}{'speedup':>9}")
+    for size_kb in SIZES_KB:
+        text = build_input(corpus, size_kb)
+        reference = _median_secs(sanitize_latex_output, text, args.runs)
+        fast = _median_secs(sanitize_latex, text, args.runs)
+        print(f"{len(text) // 1024:>6}KB{reference * 1000:>12.1f}ms{fast * 1000:>14.1f}ms"
+              f"{len(text) / fast / 1e6:>8.1f}{reference / fast:>8.1f}x")
+
+    print(f"\n{'nested':>8}{'reference':>14}{'sanitize_latex':>16}{'MB/s':>8}{'speedup':>9}")
+    for size_kb in NESTED_SIZES_KB:
+        text = build_nested_input(size_kb)
+        if sanitize_latex(text) != sanitize_latex_output(text):
+            sys.exit(f"outputs differ on the {size_kb} KB nested input")
+        reference = _median_secs(sanitize_latex_output, text, args.runs)
+        fast = _median_secs(sanitize_latex, text, args.runs)
+        print(f"{len(text) // 1024:>6}KB{reference * 1000:>12.1f}ms{fast * 1000:>14.1f}ms"
+              f"{len(text) / fast / 1e6:>8.1f}{reference / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
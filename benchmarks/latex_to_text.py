@@ -0,0 +1,54 @@
+# benchmarks/latex_to_text.py
+"""
+Cost of getting resume text for the cover letter / email prompts.
+
+Compares the regex LaTeX converter, the pylatexenc converter and, when a PDF
+of the same resume is given, pdfplumber extraction of the compiled PDF.
+
+    python benchmarks/latex_to_text.py resume.tex --pdf resume.pdf --runs 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("LOG_DIR", "logs")
+
+from app.file_utils import file_parser  # noqa: E402
+
+
+def _time(label: str, func, runs: int) -> float:
+    func()  # warm-up
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    median_ms = statistics.median(samples) * 1000
+    print(f"{label:<12} median {median_ms:8.2f} ms   min {min(samples) * 1000:8.2f} ms")
+    return median_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tex", help="LaTeX resume")
+    parser.add_argument("--pdf", help="compiled PDF of the same resume")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    latex = Path(args.tex).read_text(encoding="utf-8")
+    fast = _time("fast", lambda: file_parser.latex_to_text(latex, backend="fast"), args.runs)
+    _time("pylatexenc", lambda: file_parser.latex_to_text(latex, backend="pylatexenc"), args.runs)
+    if args.pdf:
+        pdf = _time("pdfplumber", lambda: file_parser.extract_text_from_pdf(args.pdf, use_cache=False), args.runs)
+        print(f"fast converter is {pdf / fast:.0f}x faster than PDF extraction")
+
+    text = file_parser.latex_to_text(latex)
+    print(f"\n{len(latex)} chars of LaTeX -> {len(text)} chars of text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/pdf_extract.py
+"""
+Throughput and peak memory of the PDF text extraction backends.
+
+Each backend runs in a fresh interpreter so ru_maxrss reflects that backend
+alone; in pool modes the workers' peak RSS is reported separately. The pool
+only pays off with several CPUs and long documents. "legacy" is the original implementation: pdfplumber with every page
+kept alive and the text built by repeated concatenation.
+
+    python benchmarks/pdf_extract.py resume.pdf --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, os, resource, statistics, sys, time
+sys.path.insert(0, {root!r})
+os.environ.setdefault("LOG_DIR", "logs")
+from app.file_utils import pdf_extractors
+
+def legacy(data):
+    import io, pdfplumber
+    text = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            text += page.extract_text() or ""
+    return text.strip()
+
+data = open({pdf!r}, "rb").read()
+mode = {mode!r}
+if mode == "legacy":
+    run = lambda: legacy(data)
+elif mode.endswith("+pool"):
+    backend = mode.split("+")[0]
+    run = lambda: pdf_extractors.extract_text(data, backend, parallel=True)
+    os.environ["PDF_EXTRACT_PARALLEL_MIN_PAGES"] = "1"
+    run()  # warm up the pool
+else:
+    run = lambda: pdf_extractors.extract_text(data, mode, parallel=False)
+
+samples = []
+for _ in range({runs}):
+    start = time.perf_counter()
+    text = run()
+    samples.append(time.perf_counter() - start)
+# Reap pool workers so their peak RSS shows up under RUSAGE_CHILDREN
+pdf_extractors.shutdown_pool(wait=True)
+print(json.dumps({{
+    "secs": statistics.median(samples),
+    "pages": pdf_extractors.count_pages(data),
+    "chars": len(text),
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+}}))
+"""
+
+MODES = ("legacy", "pdfplumber", "pypdf", "pdfplumber+pool", "pypdf+pool")
+
+
+def run_mode(pdf: str, mode: str, runs: int) -> dict:
+    code = CHILD.format(root=str(REPO_ROOT), pdf=os.path.abspath(pdf), mode=mode, runs=runs)
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=REPO_ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", help="PDF to extract")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    args = parser.parse_args()
+
+    size_mb = os.path.getsize(args.pdf) / (1024 * 1024)
+    print(f"{'mode':<18}{'median s':>10}{'pages/s':>10}{'MB/s':>8}{'peak RSS MB':>13}{'worker RSS':>12}{'chars':>9}")
+    for mode in args.modes:
+        r = run_mode(args.pdf, mode, args.runs)
+        print(f"{mode:<18}{r['secs']:>10.3f}{r['pages'] / r['secs']:>10.1f}"
+              f"{size_mb / r['secs']:>8.2f}{r['rss_mb']:>13.1f}{r['worker_rss_mb']:>12.1f}{r['chars']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/prompt_render.py
+"""
+Per-call cost of rendering the app's prompts.
+
+Baseline: the LangChain f-string PromptTemplate objects the app used to build
+at import (prompt_loader.load_yaml_prompts). Candidate: the PROMPTS registry,
+whose templates are precompiled for str.format. Both render every prompt with
+the same synthetic inputs and must produce identical text. Cold cost (first
+lookup after a fresh registry, i.e. index + compile) is reported separately.
+The baseline is skipped when langchain is not installed.
+
+    python benchmarks/prompt_render.py --calls 20000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("LOG_DIR", "logs")
+
+from core.prompt_loader import PROMPT_DIR, PromptRegistry, load_yaml_prompts  # noqa: E402
+
+# Input size per variable, roughly a real resume / job description
+INPUT_CHARS = 4000
+
+
+def sample_inputs(template) -> dict:
+    return {name: f"<{name}> " + "x" * INPUT_CHARS for name in template.input_variables}
+
+
+def _per_call_us(render, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        render()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--prompt-dir", default=PROMPT_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    registry = PromptRegistry(args.prompt_dir)
+    names = sorted(registry)
+    for name in names:
+        registry[name]
+    cold_ms = (time.perf_counter() - start) * 1000
+    print(f"registry cold load ({len(names)} prompts): {cold_ms:.2f} ms")
+
+    try:
+        start = time.perf_counter()
+        baseline = load_yaml_prompts(args.prompt_dir)
+        print(f"langchain load_yaml_prompts: {(time.perf_counter() - start) * 1000:.2f} ms (incl. langchain import)")
+    except ImportError as e:
+        baseline = None
+        print(f"langchain not installed, baseline skipped ({e})")
+
+    header = f"\n{'prompt':<26}{'registry':>12}"
+    if baseline is not None:
+        header += f"{'langchain':>12}{'speedup':>9}"
+    print(header)
+    for name in names:
+        compiled = registry[name]
+        inputs = sample_inputs(compiled)
+        fast = _per_call_us(lambda: registry[name].format(**inputs), args.calls)
+        line = f"{name:<26}{fast:>10.2f}us"
+        if baseline is not None:
+            template = baseline[name]
+            if template.format(**inputs) != compiled.format(**inputs):
+                sys.exit(f"outputs differ for prompt '{name}'")
+            slow = _per_call_us(lambda: template.format(**inputs), args.calls)
+            line += f"{slow:>10.2f}us{slow / fast:>8.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# core/env.py
+"""
+Typed reads of environment settings.
+
+Unset or blank variables resolve to the default. Flags accept 1/true/yes/on
+(any case) as true; numbers that do not parse are logged and ignored.
+"""
+import os
+from typing import Any, Callable
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def env_number(name: str, default: Any, cast: Callable[[str], Any] = float) -> Any:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return cast(value.strip())
+    except ValueError:
+        logger.warning(f"Ignoring invalid value for {name}: {value!r}; using {default}.")
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    return env_number(name, default, int)
+
+
+def env_float(name: str, default: float) -> float:
+    return env_number(name, default, float)
@@ -0,0 +1,198 @@
+# core/error_classifier.py
+import json
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from core.exceptions import (
+    CircuitOpenError,
+    ExtractTextError,
+    HTTPConnectorError,
+    HuggingFaceConnectorError,
+    LatexValidationError,
+    OpenAIConnectorError,
+    PromptNotFoundError,
+    TexFileReadError,
+)
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Recovery actions; the keys of error_handler.TOOL_FUNC_MAP plus "exit".
+SWITCH_CONNECTOR = "switch connector"
+SWITCH_MODEL = "switch model"
+SWITCH_TOKEN = "switch token"
+SWITCH_URL = "switch url"
+RETRY_AFTER_DELAY = "retry after delay"
+EXIT = "exit"
+
+CONNECTOR_ERRORS = (OpenAIConnectorError, HuggingFaceConnectorError, HTTPConnectorError)
+# Errors that no connector change can fix.
+UNRECOVERABLE_ERRORS = (FileNotFoundError, TexFileReadError, PromptNotFoundError, ExtractTextError)
+
+_TIMEOUT_NAMES = ("timeout", "timedout", "readtimeout", "connecttimeout", "apitimeouterror")
+_STATUS_PATTERNS = (
+    re.compile(r"error code:?\s*(\d{3})", re.I),
+    re.compile(r"\b(\d{3})\s+(?:client|server)\s+error", re.I),
+    re.compile(r"status(?:[ _]code)?\s*[:=]?\s*(\d{3})", re.I),
+)
+
+
+@dataclass
+class RecoveryDecision:
+    action: str
+    source: str  # "rule", "cache" or "llm"
+    tool_args: Dict[str, Any] = field(default_factory=dict)
+    reason: str = ""
+
+
+def iter_error_chain(error: BaseException) -> Iterator[BaseException]:
+    """Yield the error and everything it was raised from (explicitly or implicitly)."""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
+
+
+def extract_status_code(error: BaseException) -> Optional[int]:
+    """Find an HTTP status code on the exception chain, from attributes or the message text."""
+    for exc in iter_error_chain(error):
+        status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status
+
+    for exc in iter_error_chain(error):
+        message = str(exc)
+        for pattern in _STATUS_PATTERNS:
+            match = pattern.search(message)
+            if match and 400 <= int(match.group(1)) < 600:
+                return int(match.group(1))
+    return None
+
+
+def _is_timeout(error: BaseException) -> bool:
+    for exc in iter_error_chain(error):
+        if isinstance(exc, TimeoutError) or type(exc).__name__.lower() in _TIMEOUT_NAMES:
+            return True
+        if "timed out" in str(exc).lower():
+            return True
+    return False
+
+
+def _find(error: BaseException, types) -> Optional[BaseException]:
+    return next((exc for exc in iter_error_chain(error) if isinstance(exc, types)), None)
+
+
+def classify_error(error: BaseException) -> Optional[RecoveryDecision]:
+    """
+    Map well-known failures to a recovery action without consulting an LLM.
+    Returns None for errors the rules do not recognise.
+    """
+    if _find(error, UNRECOVERABLE_ERRORS):
+        return RecoveryDecision(EXIT, "rule", reason="missing or unreadable input")
+
+    # Malformed model output: regenerate immediately, no point in waiting.
+    if _find(error, json.JSONDecodeError):
+        return RecoveryDecision(RETRY_AFTER_DELAY, "rule", {"delay": 0}, "invalid JSON from LLM")
+
+    # Generated LaTeX failed the pre-compile checks: regenerate without running pdflatex.
+    if _find(error, LatexValidationError):
+        return RecoveryDecision(RETRY_AFTER_DELAY, "rule", {"delay": 0}, "invalid LaTeX from LLM")
+
+    # pdflatex rejected or hung on the generated LaTeX: regenerate the document.
+    compile_error = _find(error, (subprocess.CalledProcessError, subprocess.TimeoutExpired))
+    if compile_error is not None:
+        return RecoveryDecision(RETRY_AFTER_DELAY, "rule", {"delay": 0}, "LaTeX compilation failed")
+
+    if _find(error, CircuitOpenError):
+        return RecoveryDecision(RETRY_AFTER_DELAY, "rule", reason="all connector circuits open")
+
+    if not _find(error, CONNECTOR_ERRORS):
+        return None
+
+    status = extract_status_code(error)
+    if status in (401, 403):
+        return RecoveryDecision(SWITCH_TOKEN, "rule", reason=f"HTTP {status}")
+    if status == 404:
+        return RecoveryDecision(SWITCH_MODEL, "rule", reason="HTTP 404 (model or route not found)")
+    if status == 429:
+        return RecoveryDecision(RETRY_AFTER_DELAY, "rule", reason="HTTP 429")
+    if status is not None and status >= 500:
+        return RecoveryDecision(SWITCH_CONNECTOR, "rule", reason=f"HTTP {status}")
+    if _is_timeout(error):
+        return RecoveryDecision(SWITCH_CONNECTOR, "rule", reason="timeout")
+    return None
+
+
+_VOLATILE_PATTERNS = (
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\b[0-9a-f]{8,}\b", re.I), "<hex>"),
+    (re.compile(r"\d+(\.\d+)?"), "#"),
+    (re.compile(r"'[^']{40,}'|\"[^\"]{40,}\""), "<str>"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def error_signature(error: BaseException) -> str:
+    """Normalize an error into a stable key: type chain plus message with ids, numbers and URLs masked."""
+    chain = list(iter_error_chain(error))
+    message = str(error).lower()
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        message = pattern.sub(replacement, message)
+    types = ">".join(type(exc).__name__ for exc in chain[:3])
+    return f"{types}:{message.strip()[:300]}"
+
+
+class DecisionCache:
+    """Bounded LRU of past LLM recovery decisions keyed by error signature."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, signature: str) -> Optional[str]:
+        with self._lock:
+            action = self._entries.get(signature)
+            if action is not None:
+                self._entries.move_to_end(signature)
+            return action
+
+    def set(self, signature: str, action: str) -> None:
+        with self._lock:
+            self._entries[signature] = action
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+decision_cache = DecisionCache()
+
+_stats = {"rule_hits": 0, "cache_hits": 0, "llm_calls": 0}
+_stats_lock = threading.Lock()
+
+
+def record_decision_source(source: str) -> None:
+    key = {"rule": "rule_hits", "cache": "cache_hits", "llm": "llm_calls"}[source]
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def get_classifier_stats() -> Dict[str, Any]:
+    """Counts of how recovery decisions were made, with the rule-hit ratio."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["rule_hits"] + stats["cache_hits"] + stats["llm_calls"]
+    stats["total"] = total
+    stats["rule_hit_ratio"] = round(stats["rule_hits"] / total, 4) if total else 0.0
+    stats["llm_avoided_ratio"] = round((stats["rule_hits"] + stats["cache_hits"]) / total, 4) if total else 0.0
+    stats["cached_signatures"] = len(decision_cache)
+    return stats
@@ -1,9 +1,18 @@
 # core/error_handler.py
 import inspect
+import threading
 from typing import Optional, Callable
-from langchain_openai import ChatOpenAI
-from langchain.agents import initialize_agent
-from app.connectors.diagnostic_tools import LANGCHAIN_TOOLS
+from app.connectors.diagnostic_tools import TOOL_REGISTRY, get_langchain_tools
+from core.error_classifier import (
+    EXIT,
+    RecoveryDecision,
+    classify_error,
+    decision_cache,
+    error_signature,
+    get_classifier_stats,
+    record_decision_source,
+)
+from core.env import env_int
 from core.logger import get_logger
 from .prompt_loader import PROMPTS
 import os
@@ -12,21 +21,72 @@ logger = get_logger(__name__)
 # -----------------------------
 # Initialize Diagnostic Agent
 # -----------------------------
+# Built on first use rather than at import: LangChain and the chat client are
+# only needed once an error reaches the LLM, and agent modules import this one.
+_diagnostic_agent = None
+_diagnostic_agent_initialized = False
+_diagnostic_agent_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def _build_diagnostic_agent():
+    from langchain.agents import initialize_agent
+    from langchain_openai import ChatOpenAI
 
-try:
     llm = ChatOpenAI(temperature=0,
     openai_api_base=os.getenv("DIAGNOSTIC_TOOL_CON_URL"),
     model =os.getenv("DIAGNOSTIC_TOOL_CON_MODEL"),
     openai_api_key=os.getenv("DIAGNOSTIC_TOOL_CON_API_TOKEN"))
-    diagnostic_agent = initialize_agent(
-        tools=LANGCHAIN_TOOLS,    
+    return initialize_agent(
+        tools=get_langchain_tools(),
         llm=llm,
         agent="zero-shot-react-description",
         verbose=True
     )
-except Exception as init_error:
-    logger.critical(f"Failed to initialize diagnostic agent: {init_error}", exc_info=True)
-    diagnostic_agent = None
+
+
+def get_diagnostic_agent():
+    """
+    Return the LangChain diagnostic agent, building it exactly once across threads.
+    Returns None if initialization failed; the failure is not retried.
+    """
+    global _diagnostic_agent, _diagnostic_agent_initialized
+
+    if _diagnostic_agent_initialized:
+        return _diagnostic_agent
+
+    with _diagnostic_agent_lock:
+        if not _diagnostic_agent_initialized:
+            try:
+                _diagnostic_agent = _build_diagnostic_agent()
+                logger.info("Diagnostic agent initialized.")
+            except Exception as init_error:
+                logger.critical(f"Failed to initialize diagnostic agent: {init_error}", exc_info=True)
+                _diagnostic_agent = None
+            _diagnostic_agent_initialized = True
+    return _diagnostic_agent
+
+
+def warm_up_diagnostic_agent(background: bool = True) -> Optional[threading.Thread]:
+    """
+    Initialize the diagnostic agent ahead of the first failure.
+    With background=True this runs on a daemon thread (started at most once) and returns it.
+    """
+    global _warmup_thread
+
+    if _diagnostic_agent_initialized:
+        return None
+    if not background:
+        get_diagnostic_agent()
+        return None
+
+    with _diagnostic_agent_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=get_diagnostic_agent, name="diagnostic-agent-warmup", daemon=True
+            )
+            _warmup_thread.start()
+    return _warmup_thread
 
 
 # -----------------------------
@@ -42,6 +102,65 @@ TOOL_FUNC_MAP = {
 }
 
 
+# Each retry re-runs an agent whose own failure handler calls back in here,
+# so the depth of nested recoveries is capped per thread.
+MAX_RECOVERY_DEPTH = env_int("DIAGNOSTIC_MAX_RECOVERY_DEPTH", 3)
+_recovery_state = threading.local()
+
+
+# -----------------------------
+# Recovery Decision
+# -----------------------------
+def _normalize_action(response: str) -> str:
+    """LLM answers arrive as e.g. 'switch_connector' or 'Switch Connector.'; map to TOOL_FUNC_MAP keys."""
+    return response.strip().strip(".'\"`").lower().replace("_", " ")
+
+
+def _ask_diagnostic_agent(error: Exception, task: str) -> str:
+    """Run the ReAct diagnostic agent and return its normalized action keyword."""
+    PROMPT_KEY = "error_handler"
+
+    if PROMPT_KEY not in PROMPTS:
+        raise ValueError(f"Prompt '{PROMPT_KEY}' not found.")
+    prompt_template = PROMPTS[PROMPT_KEY]
+    prompt = prompt_template.format(connector_type=task.lower(), error=str(error))
+
+    logger.info(f"Running diagnostic agent with prompt: {prompt}")
+    response = get_diagnostic_agent().run(prompt)
+    logger.info(f"Raw diagnostic response: {response}")
+    return _normalize_action(response)
+
+
+def decide_recovery(error: Exception, task: str) -> Optional[RecoveryDecision]:
+    """
+    Pick a recovery action: deterministic rules first, then decisions cached
+    for the same error signature, and only then the LLM diagnostic agent.
+    Returns None when no decision could be made.
+    """
+    decision = classify_error(error)
+    if decision is not None:
+        record_decision_source("rule")
+        logger.info(f"Rule-based recovery for task '{task}': '{decision.action}' ({decision.reason})")
+        return decision
+
+    signature = error_signature(error)
+    cached_action = decision_cache.get(signature)
+    if cached_action is not None:
+        record_decision_source("cache")
+        logger.info(f"Cached recovery decision for task '{task}': '{cached_action}'")
+        return RecoveryDecision(cached_action, "cache")
+
+    if not get_diagnostic_agent():
+        logger.error("Diagnostic agent not initialized — skipping automatic recovery.")
+        return None
+
+    record_decision_source("llm")
+    action = _ask_diagnostic_agent(error, task)
+    if action in TOOL_FUNC_MAP or action == EXIT:
+        decision_cache.set(signature, action)
+    return RecoveryDecision(action, "llm")
+
+
 # -----------------------------
 # Core Error Handler
 # -----------------------------
@@ -51,57 +170,55 @@ def handle_error(
     retry_callback: Optional[Callable[..., dict]] = None,
 ) -> dict:
     """
-    Centralized error handler that uses a LangChain diagnostic agent to diagnose and fix connector issues.
+    Centralized error handler that diagnoses and fixes connector issues.
+    Known failures are classified locally; the LangChain diagnostic agent is
+    only consulted for errors that have not been seen before.
 
     Parameters:
         error: Exception that triggered the handler.
         task: The connector or process name (e.g., 'resume', 'cover_letter').
-        retry_callback: Function to retry the failed operation.
-        agent_arguments: Arguments for retry_callback.
+        retry_callback: Function returning a fresh agent instance to retry the failed operation.
     """
 
-    PROMPT_KEY  = "error_handler"
-
-
-    if not diagnostic_agent:
-        logger.error("Diagnostic agent not initialized — skipping automatic recovery.")
+    depth = getattr(_recovery_state, "depth", 0)
+    if depth >= MAX_RECOVERY_DEPTH:
+        logger.error(f"Giving up on task '{task}' after {depth} nested recovery attempts: {error}")
         return {"status": "fail", "error_message": str(error)}
 
+    _recovery_state.depth = depth + 1
     try:
-        # 1️⃣ Create diagnostic prompt
-        if PROMPT_KEY not in PROMPTS:
-                raise ValueError(f"Prompt '{PROMPT_KEY}' not found.")
-        prompt_template = PROMPTS[PROMPT_KEY]
-        prompt = prompt_template.format(connector_type=task.lower(), error = str(error))
-        
-        logger.info(f"Running diagnostic agent with prompt: {prompt}")
-
-        # 2️⃣ Get agent response
-        response = diagnostic_agent.run(prompt)
-        logger.info(f"Raw diagnostic response: {response}")
-
-        # Normalize response
-        action = response.strip().lower()
-
-        # 3️⃣ Match to a registered tool
+        # 1️⃣ Decide on a recovery action
+        decision = decide_recovery(error, task)
+        logger.info(f"Recovery decision stats: {get_classifier_stats()}")
+        if decision is None:
+            return {"status": "fail", "error_message": str(error)}
+
+        action = decision.action
+        if action == EXIT:
+            logger.warning(f"Error for task '{task}' is not recoverable: {error}")
+            return {"status": "fail", "error_message": str(error)}
+
+        # 2️⃣ Match to a registered tool
         selected_tool_name = TOOL_FUNC_MAP.get(action)
         if not selected_tool_name:
             logger.warning(f"No matching tool found for response: '{action}'")
             return {"status": "fail", "error_message": f"No diagnostic action found for '{action}'"}
 
-        # 4️⃣ Find the actual LangChain Tool object
-        tool = next((t for t in LANGCHAIN_TOOLS if t.name == selected_tool_name), None)
-        if not tool:
-            logger.error(f"Tool '{selected_tool_name}' not found in LANGCHAIN_TOOLS.")
+        # 3️⃣ Find the registered tool function
+        tool_entry = TOOL_REGISTRY.get(selected_tool_name)
+        if not tool_entry:
+            logger.error(f"Tool '{selected_tool_name}' not found in TOOL_REGISTRY.")
             return {"status": "fail", "error_message": f"Tool '{selected_tool_name}' not registered."}
+        tool_func = tool_entry[0]
 
-        # 5️⃣ Execute the tool function
-        logger.info(f"Executing recovery tool '{selected_tool_name}' for task '{task}'...")
-        sig = inspect.signature(tool.func)
-        accepted_args = {k: v for k, v in {"task": task}.items() if k in sig.parameters}
-        tool.func(**accepted_args)
+        # 4️⃣ Execute the tool function
+        logger.info(f"Executing recovery tool '{selected_tool_name}' for task '{task}' ({decision.source})...")
+        sig = inspect.signature(tool_func)
+        candidate_args = {"task": task, **decision.tool_args}
+        accepted_args = {k: v for k, v in candidate_args.items() if k in sig.parameters}
+        tool_func(**accepted_args)
 
-        # 6️⃣ Retry the operation if callback provided
+        # 5️⃣ Retry the operation if callback provided
         if retry_callback:
             logger.info(f"Retrying task '{task}' after recovery action...")
             agent_instance = retry_callback()
@@ -114,3 +231,5 @@ def handle_error(
     except Exception as e:
         logger.critical(f"Diagnostic handler failed during execution: {e}", exc_info=True)
         return {"status": "fail", "error_message": str(e)}
+    finally:
+        _recovery_state.depth = depth
@@ -22,6 +22,19 @@ class HTTPConnectorError(Exception):
 class DiagnosticToolError(Exception):
     """Raised when a diagnostic tool fails or misconfigures a connector."""
     
+class CircuitOpenError(Exception):
+    """Raised when every connector in the failover chain is unavailable (circuits open)."""
+
 class TexFileReadError(Exception):
  """Custom exception for errors in reading .tex files."""
 
+
+class LatexValidationError(Exception):
+    """Raised when generated LaTeX fails structural validation before compiling."""
+
+    def __init__(self, message: str, diagnostics=()):
+        super().__init__(message)
+        self.diagnostics = list(diagnostics)
+
+class EditScriptError(Exception):
+    """Raised when an LLM edit script cannot be applied to the source document."""
@@ -1,28 +1,50 @@
 import os
+import re
+import string
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 import yaml
-from langchain.prompts import PromptTemplate
 
+from core.env import env_flag, env_float
+from core.exceptions import PromptNotFoundError
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Get prompt directory from environment or fallback to a default
 PROMPT_DIR = os.getenv("PROMPTS_DIR", "app/prompts")
 
+DEFAULT_RELOAD_INTERVAL_IN_SECS = 2.0
+
+_NAME_LINE = re.compile(r"^name:\s*['\"]?([^'\"\s#]+)", re.M)
 
 
 def escape_backslashes(text: str) -> str:
     return text.replace("\\", "\\\\")
 
+
+def _is_prompt_file(file_name: str) -> bool:
+    return file_name.endswith(".yaml") or file_name.endswith(".yml")
+
+
 def load_yaml_prompts(prompt_dir: str = PROMPT_DIR):
     """
-    Load all YAML prompt files as PromptTemplate objects.
+    Load all YAML prompt files as LangChain PromptTemplate objects.
     Each YAML must define: name, prompt, and optional input_variables.
+    Kept for callers that need LangChain templates; the app uses PROMPTS.
     """
+    from langchain.prompts import PromptTemplate
+
     prompts = {}
 
     if not os.path.isdir(prompt_dir):
         raise FileNotFoundError(f"Prompt directory not found: {prompt_dir}")
 
     for file_name in os.listdir(prompt_dir):
-        if not (file_name.endswith(".yaml") or file_name.endswith(".yml")):
+        if not _is_prompt_file(file_name):
             continue
 
         file_path = os.path.join(prompt_dir, file_name)
@@ -31,27 +53,240 @@ def load_yaml_prompts(prompt_dir: str = PROMPT_DIR):
             with open(file_path, "r", encoding="utf-8") as f:
                 data = yaml.safe_load(f)
         except Exception as e:
-            print(f"Error reading {file_name}: {e}")
+            logger.error(f"Error reading {file_name}: {e}")
             continue
 
         if not data or "prompt" not in data or "name" not in data:
-            print(f"Skipping invalid prompt file: {file_name}")
+            logger.warning(f"Skipping invalid prompt file: {file_name}")
             continue
 
-        name = data["name"]
-        input_vars = data.get("input_variables", [])
-        prompt_text = data["prompt"]
-
-        # Updated: Use Jinja2 template format to safely handle LaTeX braces
-        prompts[name] = PromptTemplate(
-            input_variables=input_vars,
-            template= escape_backslashes(prompt_text),
-            template_format="f-string" 
+        prompts[data["name"]] = PromptTemplate(
+            input_variables=data.get("input_variables", []),
+            template=escape_backslashes(data["prompt"]),
+            template_format="f-string"
         )
 
     return prompts
 
 
+# -----------------------------
+# Compiled templates
+# -----------------------------
+class CompiledPrompt:
+    """
+    A prompt template precompiled for str.format.
+
+    Renders exactly what the LangChain f-string PromptTemplate produced for
+    the same file (backslashes doubled, '{{' and '}}' as literal braces), but
+    the template is parsed and its variables checked once, at load time.
+    """
+
+    def __init__(self, name: str, prompt: str, input_variables: List[str], version: Optional[str] = None):
+        self.name = name
+        self.version = version
+        self.template = escape_backslashes(prompt)
+        self.input_variables = list(input_variables)
+
+        fields = set()
+        for _, field, spec, conversion in string.Formatter().parse(self.template):
+            if field is None:
+                continue
+            if not field.isidentifier() or spec or conversion:
+                raise ValueError(f"Prompt '{name}': unsupported placeholder '{{{field}}}'")
+            fields.add(field)
+        undeclared = fields - set(self.input_variables)
+        if undeclared:
+            raise ValueError(f"Prompt '{name}' uses undeclared input variables: {sorted(undeclared)}")
+        self._fields = frozenset(fields)
+
+    def format(self, **kwargs: Any) -> str:
+        missing = self._fields - kwargs.keys()
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' is missing input variables: {sorted(missing)}")
+        return self.template.format_map(kwargs)
+
+    def __repr__(self) -> str:
+        return f"CompiledPrompt(name={self.name!r}, version={self.version!r}, input_variables={self.input_variables!r})"
+
+
+def _compile_file(file_path: str) -> CompiledPrompt:
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    if not data or "prompt" not in data or "name" not in data:
+        raise ValueError(f"Invalid prompt file: {os.path.basename(file_path)}")
+    version = data.get("version")
+    return CompiledPrompt(
+        data["name"], data["prompt"], data.get("input_variables", []), None if version is None else str(version)
+    )
+
+
+def _file_stamp(file_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+class PromptRegistry(Mapping):
+    """
+    Read-only mapping of prompt name -> CompiledPrompt, backed by the YAML
+    files in the prompt directory.
+
+      - Nothing is read at import. The first lookup indexes the directory
+        (file names and their `name:` line only); a template is parsed and
+        compiled the first time it is requested.
+      - With hot reload on (PROMPT_HOT_RELOAD), a requested template whose file
+        changed (mtime/size) is recompiled, at most once per
+        PROMPT_RELOAD_INTERVAL_IN_SECS. Unknown names rescan the directory, so
+        new files are picked up. A file that fails to reload keeps serving the
+        last good version.
+    """
+
+    def __init__(self, prompt_dir: Optional[str] = None):
+        self._prompt_dir = prompt_dir
+        self._lock = threading.RLock()
+        # name -> file path
+        self._index: Optional[Dict[str, str]] = None
+        self._indexed_at = 0.0
+        # name -> (compiled template, file stamp, time of the last stamp check)
+        self._compiled: Dict[str, Tuple[CompiledPrompt, Optional[Tuple[int, int]], float]] = {}
+        self.stats: Dict[str, int] = {"compiles": 0, "reloads": 0, "reload_failures": 0, "rescans": 0}
+
+    @property
+    def prompt_dir(self) -> str:
+        return self._prompt_dir or os.getenv("PROMPTS_DIR", PROMPT_DIR)
+
+    def _hot_reload(self) -> Tuple[bool, float]:
+        return env_flag("PROMPT_HOT_RELOAD", True), env_float(
+            "PROMPT_RELOAD_INTERVAL_IN_SECS", DEFAULT_RELOAD_INTERVAL_IN_SECS
+        )
+
+    def _scan(self) -> Dict[str, str]:
+        prompt_dir = self.prompt_dir
+        if not os.path.isdir(prompt_dir):
+            raise FileNotFoundError(f"Prompt directory not found: {prompt_dir}")
+
+        index = {}
+        for file_name in sorted(os.listdir(prompt_dir)):
+            if not _is_prompt_file(file_name):
+                continue
+            file_path = os.path.join(prompt_dir, file_name)
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    match = _NAME_LINE.search(f.read())
+            except OSError as e:
+                logger.error(f"Error reading {file_name}: {e}")
+                continue
+            if match:
+                index[match.group(1)] = file_path
+            else:
+                logger.warning(f"Skipping prompt file without a name: {file_name}")
+        return index
+
+    def _get_index(self, rescan: bool = False) -> Dict[str, str]:
+        with self._lock:
+            if self._index is None:
+                self._index = self._scan()
+                self._indexed_at = time.monotonic()
+            elif rescan:
+                enabled, interval = self._hot_reload()
+                if enabled and time.monotonic() - self._indexed_at >= interval:
+                    self._index = self._scan()
+                    self._indexed_at = time.monotonic()
+                    self.stats["rescans"] += 1
+            return self._index
+
+    def _load(self, name: str) -> Optional[CompiledPrompt]:
+        entry = self._compiled.get(name)
+        if entry is not None:
+            compiled, stamp, checked_at = entry
+            enabled, interval = self._hot_reload()
+            if not enabled or time.monotonic() - checked_at < interval:
+                return compiled
+        else:
+            stamp = None
+
+        with self._lock:
+            index = self._get_index()
+            if name not in index:
+                index = self._get_index(rescan=True)
+            file_path = index.get(name)
+            if file_path is None:
+                return entry[0] if entry else None
+
+            current = _file_stamp(file_path)
+            if entry is not None and current == stamp:
+                self._compiled[name] = (entry[0], stamp, time.monotonic())
+                return entry[0]
+
+            try:
+                compiled = _compile_file(file_path)
+            except Exception as e:
+                if entry is None:
+                    # Same as an invalid file at startup: the prompt is unavailable
+                    logger.error(f"Error loading prompt '{name}' from {os.path.basename(file_path)}: {e}")
+                    return None
+                self.stats["reload_failures"] += 1
+                logger.error(f"Failed to reload prompt '{name}', keeping the loaded version: {e}")
+                self._compiled[name] = (entry[0], current, time.monotonic())
+                return entry[0]
+
+            if compiled.name != name:
+                # The file was renamed inside; index it again on the next miss
+                self._index = None
+                self._compiled.pop(name, None)
+                return None
+            self.stats["compiles"] += 1
+            if entry is not None:
+                self.stats["reloads"] += 1
+                logger.info(f"Reloaded prompt '{name}' (version {entry[0].version} -> {compiled.version})")
+            self._compiled[name] = (compiled, current, time.monotonic())
+            return compiled
+
+    def get_prompt(self, name: str) -> CompiledPrompt:
+        """The compiled template for `name`; raises PromptNotFoundError if there is none."""
+        compiled = self._load(name)
+        if compiled is None:
+            raise PromptNotFoundError(f"Prompt '{name}' not found in {self.prompt_dir}.")
+        return compiled
+
+    def __getitem__(self, name: str) -> CompiledPrompt:
+        compiled = self._load(name)
+        if compiled is None:
+            raise KeyError(name)
+        return compiled
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._load(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._get_index(rescan=True)))
+
+    def __len__(self) -> int:
+        return len(self._get_index(rescan=True))
+
+    def reload(self) -> None:
+        """Forget everything loaded; the next lookup reads the directory again."""
+        with self._lock:
+            self._index = None
+            self._compiled.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["loaded"] = len(self._compiled)
+            stats["indexed"] = len(self._index) if self._index is not None else 0
+        return stats
+
+
+# Loaded on first lookup, not at import
+PROMPTS = PromptRegistry()
+
 
-# Load all prompts at import time
-PROMPTS = load_yaml_prompts()
+def get_prompt_registry_stats() -> Dict[str, Any]:
+    """Compiles, hot reloads and failed reloads of the prompt registry."""
+    return PROMPTS.get_stats()
@@ -3,12 +3,19 @@ import sys
 import os
 from dotenv import load_dotenv
 load_dotenv()
+from core.env import env_flag
 from core.logger import get_logger
 from app.file_utils import pdf_generator, file_parser
 from app.email_utils.gmail_sender import send_email_with_attachment
-from app.agents import ResumeAgent, CoverLetterAgent, EmailAgent
+from app.agents import ResumeAgent, CoverLetterAgent, EmailAgent, build_application_pipeline
+from app.agents.pipeline import RESUME_COMPILE, COVER_LETTER_COMPILE, EMAIL_LLM
+from core.error_handler import warm_up_diagnostic_agent
 from pathlib import Path
 
+# Build the LangChain diagnostic agent off the request path so the first failure does not pay for it.
+if env_flag("DIAGNOSTIC_AGENT_WARMUP", False):
+    warm_up_diagnostic_agent(background=True)
+
 st.set_page_config(
     page_title="GenApply - Job applications, personalized and sent in seconds",
     layout="wide"
@@ -93,6 +100,13 @@ if "refined_resume_path" not in st.session_state:
     st.session_state.refined_resume_path = None
 if "refined_cover_letter_path" not in st.session_state:
     st.session_state.refined_cover_letter_path = None
+if "email_draft" not in st.session_state:
+    st.session_state.email_draft = None
+if "refined_resume_text" not in st.session_state:
+    st.session_state.refined_resume_text = None
+
+# Draft the cover letter and email from the uploaded resume while the tailored one is generated
+parallel_drafting = env_flag("PARALLEL_DRAFTING", False)
 
 
 
@@ -113,47 +127,91 @@ if st.button("Generate"):
         # Save uploaded file
         with open(temp_resume_path, "wb") as f:
             f.write(resume_file.getbuffer())
-     
-        # --- Generate Resume ---
-        resume_status = st.empty()
-        resume_status = st.info("Generating refined resume using AI...")
-
-        resume_agent = ResumeAgent(
-            resume_file=str(temp_resume_path),
-            job_role=job_role,
-            job_description=job_description
-        )
-        refined_resume = resume_agent.run()
 
-        if refined_resume.get("status") == "success":
-            resume_status.empty()
-            refined_resume_path  = refined_resume.get("path")
-            st.session_state["refined_resume_path"] = refined_resume_path
-            st.success(f"Resume Generated: `{refined_resume_path}`. Please review before sending.")
+        # A draft from a previous generation must not be sent with the new documents
+        st.session_state["email_draft"] = None
+
+        if parallel_drafting:
+            with st.spinner("Generating resume, cover letter and email draft in parallel..."):
+                results = build_application_pipeline(
+                    resume_file=str(temp_resume_path),
+                    job_role=job_role,
+                    company=company_name,
+                    job_description=job_description,
+                    receiver_email=receiver_email,
+                    cover_letter=generate_cover_letter,
+                    draft_email=True,
+                    parallel_drafting=True,
+                ).run()
+
+            if results[RESUME_COMPILE].status != "success":
+                st.error("Resume generation failed.")
+                st.stop()
+            st.session_state["refined_resume_path"] = results[RESUME_COMPILE].value
+            st.session_state["refined_resume_text"] = None
+            st.success(f"Resume Generated: `{results[RESUME_COMPILE].value}`. Please review before sending.")
+
+            if generate_cover_letter:
+                if results[COVER_LETTER_COMPILE].status == "success":
+                    st.session_state["refined_cover_letter_path"] = results[COVER_LETTER_COMPILE].value
+                    st.success(f"Cover Letter Generated: `{results[COVER_LETTER_COMPILE].value}`. Please review before sending.")
+                else:
+                    st.error("Cover letter generation failed.")
+
+            email_draft = results[EMAIL_LLM]
+            st.session_state["email_draft"] = email_draft.value if email_draft.status == "success" else None
+
         else:
-            st.error("Resume generation failed.")
-            st.stop()
+            # --- Generate Resume ---
+            resume_status = st.empty()
+            resume_status = st.info("Generating refined resume using AI...")
 
-        # --- Generate Cover Letter (Optional) ---
-        if generate_cover_letter:
-            cover_letter_status = st.empty()
-            cover_letter_status = st.info("Generating cover letter using AI...")
+            resume_progress = st.empty()
 
-            cover_letter_agent = CoverLetterAgent(
-                refined_resume_path=st.session_state["refined_resume_path"],
+            resume_agent = ResumeAgent(
+                resume_file=str(temp_resume_path),
                 job_role=job_role,
-                job_description = job_description,
-                company=company_name
+                job_description=job_description,
+                progress_callback=lambda field, text: resume_progress.caption(f"Receiving resume LaTeX... {len(text)} characters")
             )
-            refined_cover = cover_letter_agent.run()
-
-            if refined_cover.get("status") == "success":
-                cover_letter_status.empty()
-                refined_cover_letter_path = refined_cover.get("path")
-                st.session_state["refined_cover_letter_path"] = refined_cover_letter_path
-                st.success(f"Cover Letter Generated: `{refined_cover_letter_path}`. Please review before sending.")
+            refined_resume = resume_agent.run()
+            resume_progress.empty()
+
+            if refined_resume.get("status") == "success":
+                resume_status.empty()
+                refined_resume_path  = refined_resume.get("path")
+                st.session_state["refined_resume_path"] = refined_resume_path
+                st.session_state["refined_resume_text"] = refined_resume.get("text")
+                st.success(f"Resume Generated: `{refined_resume_path}`. Please review before sending.")
             else:
-                st.error("Cover letter generation failed.")
+                st.error("Resume generation failed.")
+                st.stop()
+
+            # --- Generate Cover Letter (Optional) ---
+            if generate_cover_letter:
+                cover_letter_status = st.empty()
+                cover_letter_status = st.info("Generating cover letter using AI...")
+
+                cover_letter_progress = st.empty()
+
+                cover_letter_agent = CoverLetterAgent(
+                    refined_resume_path=st.session_state["refined_resume_path"],
+                    job_role=job_role,
+                    job_description = job_description,
+                    company=company_name,
+                    resume_text=st.session_state["refined_resume_text"],
+                    progress_callback=lambda field, text: cover_letter_progress.caption(f"Receiving cover letter LaTeX... {len(text)} characters")
+                )
+                refined_cover = cover_letter_agent.run()
+                cover_letter_progress.empty()
+
+                if refined_cover.get("status") == "success":
+                    cover_letter_status.empty()
+                    refined_cover_letter_path = refined_cover.get("path")
+                    st.session_state["refined_cover_letter_path"] = refined_cover_letter_path
+                    st.success(f"Cover Letter Generated: `{refined_cover_letter_path}`. Please review before sending.")
+                else:
+                    st.error("Cover letter generation failed.")
 
     except Exception as e:
         logger.error(f"Error during generation: {e}", exc_info=True)
@@ -185,9 +243,15 @@ if st.button("Send Application"):
             company=company_name,
             receiver_email=receiver_email,
             attach_cover_letter=attach_cover_letter,
-            cover_letter_path=refined_cover_letter_path
+            cover_letter_path=refined_cover_letter_path,
+            resume_text=st.session_state.get("refined_resume_text")
         )
-        email_status = email_agent.run()
+        if st.session_state.get("email_draft"):
+            # Drafted during generation; only the send is left
+            email_agent.send(*st.session_state["email_draft"])
+            email_status = {"status": "success"}
+        else:
+            email_status = email_agent.run()
 
         # --- Result ---
         if isinstance(email_status, dict) and email_status.get("status") == "success":
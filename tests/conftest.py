@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# core.logger refuses to import without a log directory
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="logs_"))
@@ -0,0 +1,12 @@
+from app.file_utils.latex_validator import validate_latex
+
+
+def test_percent_in_url_argument_is_not_a_comment():
+    doc = (
+        "\\documentclass{article}\n"
+        "\\usepackage{hyperref}\n"
+        "\\begin{document}\n"
+        "\\href{https://x.com/a%20b_c}{link} % trailing comment }\n"
+        "\\end{document}\n"
+    )
+    assert validate_latex(doc) == []
@@ -0,0 +1,26 @@
+from app.agents.prompt_budget import compact_job_description, compact_latex
+
+
+def test_compact_latex_keeps_percent_in_urls():
+    source = (
+        "\\href{https://linkedin.com/in/jane%20doe}{LinkedIn} % profile\n"
+        "\\url{https://example.com/a%2Fb}\n"
+    )
+    assert compact_latex(source) == (
+        "\\href{https://linkedin.com/in/jane%20doe}{LinkedIn} %\n"
+        "\\url{https://example.com/a%2Fb}"
+    )
+
+
+def test_compact_latex_strips_comments():
+    source = "% header\n\\section{Skills}   % trailing\n50\\% done\n"
+    assert compact_latex(source) == "\\section{Skills} %\n50\\% done"
+
+
+def test_compact_job_description_drops_only_boilerplate_sentences():
+    text = (
+        "You will design APIs in Python. We offer a 401(k) match.\n\n"
+        "Benefits\n- Gym membership\n- Paid time off\n\n"
+        "We are an equal opportunity employer."
+    )
+    assert compact_job_description(text) == "You will design APIs in Python."
@@ -0,0 +1,16 @@
+from app.agents.response_decoder import decode_llm_json
+
+
+def test_unescaped_newline_commands_keep_their_backslash():
+    raw = r'{"latex_code": "\documentclass{article}\begin{document}\noindent\textbf{Hi} \newline x\end{document}"}'
+    latex = decode_llm_json(raw, fields=("latex_code",))["latex_code"]
+    assert latex == r"\documentclass{article}\begin{document}\noindent\textbf{Hi} \newline x\end{document}"
+
+
+def test_unescaped_line_breaks_survive_repair():
+    assert decode_llm_json(r'{"a": "50\% \\ done"}')["a"] == r"50\% \\ done"
+    assert decode_llm_json(r'{"a": "x \\[2pt] y \\\n\section{B}"}')["a"] == "x \\\\[2pt] y \\\\\n\\section{B}"
+
+
+def test_escaped_line_breaks_are_not_doubled():
+    assert decode_llm_json(r'{"a": "a \\\\ b \\textbf{c} \q"}')["a"] == r"a \\ b \textbf{c} \q"